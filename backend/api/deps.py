@@ -0,0 +1,41 @@
+"""
+Ortak API Bağımlılıkları
+========================
+"""
+
+from fastapi import Depends, HTTPException, status
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
+from models.user import UserPrincipal
+from services.auth_service import AuthService
+
+security = HTTPBearer()
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db)
+) -> UserPrincipal:
+    """Mevcut kullanıcıyı al
+
+    Sıcak önbellekte (veya stateless token ile) veritabanına gidilmez;
+    önbellek boşsa kullanıcı async session ile okunur.
+    """
+    principal = await AuthService.resolve_principal_async(db, credentials.credentials)
+    if not principal:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Geçersiz token"
+        )
+    return principal
+
+async def get_current_superuser(
+    current_user: UserPrincipal = Depends(get_current_user)
+) -> UserPrincipal:
+    """Yalnızca yönetici kullanıcılar (süreç geneli, kiracılar arası veriler için)"""
+    if not current_user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Bu işlem için yönetici yetkisi gerekli"
+        )
+    return current_user
@@ -0,0 +1,192 @@
+"""
+Dosya Yanıtları
+===============
+
+Yetkilendirilmiş indirmeler için parçalı dosya yanıtı: `Range` ile kısmi
+ve devam ettirilebilir indirme, `ETag`/`Last-Modified` ile koşullu GET
+(304). Dosya belleğe alınmadan parça parça gönderilir; sunucu ASGI
+`http.response.zerocopysend` uzantısını destekliyorsa sendfile kullanılır.
+"""
+
+import os
+import stat
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Mapping, Optional, Tuple
+from urllib.parse import quote
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+CHUNK_SIZE = 64 * 1024
+
+def content_disposition(filename: str) -> str:
+    """Türkçe karakterli adlar için RFC 5987 uyumlu Content-Disposition"""
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"attachment; filename*=utf-8''{quoted}"
+    return f'attachment; filename="{filename}"'
+
+def parse_range(range_header: str, file_size: int) -> Optional[Tuple[int, int]]:
+    """Tek aralıklı `bytes=` başlığını (başlangıç, bitiş) olarak çözümle
+
+    Bitiş dahildir. Çözümlenemeyen veya çoklu aralıklar için None döner
+    (tam dosya gönderilir); karşılanamayan aralık ValueError fırlatır.
+    """
+    unit, _, ranges = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in ranges:
+        return None
+    start_text, _, end_text = ranges.strip().partition("-")
+    try:
+        start = int(start_text) if start_text.strip() else None
+        end = int(end_text) if end_text.strip() else None
+    except ValueError:
+        return None
+
+    if start is None:
+        # Son N bayt: bytes=-500
+        if end is None:
+            return None
+        if end <= 0:
+            raise ValueError("Karşılanamayan aralık")
+        return max(file_size - end, 0), file_size - 1
+    if start >= file_size or (end is not None and end < start):
+        raise ValueError("Karşılanamayan aralık")
+    return start, file_size - 1 if end is None else min(end, file_size - 1)
+
+class FileRangeResponse(Response):
+    """Dosyanın bir bölümünü (veya tamamını) parça parça gönderen yanıt"""
+
+    def __init__(
+        self,
+        path: str,
+        start: int,
+        end: int,
+        status_code: int = 200,
+        headers: Optional[Mapping[str, str]] = None,
+        media_type: Optional[str] = None,
+        send_header_only: bool = False
+    ):
+        self.path = path
+        self.start = start
+        self.end = end
+        self.status_code = status_code
+        self.media_type = media_type
+        self.send_header_only = send_header_only
+        self.background = None
+        self.init_headers(headers)
+        self.headers["content-length"] = str(end - start + 1)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": self.status_code,
+            "headers": self.raw_headers,
+        })
+        if self.send_header_only:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        remaining = self.end - self.start + 1
+        if remaining <= 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        if "http.response.zerocopysend" in scope.get("extensions", {}):
+            # Sunucu dosya tanıtıcısından doğrudan gönderir (sendfile)
+            with open(self.path, "rb") as file:
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": file,
+                    "offset": self.start,
+                    "count": remaining,
+                    "more_body": False,
+                })
+            return
+
+        async with await anyio.open_file(self.path, mode="rb") as file:
+            await file.seek(self.start)
+            while remaining > 0:
+                chunk = await file.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({
+                    "type": "http.response.body",
+                    "body": chunk,
+                    "more_body": remaining > 0,
+                })
+        if remaining > 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+def _not_modified(request_headers: Headers, etag: str, modified_at: int) -> bool:
+    """If-None-Match / If-Modified-Since koşulları karşılanıyor mu"""
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match is not None:
+        candidates = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+    if_modified_since = request_headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(parsedate_to_datetime(if_modified_since).timestamp()) >= modified_at
+        except (TypeError, ValueError):
+            return False
+    return False
+
+def _if_range_matches(request_headers: Headers, etag: str, last_modified: str) -> bool:
+    """If-Range yoksa veya doğrulayıcı eşleşiyorsa aralık uygulanır"""
+    if_range = request_headers.get("if-range")
+    return if_range is None or if_range.strip() in (etag, last_modified)
+
+async def file_response(
+    request_headers: Headers,
+    path: str,
+    filename: str,
+    media_type: str,
+    etag: Optional[str] = None,
+    method: str = "GET"
+) -> Response:
+    """Koşullu ve aralıklı istekleri değerlendirip uygun yanıtı oluştur
+
+    `etag` verilmezse dosyanın değişme zamanı ve boyutundan üretilir.
+    """
+    stat_result = await anyio.to_thread.run_sync(os.stat, path)
+    if not stat.S_ISREG(stat_result.st_mode):
+        raise FileNotFoundError(path)
+
+    file_size = stat_result.st_size
+    modified_at = int(stat_result.st_mtime)
+    last_modified = formatdate(modified_at, usegmt=True)
+    etag = etag or f'"{stat_result.st_mtime_ns:x}-{file_size:x}"'
+    headers = {
+        "accept-ranges": "bytes",
+        "etag": etag,
+        "last-modified": last_modified,
+        "cache-control": "private, no-cache",
+    }
+
+    if _not_modified(request_headers, etag, modified_at):
+        return Response(status_code=304, headers=headers)
+
+    headers["content-disposition"] = content_disposition(filename)
+    send_header_only = method.upper() == "HEAD"
+
+    range_header = request_headers.get("range")
+    if range_header and file_size > 0 and _if_range_matches(request_headers, etag, last_modified):
+        try:
+            byte_range = parse_range(range_header, file_size)
+        except ValueError:
+            return Response(
+                status_code=416,
+                headers={**headers, "content-range": f"bytes */{file_size}"}
+            )
+        if byte_range is not None:
+            start, end = byte_range
+            headers["content-range"] = f"bytes {start}-{end}/{file_size}"
+            return FileRangeResponse(
+                path, start, end, 206, headers, media_type, send_header_only
+            )
+
+    return FileRangeResponse(
+        path, 0, file_size - 1, 200, headers, media_type, send_header_only
+    )
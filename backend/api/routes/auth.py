@@ -5,9 +5,9 @@ Kimlik Doğrulama API Route'ları
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
-from app.database import get_db
+from app.database import get_async_db
 from app.config import settings
 from models.user import UserCreate, UserResponse, UserLogin
 from services.auth_service import AuthService
@@ -16,10 +16,10 @@ router = APIRouter()
 security = HTTPBearer()
 
 @router.post("/register", response_model=UserResponse)
-async def register(user_create: UserCreate, db: Session = Depends(get_db)):
+async def register(user_create: UserCreate, db: AsyncSession = Depends(get_async_db)):
     """Yeni kullanıcı kaydı"""
     try:
-        user = AuthService.create_user(db, user_create)
+        user = await AuthService.create_user_async(db, user_create)
         return UserResponse.from_orm(user)
     except HTTPException:
         raise
@@ -30,10 +30,10 @@ async def register(user_create: UserCreate, db: Session = Depends(get_db)):
         )
 
 @router.post("/login")
-async def login(user_login: UserLogin, db: Session = Depends(get_db)):
+async def login(user_login: UserLogin, db: AsyncSession = Depends(get_async_db)):
     """Kullanıcı girişi"""
     try:
-        user = AuthService.authenticate_user(db, user_login.email, user_login.password)
+        user = await AuthService.authenticate_user_async(db, user_login.email, user_login.password)
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -42,10 +42,7 @@ async def login(user_login: UserLogin, db: Session = Depends(get_db)):
         
         # Access token oluştur
         access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-        access_token = AuthService.create_access_token(
-            data={"sub": str(user.id)},
-            expires_delta=access_token_expires
-        )
+        access_token = AuthService.create_user_token(user, access_token_expires)
         
         return {
             "access_token": access_token,
@@ -63,11 +60,11 @@ async def login(user_login: UserLogin, db: Session = Depends(get_db)):
 @router.get("/me", response_model=UserResponse)
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Mevcut kullanıcı bilgilerini getir"""
     try:
-        user = AuthService.get_current_user(db, credentials.credentials)
+        user = await AuthService.get_current_user_async(db, credentials.credentials)
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -85,11 +82,11 @@ async def get_current_user(
 @router.post("/refresh")
 async def refresh_token(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Token yenileme"""
     try:
-        user = AuthService.get_current_user(db, credentials.credentials)
+        user = await AuthService.get_current_user_async(db, credentials.credentials)
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -98,10 +95,7 @@ async def refresh_token(
         
         # Yeni token oluştur
         access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-        access_token = AuthService.create_access_token(
-            data={"sub": str(user.id)},
-            expires_delta=access_token_expires
-        )
+        access_token = AuthService.create_user_token(user, access_token_expires)
         
         return {
             "access_token": access_token,
@@ -3,40 +3,51 @@ Doküman API Route'ları
 ======================
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+import mimetypes
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    File,
+    Form,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    UploadFile,
+    status
+)
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
-from app.database import get_db
-from models.document import DocumentResponse
-from models.user import User
-from services.auth_service import AuthService
+from typing import List, Optional
+from api.deps import get_current_user
+from api.responses import file_response
+from app.database import get_async_db, get_db
+from models.document import (
+    DOCUMENT_FIELDS_PATTERN,
+    Document,
+    DocumentListItem,
+    DocumentResponse,
+    DocumentStatus,
+    DocumentStatusResponse
+)
+from models.user import UserPrincipal
 from services.document_service import DocumentService
+from services.ingestion_service import IngestionService
 
 router = APIRouter()
-security = HTTPBearer()
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
-    """Mevcut kullanıcıyı al"""
-    user = AuthService.get_current_user(db, credentials.credentials)
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Geçersiz token"
-        )
-    return user
-
-@router.post("/", response_model=DocumentResponse)
+@router.post("/", response_model=DocumentResponse, status_code=status.HTTP_202_ACCEPTED)
 async def upload_document(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     title: str = Form(None),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Doküman yükle"""
+    """Doküman yükle (metin çıkarma arka planda yapılır)"""
     try:
         if not file.filename:
             raise HTTPException(
@@ -44,7 +55,11 @@ async def upload_document(
                 detail="Dosya adı gerekli"
             )
         
-        document = DocumentService.create_document(db, current_user, file, title)
+        # Dosya yazma bloklayıcı olduğundan thread havuzunda çalıştır
+        document = await run_in_threadpool(DocumentService.create_document, db, current_user, file, title)
+        # Aynı içerik daha önce işlendiyse doküman hazırdır
+        if document.status == DocumentStatus.QUEUED:
+            background_tasks.add_task(IngestionService.run, db.get_bind(), document.id)
         return DocumentResponse.from_orm(document)
         
     except HTTPException:
@@ -55,17 +70,27 @@ async def upload_document(
             detail=f"Dosya yükleme hatası: {str(e)}"
         )
 
-@router.get("/", response_model=List[DocumentResponse])
+@router.get("/", response_model=List[DocumentListItem])
 async def get_documents(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    fields: Optional[str] = Query(None, pattern=DOCUMENT_FIELDS_PATTERN, description="Eklenecek alanlar: content, summary"),
+    cursor: Optional[str] = Query(None, description="Sonraki sayfa imleci (X-Next-Cursor)"),
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Kullanıcının dokümanlarını getir"""
+    """Kullanıcının dokümanlarını getir (içerik ve özet hariç)"""
     try:
-        documents = DocumentService.get_user_documents(db, current_user.id, skip, limit)
-        return [DocumentResponse.from_orm(doc) for doc in documents]
+        extra_fields = DocumentService.parse_fields(fields)
+        documents = await DocumentService.get_user_documents_async(
+            db, current_user.id, skip, limit, extra_fields, cursor
+        )
+        return DocumentService.list_response(
+            documents, extra_fields, response, DocumentService.next_cursor(documents, limit)
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -75,12 +100,12 @@ async def get_documents(
 @router.get("/{document_id}", response_model=DocumentResponse)
 async def get_document(
     document_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Belirli bir dokümanı getir"""
     try:
-        document = DocumentService.get_document(db, document_id, current_user.id)
+        document = await DocumentService.get_document_async(db, document_id, current_user.id)
         if not document:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -95,15 +120,49 @@ async def get_document(
             detail=f"Doküman alınamadı: {str(e)}"
         )
 
+@router.get("/{document_id}/status", response_model=DocumentStatusResponse)
+async def get_document_status(
+    document_id: int,
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Doküman işleme durumunu getir"""
+    row = (await db.execute(
+        select(
+            Document.status,
+            Document.processing_error,
+            Document.content.isnot(None),
+            Document.summary.isnot(None)
+        ).where(
+            Document.id == document_id,
+            Document.user_id == current_user.id
+        )
+    )).first()
+    
+    if not row:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Doküman bulunamadı"
+        )
+    
+    document_status, processing_error, has_content, has_summary = row
+    return DocumentStatusResponse(
+        document_id=document_id,
+        status=document_status,
+        processing_error=processing_error,
+        has_content=bool(has_content),
+        has_summary=bool(has_summary)
+    )
+
 @router.delete("/{document_id}")
 async def delete_document(
     document_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Dokümanı sil"""
     try:
-        success = DocumentService.delete_document(db, document_id, current_user.id)
+        success = await run_in_threadpool(DocumentService.delete_document, db, document_id, current_user.id)
         if not success:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -121,7 +180,7 @@ async def delete_document(
 @router.post("/{document_id}/process")
 async def process_document_with_ai(
     document_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Dokümanı AI ile işle"""
@@ -139,31 +198,46 @@ async def process_document_with_ai(
             detail=f"AI işleme hatası: {str(e)}"
         )
 
-@router.get("/{document_id}/download")
+@router.api_route("/{document_id}/download", methods=["GET", "HEAD"])
 async def download_document(
     document_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    request: Request,
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Dokümanı indir"""
+    """Dokümanı indir (Range ve koşullu GET desteklenir)"""
+    row = (await db.execute(
+        select(
+            Document.file_path,
+            Document.title,
+            Document.file_type,
+            Document.content_hash
+        ).where(
+            Document.id == document_id,
+            Document.user_id == current_user.id
+        )
+    )).first()
+    
+    if not row:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Doküman bulunamadı"
+        )
+    
+    file_path, title, file_type, content_hash = row
+    download_name = title if title.lower().endswith(f".{file_type}") else f"{title}.{file_type}"
     try:
-        document = DocumentService.get_document(db, document_id, current_user.id)
-        if not document:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Doküman bulunamadı"
-            )
-        
-        # Dosya yolunu döndür (gerçek uygulamada dosya stream edilir)
-        return {
-            "file_path": document.file_path,
-            "filename": document.filename,
-            "file_size": document.file_size
-        }
-    except HTTPException:
-        raise
-    except Exception as e:
+        return await file_response(
+            request.headers,
+            file_path,
+            download_name,
+            mimetypes.guess_type(download_name)[0] or "application/octet-stream",
+            # İçerik adresli dosyalarda özet güçlü ETag'dir
+            etag=f'"{content_hash}"' if content_hash else None,
+            method=request.method
+        )
+    except FileNotFoundError:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Doküman indirilemedi: {str(e)}"
-        ) 
\ No newline at end of file
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Doküman dosyası bulunamadı"
+        )
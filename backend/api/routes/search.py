@@ -3,84 +3,143 @@ Doküman Listeleme ve Arama API Route'ları
 ==========================================
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from app.database import get_db
-from models.document import Document, DocumentResponse
-from models.user import User
-from services.auth_service import AuthService
+from api.deps import get_current_user
+from app.database import get_async_db
+from models.document import DOCUMENT_FIELDS_PATTERN, Document, DocumentListItem, DocumentResponse
+from models.search_index import KeywordFacet
+from models.user import UserPrincipal
+from services.document_service import DocumentService
+from services.search_service import SearchIndexService
 
 router = APIRouter()
-security = HTTPBearer()
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
-    """Mevcut kullanıcıyı al"""
-    user = AuthService.get_current_user(db, credentials.credentials)
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Geçersiz token"
-        )
-    return user
-
-@router.get("/", response_model=List[DocumentResponse])
+@router.get("/", response_model=List[DocumentListItem])
 async def search_documents(
+    response: Response,
     query: Optional[str] = Query(None, description="Arama sorgusu"),
     file_type: Optional[str] = Query(None, description="Dosya türü filtresi"),
+    keyword: Optional[List[str]] = Query(None, description="Anahtar kelime filtresi (tekrarlanabilir, tümü aranır)"),
+    sort: str = Query("date", pattern="^(date|relevance)$", description="Sıralama: date veya relevance (BM25)"),
     limit: int = Query(20, description="Sonuç sayısı"),
     offset: int = Query(0, description="Başlangıç indeksi"),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    fields: Optional[str] = Query(None, pattern=DOCUMENT_FIELDS_PATTERN, description="Eklenecek alanlar: content, summary"),
+    cursor: Optional[str] = Query(None, description="Sonraki sayfa imleci (X-Next-Cursor, yalnızca date sıralaması)"),
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Dokümanlarda arama yap"""
+    """Dokümanlarda arama yap (içerik ve özet hariç)"""
     try:
+        extra_fields = DocumentService.parse_fields(fields)
+        load_options = DocumentService.list_load_options(extra_fields)
+        
         # Temel filtreler
         filters = [Document.user_id == current_user.id]
         
-        # Arama sorgusu
-        if query:
-            search_term = f"%{query}%"
-            filters.append(
-                or_(
-                    Document.title.ilike(search_term),
-                    Document.content.ilike(search_term),
-                    Document.filename.ilike(search_term)
-                )
-            )
-        
         # Dosya türü filtresi
         if file_type and file_type != "all":
             filters.append(Document.file_type == file_type)
         
+        # Anahtar kelime filtresi (etiket indeksi üzerinden)
+        if keyword:
+            keyword_ids = SearchIndexService.match_keywords(current_user.id, keyword)
+            if keyword_ids is not None:
+                filters.append(Document.id.in_(keyword_ids))
+        
+        # Alaka düzeyine göre sıralama (BM25, indeks istatistiklerinden)
+        if query and sort == "relevance":
+            ranked = await db.run_sync(
+                SearchIndexService.rank, current_user.id, query, tuple(filters[1:]), limit, offset
+            )
+            ranked_ids = [document_id for document_id, _ in ranked]
+            documents_by_id = {
+                doc.id: doc
+                for doc in await db.scalars(
+                    select(Document).options(load_options).where(Document.id.in_(ranked_ids))
+                )
+            }
+            return DocumentService.list_response(
+                [documents_by_id[document_id] for document_id in ranked_ids if document_id in documents_by_id],
+                extra_fields
+            )
+        
+        # Arama sorgusu (ters indeks üzerinden)
+        if query:
+            matched_ids = SearchIndexService.match_query(current_user.id, query)
+            if matched_ids is None:
+                return []
+            filters.append(Document.id.in_(matched_ids))
+        
         # Sorguyu çalıştır
-        documents = db.query(Document).filter(
-            *filters
-        ).offset(offset).limit(limit).all()
+        documents = (await db.scalars(
+            DocumentService.paginate(
+                select(Document).options(load_options).where(*filters), cursor
+            ).offset(offset).limit(limit)
+        )).all()
         
-        return [DocumentResponse.from_orm(doc) for doc in documents]
+        return DocumentService.list_response(
+            documents, extra_fields, response, DocumentService.next_cursor(documents, limit)
+        )
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Arama hatası: {str(e)}"
         )
 
-@router.get("/documents/", response_model=List[DocumentResponse])
+@router.get("/keywords", response_model=List[KeywordFacet])
+async def get_keyword_facets(
+    keyword: Optional[List[str]] = Query(None, description="Seçili anahtar kelimeler (daraltma)"),
+    file_type: Optional[str] = Query(None, description="Dosya türü filtresi"),
+    limit: int = Query(50, description="Faset sayısı"),
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Anahtar kelime başına doküman sayıları (etiket navigasyonu)
+
+    Anahtar kelime seçiliyse sayımlar yalnızca seçili kelimelerin
+    tümüne sahip dokümanlar üzerinden yapılır.
+    """
+    try:
+        filters = []
+        if file_type and file_type != "all":
+            filters.append(Document.file_type == file_type)
+        if keyword:
+            keyword_ids = SearchIndexService.match_keywords(current_user.id, keyword)
+            if keyword_ids is not None:
+                filters.append(Document.id.in_(keyword_ids))
+        
+        facets = await db.run_sync(
+            SearchIndexService.keyword_facets, current_user.id, tuple(filters), limit
+        )
+        return [KeywordFacet(keyword=name, count=count) for name, count in facets]
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Anahtar kelime faseti hatası: {str(e)}"
+        )
+
+@router.get("/documents/", response_model=List[DocumentListItem])
 async def list_documents(
+    response: Response,
     limit: int = Query(20, description="Sonuç sayısı"),
     offset: int = Query(0, description="Başlangıç indeksi"),
     file_type: Optional[str] = Query(None, description="Dosya türü filtresi"),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    fields: Optional[str] = Query(None, pattern=DOCUMENT_FIELDS_PATTERN, description="Eklenecek alanlar: content, summary"),
+    cursor: Optional[str] = Query(None, description="Sonraki sayfa imleci (X-Next-Cursor)"),
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Kullanıcının dokümanlarını listele"""
+    """Kullanıcının dokümanlarını listele (içerik ve özet hariç)"""
     try:
+        extra_fields = DocumentService.parse_fields(fields)
+        
         # Temel filtreler
         filters = [Document.user_id == current_user.id]
         
@@ -89,12 +148,21 @@ async def list_documents(
             filters.append(Document.file_type == file_type)
         
         # Sorguyu çalıştır
-        documents = db.query(Document).filter(
-            *filters
-        ).offset(offset).limit(limit).all()
+        documents = (await db.scalars(
+            DocumentService.paginate(
+                select(Document).options(
+                    DocumentService.list_load_options(extra_fields)
+                ).where(*filters),
+                cursor
+            ).offset(offset).limit(limit)
+        )).all()
         
-        return [DocumentResponse.from_orm(doc) for doc in documents]
+        return DocumentService.list_response(
+            documents, extra_fields, response, DocumentService.next_cursor(documents, limit)
+        )
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -104,15 +172,12 @@ async def list_documents(
 @router.get("/documents/{document_id}", response_model=DocumentResponse)
 async def get_document_by_id(
     document_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """ID ile doküman getir"""
     try:
-        document = db.query(Document).filter(
-            Document.id == document_id,
-            Document.user_id == current_user.id
-        ).first()
+        document = await DocumentService.get_document_async(db, document_id, current_user.id)
         
         if not document:
             raise HTTPException(
@@ -132,14 +197,16 @@ async def get_document_by_id(
 
 @router.get("/documents/count/total")
 async def get_document_count(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Kullanıcının toplam doküman sayısını getir"""
     try:
-        count = db.query(Document).filter(
-            Document.user_id == current_user.id
-        ).count()
+        count = await db.scalar(
+            select(func.count()).select_from(Document).where(
+                Document.user_id == current_user.id
+            )
+        )
         
         return {"total_count": count}
         
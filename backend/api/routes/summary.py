@@ -4,44 +4,37 @@
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List
-from app.database import get_db
+from api.deps import get_current_superuser, get_current_user
+from app.database import get_async_db, get_db
 from models.document import Document, DocumentResponse
-from models.user import User
-from services.auth_service import AuthService
-from services.ai_service import AIService
+from models.user import UserPrincipal
+from services.ai_service import AIService, get_ai_service
+from services.ai_cache import ai_result_cache
+from services.document_service import DocumentService
+from services.search_service import SearchIndexService
 
 router = APIRouter()
-security = HTTPBearer()
-
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
-    """Mevcut kullanıcıyı al"""
-    user = AuthService.get_current_user(db, credentials.credentials)
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Geçersiz token"
-        )
-    return user
 
 @router.post("/{document_id}/generate")
 async def generate_summary(
     document_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    ai_service: AIService = Depends(get_ai_service)
 ):
-    """Doküman için özet oluştur"""
+    """Doküman için özet oluştur
+
+    Senkron session'daki veritabanı ve indeks işlemleri thread havuzunda
+    yürütülür; korpus istatistikleri özetleme thread'lerinde de kullanılır.
+    """
     try:
         # Dokümanı kontrol et
-        document = db.query(Document).filter(
-            Document.id == document_id,
-            Document.user_id == current_user.id
-        ).first()
+        document = await run_in_threadpool(DocumentService.get_document, db, document_id, current_user.id)
         
         if not document:
             raise HTTPException(
@@ -56,14 +49,11 @@ async def generate_summary(
             )
         
         # AI ile özet oluştur
-        ai_service = AIService()
-        summary, keywords = await ai_service.generate_summary_and_keywords(document.content)
+        corpus = await run_in_threadpool(SearchIndexService.corpus_statistics, db, current_user.id)
+        summary, keywords = await ai_service.generate_summary_and_keywords(document.content, corpus)
         
         # Dokümanı güncelle
-        document.summary = summary
-        document.keywords = keywords
-        db.commit()
-        db.refresh(document)
+        await run_in_threadpool(DocumentService.save_summary, db, document, summary, keywords)
         
         return {
             "message": "Özet başarıyla oluşturuldu",
@@ -83,15 +73,17 @@ async def generate_summary(
 @router.get("/{document_id}/summary")
 async def get_document_summary(
     document_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Doküman özetini getir"""
     try:
-        document = db.query(Document).filter(
-            Document.id == document_id,
-            Document.user_id == current_user.id
-        ).first()
+        document = (await db.execute(
+            select(Document.title, Document.summary, Document.keywords).where(
+                Document.id == document_id,
+                Document.user_id == current_user.id
+            )
+        )).first()
         
         if not document:
             raise HTTPException(
@@ -119,15 +111,13 @@ async def get_document_summary(
 async def ask_question(
     document_id: int,
     question: str = Query(..., description="Soru"),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    ai_service: AIService = Depends(get_ai_service)
 ):
     """Doküman hakkında soru sor"""
     try:
-        document = db.query(Document).filter(
-            Document.id == document_id,
-            Document.user_id == current_user.id
-        ).first()
+        document = await run_in_threadpool(DocumentService.get_document, db, document_id, current_user.id)
         
         if not document:
             raise HTTPException(
@@ -141,9 +131,10 @@ async def ask_question(
                 detail="Doküman içeriği bulunamadı"
             )
         
-        # AI ile soru cevapla
-        ai_service = AIService()
-        answer = await ai_service.answer_question(question, document.content)
+        # Soruyla en alakalı parçalarla AI'dan cevap al (BM25 puanlama
+        # event loop'u bloklamasın diye thread havuzunda)
+        passages = await run_in_threadpool(SearchIndexService.retrieve_chunks, db, document, question)
+        answer = await ai_service.answer_question(question, "\n\n---\n\n".join(passages))
         
         return {
             "question": question,
@@ -163,51 +154,61 @@ async def ask_question(
 @router.post("/batch-summarize")
 async def batch_summarize_documents(
     document_ids: List[int],
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    ai_service: AIService = Depends(get_ai_service)
 ):
     """Birden fazla doküman için toplu özet oluştur"""
     try:
-        results = []
-        ai_service = AIService()
+        # Tüm dokümanları tek sorguyla yükle (veritabanı işlemleri thread havuzunda)
+        unique_ids = list(dict.fromkeys(document_ids))
+        documents = {
+            doc.id: doc for doc in await run_in_threadpool(
+                DocumentService.get_documents, db, unique_ids, current_user.id
+            )
+        }
+        
+        # Özetleri sınırlı eşzamanlılıkla oluştur
+        contents = {
+            doc_id: document.content
+            for doc_id, document in documents.items() if document.content
+        }
+        # Korpus istatistikleri toplu işlem başına bir kez hazırlanır;
+        # anahtar kelimeler tekil özetlemeyle aynı şekilde ağırlıklandırılır
+        outcomes = {}
+        if contents:
+            corpus = await run_in_threadpool(SearchIndexService.corpus_statistics, db, current_user.id)
+            outcomes = await ai_service.batch_generate_summary_and_keywords(contents, corpus=corpus)
         
+        results = []
+        summaries = []
         for doc_id in document_ids:
-            try:
-                document = db.query(Document).filter(
-                    Document.id == doc_id,
-                    Document.user_id == current_user.id
-                ).first()
-                
-                if not document or not document.content:
-                    results.append({
-                        "document_id": doc_id,
-                        "success": False,
-                        "error": "Doküman bulunamadı veya içerik yok"
-                    })
-                    continue
-                
-                # Özet oluştur
-                summary, keywords = await ai_service.generate_summary_and_keywords(document.content)
-                
-                # Dokümanı güncelle
-                document.summary = summary
-                document.keywords = keywords
-                db.commit()
-                
+            outcome = outcomes.get(doc_id)
+            if outcome is None:
                 results.append({
                     "document_id": doc_id,
-                    "success": True,
-                    "summary": summary,
-                    "keywords": keywords
+                    "success": False,
+                    "error": "Doküman bulunamadı veya içerik yok"
                 })
-                
-            except Exception as e:
+            elif isinstance(outcome, Exception):
                 results.append({
                     "document_id": doc_id,
                     "success": False,
-                    "error": str(e)
+                    "error": str(outcome)
+                })
+            else:
+                summary, keywords = outcome
+                summaries.append((documents[doc_id], summary, keywords))
+                results.append({
+                    "document_id": doc_id,
+                    "success": True,
+                    "summary": summary,
+                    "keywords": keywords
                 })
         
+        # Tüm güncellemeleri tek seferde kaydet
+        await run_in_threadpool(DocumentService.save_summaries, db, summaries)
+        
         return {
             "results": results,
             "total_processed": len(document_ids),
@@ -222,19 +223,21 @@ async def batch_summarize_documents(
 
 @router.get("/statistics")
 async def get_summary_statistics(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Özet istatistikleri"""
     try:
-        total_documents = db.query(Document).filter(
-            Document.user_id == current_user.id
-        ).count()
+        total_documents = await db.scalar(
+            select(func.count(Document.id)).where(Document.user_id == current_user.id)
+        )
         
-        documents_with_summary = db.query(Document).filter(
-            Document.user_id == current_user.id,
-            Document.summary.isnot(None)
-        ).count()
+        documents_with_summary = await db.scalar(
+            select(func.count(Document.id)).where(
+                Document.user_id == current_user.id,
+                Document.summary.isnot(None)
+            )
+        )
         
         documents_without_summary = total_documents - documents_with_summary
         
@@ -249,4 +252,11 @@ async def get_summary_statistics(
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"İstatistik hatası: {str(e)}"
-        ) 
\ No newline at end of file
+        ) 
+
+@router.get("/cache/stats")
+async def get_ai_cache_statistics(
+    current_user: UserPrincipal = Depends(get_current_superuser)
+):
+    """AI sonuç önbelleği istatistikleri (tüm kullanıcıları kapsar, yalnızca yönetici)"""
+    return ai_result_cache.stats()
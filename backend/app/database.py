@@ -3,22 +3,81 @@ Veritabanı Konfigürasyonu
 =========================
 """
 
+from typing import AsyncIterator, Optional, Type
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
 from app.config import settings
+from app.pool_metrics import PoolMetrics, instrumented_pool_class
+
+# Havuz metrikleri (senkron ve async engine için ayrı)
+sync_pool_metrics = PoolMetrics()
+async_pool_metrics = PoolMetrics()
+
+def engine_options(database_url: str, base_pool: Type[Pool], metrics: PoolMetrics) -> dict:
+    """Ayarlardan engine/havuz parametrelerini oluştur
+
+    Bellek içi SQLite tek bağlantıyla çalıştığından havuz ayarları
+    uygulanmaz.
+    """
+    options = {"echo": settings.DB_ECHO}
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return options
+
+    options.update(
+        poolclass=instrumented_pool_class(base_pool, metrics),
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,    # Eski bağlantıları belirli aralıkla yenile
+        pool_pre_ping=settings.DB_POOL_PRE_PING  # Her checkout'ta bağlantı kontrolü (ek round-trip)
+    )
+    return options
 
 # Veritabanı engine oluştur
 engine = create_engine(
     settings.DATABASE_URL,
-    echo=settings.DEBUG,  # SQL loglarını göster
-    pool_pre_ping=True,   # Bağlantı kontrolü
-    pool_recycle=300      # 5 dakikada bir bağlantıyı yenile
+    **engine_options(settings.DATABASE_URL, QueuePool, sync_pool_metrics)
 )
 
 # Session factory oluştur
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async sürücü eşlemesi (senkron sürücü -> async sürücü)
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+def get_async_database_url(database_url: str) -> str:
+    """Senkron veritabanı adresinden async sürücü adresini türet"""
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"Async sürücüsü desteklenmeyen veritabanı: {backend}")
+    return url.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+# Async engine ilk kullanımda oluşturulur (sürücü yalnızca gerekirse yüklenir)
+_async_engine: Optional[AsyncEngine] = None
+
+def get_async_engine() -> AsyncEngine:
+    """Uygulama genelinde paylaşılan async engine"""
+    global _async_engine
+    if _async_engine is None:
+        database_url = settings.ASYNC_DATABASE_URL or get_async_database_url(settings.DATABASE_URL)
+        _async_engine = create_async_engine(
+            database_url,
+            **engine_options(database_url, AsyncAdaptedQueuePool, async_pool_metrics)
+        )
+    return _async_engine
+
+# Async session factory (engine çağrı anında bağlanır)
+AsyncSessionLocal = async_sessionmaker(class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 # Base class oluştur
 Base = declarative_base()
 
@@ -28,4 +87,27 @@ def get_db():
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """Async veritabanı session'ı döndür
+
+    Sorgular event loop'u bloklamaz; tek worker aynı anda çok sayıda
+    sorguyu bekleyebilir.
+    """
+    async with AsyncSessionLocal(bind=get_async_engine()) as db:
+        yield db
+
+async def dispose_async_engine() -> None:
+    """Async engine bağlantı havuzunu kapat"""
+    global _async_engine
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+
+def get_pool_stats() -> dict:
+    """Senkron ve async havuzların anlık durumu ve gecikme histogramları"""
+    stats = {"sync": sync_pool_metrics.snapshot(engine.pool)}
+    if _async_engine is not None:
+        stats["async"] = async_pool_metrics.snapshot(_async_engine.sync_engine.pool)
+    return stats
@@ -0,0 +1,60 @@
+"""
+Veritabanı Migration'ları
+=========================
+
+Şema Alembic migration'larıyla (`migrations/`) yönetilir ve uygulama
+başlangıcında son sürüme yükseltilir. Migration sistemi öncesinde
+`create_all` ile oluşturulmuş veritabanları, mevcut şemalarına karşılık
+gelen sürümle işaretlenip oradan yükseltilir.
+"""
+
+import os
+from typing import Optional
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
+from sqlalchemy.engine import Connection, Engine
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ALEMBIC_INI = os.path.join(BACKEND_DIR, "alembic.ini")
+MIGRATIONS_DIR = os.path.join(BACKEND_DIR, "migrations")
+
+def get_alembic_config(connection: Optional[Connection] = None) -> Config:
+    """Uygulama dizininden bağımsız Alembic yapılandırması"""
+    config = Config(ALEMBIC_INI)
+    config.set_main_option("script_location", MIGRATIONS_DIR)
+    if connection is not None:
+        config.attributes["connection"] = connection
+    return config
+
+def detect_unversioned_revision(connection: Connection) -> Optional[str]:
+    """Sürüm tablosu olmayan mevcut şemanın karşılık geldiği revizyon"""
+    inspector = inspect(connection)
+    tables = set(inspector.get_table_names())
+    if "alembic_version" in tables or "documents" not in tables:
+        return None
+    columns = {column["name"] for column in inspector.get_columns("documents")}
+    indexes = {index["name"] for index in inspector.get_indexes("documents")}
+    if "index_version" in columns:
+        return "0007"
+    if "document_keywords" in tables:
+        return "0006"
+    if "blobs" in tables:
+        return "0005"
+    if "document_chunks" in tables:
+        return "0004"
+    if "ix_documents_user_summarized" in indexes:
+        return "0003"
+    if "document_terms" in tables and "status" in columns:
+        return "0002"
+    return "0001"
+
+def upgrade_database(engine: Engine) -> None:
+    """Veritabanını son migration'a yükselt"""
+    with engine.begin() as connection:
+        config = get_alembic_config(connection)
+        revision = detect_unversioned_revision(connection)
+        if revision:
+            print(f"Sürümsüz veritabanı şeması {revision} olarak işaretleniyor")
+            command.stamp(config, revision)
+        command.upgrade(config, "head")
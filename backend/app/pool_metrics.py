@@ -0,0 +1,133 @@
+"""
+Bağlantı Havuzu Metrikleri
+==========================
+"""
+
+import threading
+import time
+from typing import Dict, Tuple, Type
+from sqlalchemy import event, exc
+from sqlalchemy.pool import Pool
+
+# Histogram kova sınırları (milisaniye)
+LATENCY_BUCKETS_MS: Tuple[float, ...] = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+class LatencyHistogram:
+    """Sabit kovalı, thread-safe gecikme histogramı"""
+
+    def __init__(self, buckets_ms: Tuple[float, ...] = LATENCY_BUCKETS_MS):
+        self.buckets_ms = buckets_ms
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts = [0] * (len(self.buckets_ms) + 1)
+            self._count = 0
+            self._sum_ms = 0.0
+            self._max_ms = 0.0
+
+    def observe(self, seconds: float) -> None:
+        """Bir ölçüm ekle"""
+        elapsed_ms = seconds * 1000
+        index = next(
+            (i for i, bound in enumerate(self.buckets_ms) if elapsed_ms <= bound),
+            len(self.buckets_ms)
+        )
+        with self._lock:
+            self._counts[index] += 1
+            self._count += 1
+            self._sum_ms += elapsed_ms
+            self._max_ms = max(self._max_ms, elapsed_ms)
+
+    def snapshot(self) -> dict:
+        """Kümülatif kova sayıları (Prometheus 'le' biçimi)"""
+        with self._lock:
+            counts = list(self._counts)
+            count, sum_ms, max_ms = self._count, self._sum_ms, self._max_ms
+
+        buckets: Dict[str, int] = {}
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets_ms, counts):
+            cumulative += bucket_count
+            buckets[f"le_{bound}ms"] = cumulative
+        buckets["le_inf"] = cumulative + counts[-1]
+        return {
+            "count": count,
+            "sum_ms": round(sum_ms, 3),
+            "avg_ms": round(sum_ms / count, 3) if count else 0.0,
+            "max_ms": round(max_ms, 3),
+            "buckets": buckets
+        }
+
+class PoolMetrics:
+    """Bir engine havuzunun bekleme/kullanım metrikleri
+
+    - wait: bağlantı istenmesinden alınmasına kadar geçen süre
+      (havuz doluysa kuyrukta bekleme dahil)
+    - checkout: bağlantının checkout'tan checkin'e kadar tutulduğu süre
+    """
+
+    def __init__(self):
+        self.wait = LatencyHistogram()
+        self.checkout = LatencyHistogram()
+        self.timeouts = 0
+        self.connects = 0
+
+    def reset(self) -> None:
+        self.wait.reset()
+        self.checkout.reset()
+        self.timeouts = 0
+        self.connects = 0
+
+    def snapshot(self, pool: Pool) -> dict:
+        """Anlık havuz durumu ve histogramlar"""
+        stats = {"pool_class": type(pool).__name__}
+        # QueuePool türevleri doluluk bilgisi verir; NullPool/StaticPool vermez
+        for name in ("size", "checkedin", "checkedout", "overflow"):
+            method = getattr(pool, name, None)
+            if callable(method):
+                stats[name] = method()
+        stats.update({
+            "timeouts": self.timeouts,
+            "connects": self.connects,
+            "wait": self.wait.snapshot(),
+            "checkout": self.checkout.snapshot()
+        })
+        return stats
+
+def instrumented_pool_class(base: Type[Pool], metrics: PoolMetrics) -> Type[Pool]:
+    """Bekleme süresini ölçen havuz sınıfı üret
+
+    Pool.recreate() (ör. engine.dispose) aynı sınıfı kullandığı için
+    metrikler yeniden oluşturulan havuzda da toplanmaya devam eder.
+    """
+
+    class InstrumentedPool(base):
+        def _do_get(self):
+            started = time.perf_counter()
+            try:
+                record = super()._do_get()
+            except exc.TimeoutError:
+                metrics.timeouts += 1
+                raise
+            metrics.wait.observe(time.perf_counter() - started)
+            return record
+
+    InstrumentedPool.__name__ = InstrumentedPool.__qualname__ = f"Instrumented{base.__name__}"
+
+    @event.listens_for(InstrumentedPool, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        metrics.connects += 1
+
+    @event.listens_for(InstrumentedPool, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        connection_record.info["checkout_started"] = time.perf_counter()
+
+    @event.listens_for(InstrumentedPool, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        started = connection_record.info.pop("checkout_started", None)
+        if started is not None:
+            metrics.checkout.observe(time.perf_counter() - started)
+
+    return InstrumentedPool
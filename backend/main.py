@@ -5,25 +5,61 @@ Doküman Yönetim Sistemi - Ana Uygulama
 FastAPI tabanlı backend uygulaması
 """
 
-from fastapi import FastAPI, HTTPException
+import asyncio
+import threading
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 import uvicorn
 from contextlib import asynccontextmanager
 
-from app.database import engine, Base
+from app.database import dispose_async_engine, engine, get_pool_stats, SessionLocal
+from app.migrations import upgrade_database
 from app.config import settings
+from api.deps import get_current_superuser
 from api.routes import auth, documents, search, summary
+from models.document import NEXT_CURSOR_HEADER
+from services.ai_service import get_ai_service
+from services.extraction_service import extraction_engine
+from services.ingestion_service import IngestionService
+from services.search_service import SearchIndexService
+
+def backfill_search_index(stop: threading.Event) -> None:
+    """İndekslenmemiş dokümanları arama indeksine ekle (arka planda, parti parti)"""
+    db = SessionLocal()
+    try:
+        SearchIndexService.reindex_missing(db, stop=stop)
+    except Exception as e:
+        print(f"Arama indeksi geriye dönük doldurma hatası: {e}")
+    finally:
+        db.close()
 
 # Veritabanı tablolarını oluştur
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Uygulama başlangıcında
-    Base.metadata.create_all(bind=engine)
+    # Uygulama başlangıcında şemayı migration'larla güncelle
+    upgrade_database(engine)
+    
+    # İndekslenmemiş dokümanları arka planda arama indeksine ekle;
+    # başlangıç korpus boyutu kadar beklemez
+    backfill_stop = threading.Event()
+    backfill = asyncio.create_task(run_in_threadpool(backfill_search_index, backfill_stop))
+    
+    # Yarım kalmış doküman işleme işlerini yeniden başlat
+    IngestionService.resume_pending(engine)
+    
+    # Paylaşılan AI istemcisini oluştur ve bağlantıyı ısıt
+    ai_service = get_ai_service()
+    if settings.GEMINI_WARMUP:
+        await ai_service.warm_up()
     yield
-    # Uygulama kapanışında
-    pass
+    # Uygulama kapanışında (doldurma mevcut partiyi bitirip durur)
+    backfill_stop.set()
+    await backfill
+    extraction_engine.shutdown()
+    await dispose_async_engine()
 
 # FastAPI uygulamasını oluştur
 app = FastAPI(
@@ -40,6 +76,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "Content-Disposition"],
 )
 
 # API route'larını dahil et
@@ -48,8 +85,7 @@ app.include_router(documents.router, prefix="/api/documents", tags=["Documents"]
 app.include_router(search.router, prefix="/api/search", tags=["Search"])
 app.include_router(summary.router, prefix="/api/summary", tags=["Summary"])
 
-# Statik dosyalar için
-app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
+# Statik dosyalar için (yüklenen dosyalar yalnızca yetkili indirme uç noktasından sunulur)
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
 @app.get("/")
@@ -62,6 +98,14 @@ async def health_check():
     """Sağlık kontrolü"""
     return {"status": "healthy"}
 
+@app.get("/health/pool", dependencies=[Depends(get_current_superuser)])
+async def pool_health():
+    """Veritabanı bağlantı havuzu metrikleri (doluluk, bekleme ve kullanım süreleri)
+
+    Havuz iç durumunu açığa çıkardığından yalnızca yöneticiye açıktır.
+    """
+    return get_pool_stats()
+
 if __name__ == "__main__":
     uvicorn.run(
         "main:app",
@@ -0,0 +1,63 @@
+"""
+Alembic Ortamı
+==============
+
+Uygulama içinden çalıştırıldığında (app/migrations.py) hazır bağlantı
+`config.attributes["connection"]` üzerinden gelir; komut satırından
+çalıştırıldığında `app.config.settings.DATABASE_URL` kullanılır.
+"""
+
+from logging.config import fileConfig
+from alembic import context
+from sqlalchemy import engine_from_config, pool
+from app.config import settings
+from app.database import Base
+import models.blob  # noqa: F401  (tabloları metadata'ya kaydet)
+import models.document  # noqa: F401
+import models.search_index  # noqa: F401
+import models.user  # noqa: F401
+
+config = context.config
+target_metadata = Base.metadata
+
+def run_migrations_offline() -> None:
+    """SQL çıktısı üret (veritabanına bağlanmadan)"""
+    context.configure(
+        url=config.get_main_option("sqlalchemy.url") or settings.DATABASE_URL,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        render_as_batch=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_with_connection(connection) -> None:
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        render_as_batch=connection.dialect.name == "sqlite",  # SQLite ALTER kısıtları
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_online() -> None:
+    """Migration'ları veritabanına uygula"""
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        run_migrations_with_connection(connection)
+        return
+
+    if config.config_file_name is not None:
+        fileConfig(config.config_file_name)
+
+    section = config.get_section(config.config_ini_section, {})
+    section.setdefault("sqlalchemy.url", settings.DATABASE_URL)
+    connectable = engine_from_config(section, prefix="sqlalchemy.", poolclass=pool.NullPool)
+    with connectable.connect() as connection:
+        run_migrations_with_connection(connection)
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,51 @@
+"""search index and processing status
+
+Ters indeks tablosu, BM25 doküman uzunluğu, arka plan işleme durumu ve
+imleçli sayfalama indeksi.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 10:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('documents') as batch_op:
+        batch_op.add_column(sa.Column('term_count', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('status', sa.String(), server_default='ready', nullable=False))
+        batch_op.add_column(sa.Column('processing_error', sa.Text(), nullable=True))
+    op.create_index('ix_documents_user_created_id', 'documents', ['user_id', 'created_at', 'id'], unique=False)
+
+    op.create_table(
+        'document_terms',
+        sa.Column('document_id', sa.Integer(), nullable=False),
+        sa.Column('term', sa.String(length=64), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('term_frequency', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['document_id'], ['documents.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('document_id', 'term')
+    )
+    op.create_index('ix_document_terms_user_term', 'document_terms', ['user_id', 'term'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_document_terms_user_term', table_name='document_terms')
+    op.drop_table('document_terms')
+    op.drop_index('ix_documents_user_created_id', table_name='documents')
+    with op.batch_alter_table('documents') as batch_op:
+        batch_op.drop_column('processing_error')
+        batch_op.drop_column('status')
+        batch_op.drop_column('term_count')
@@ -0,0 +1,40 @@
+"""documents hot path indexes
+
+Kullanıcı bazlı erişim yolları için bileşik indeksler ve özetlenmiş
+dokümanlar için kısmi indeks.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 10:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_documents_user_id_id', 'documents', ['user_id', 'id'], unique=False)
+    op.create_index('ix_documents_user_file_type', 'documents', ['user_id', 'file_type'], unique=False)
+    op.create_index(
+        'ix_documents_user_summarized',
+        'documents',
+        ['user_id', 'id'],
+        unique=False,
+        sqlite_where=sa.text('summary IS NOT NULL'),
+        postgresql_where=sa.text('summary IS NOT NULL')
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_documents_user_summarized', table_name='documents')
+    op.drop_index('ix_documents_user_file_type', table_name='documents')
+    op.drop_index('ix_documents_user_id_id', table_name='documents')
@@ -0,0 +1,37 @@
+"""document chunks
+
+Soru-cevap bağlamı için parça bazlı (BM25) indeks tablosu.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 10:15:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'document_chunks',
+        sa.Column('document_id', sa.Integer(), nullable=False),
+        sa.Column('position', sa.Integer(), nullable=False),
+        sa.Column('content', sa.Text(), nullable=False),
+        sa.Column('term_count', sa.Integer(), nullable=False),
+        sa.Column('term_frequencies', sa.JSON(), nullable=False),
+        sa.ForeignKeyConstraint(['document_id'], ['documents.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('document_id', 'position')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('document_chunks')
@@ -0,0 +1,41 @@
+"""document keywords
+
+Anahtar kelime filtresi ve faset sayımları için yapılandırılmış
+(doküman, anahtar kelime, ağırlık) tablosu. Mevcut dokümanların
+anahtar kelimeleri başlangıçta `reindex_missing` ile doldurulur.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 10:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'document_keywords',
+        sa.Column('document_id', sa.Integer(), nullable=False),
+        sa.Column('keyword', sa.String(length=128), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('weight', sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(['document_id'], ['documents.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('document_id', 'keyword')
+    )
+    op.create_index('ix_document_keywords_user_keyword', 'document_keywords', ['user_id', 'keyword'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_document_keywords_user_keyword', table_name='document_keywords')
+    op.drop_table('document_keywords')
@@ -0,0 +1,33 @@
+"""document index version
+
+Dokümanın türetilmiş indekslerinin (terimler, parçalar, anahtar
+kelimeler) yazıldığını gösteren işaret. Geriye dönük doldurma yalnızca
+işaretsiz dokümanları tarar; hiç terim, parça veya anahtar kelime
+üretmeyen dokümanlar her başlangıçta yeniden işlenmez.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('documents') as batch_op:
+        batch_op.add_column(sa.Column('index_version', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('documents') as batch_op:
+        batch_op.drop_column('index_version')
@@ -0,0 +1,18 @@
+"""
+Dosya İçeriği (Blob) Modeli
+===========================
+"""
+
+from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy.sql import func
+from app.database import Base
+
+class Blob(Base):
+    """İçerik özetiyle adreslenen, dokümanlar arasında paylaşılan dosya"""
+    __tablename__ = "blobs"
+
+    digest = Column(String(64), primary_key=True)  # SHA-256 (hex)
+    file_path = Column(String, nullable=False)
+    file_size = Column(Integer, nullable=False)  # bytes
+    ref_count = Column(Integer, nullable=False, default=1)  # Dosyayı kullanan doküman sayısı
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
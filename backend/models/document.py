@@ -3,7 +3,8 @@ Doküman Modeli
 ==============
 """
 
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Float
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Float, Index, text
+from sqlalchemy.dialects import sqlite
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -11,9 +12,41 @@ from pydantic import BaseModel
 from typing import Optional, List
 from datetime import datetime
 
+class DocumentStatus:
+    """Doküman işleme durumları"""
+    QUEUED = "queued"          # Dosya kaydedildi, işlenmeyi bekliyor
+    EXTRACTING = "extracting"  # Metin çıkarılıyor
+    READY = "ready"            # İçerik hazır
+    FAILED = "failed"          # İşleme başarısız
+
+# SQLite'ta zaman damgaları CURRENT_TIMESTAMP ile aynı biçimde saklanır;
+# böylece sayfalama imlecindeki değer kayıtlı değerle birebir karşılaştırılır
+Timestamp = DateTime(timezone=True).with_variant(
+    sqlite.DATETIME(
+        storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d"
+    ),
+    "sqlite"
+)
+
 class Document(Base):
     """Doküman veritabanı modeli"""
     __tablename__ = "documents"
+    __table_args__ = (
+        # Kullanıcı bazlı listeleme ve imleçli sayfalama (index range seek)
+        Index("ix_documents_user_created_id", "user_id", "created_at", "id"),
+        # Kullanıcının dokümanı (id ile) ve toplu yüklemeler
+        Index("ix_documents_user_id_id", "user_id", "id"),
+        # Dosya türü filtresi
+        Index("ix_documents_user_file_type", "user_id", "file_type"),
+        # Aynı içerikli (işlenmiş) dokümanın bulunması
+        Index("ix_documents_content_hash", "content_hash"),
+        # Özetlenmiş dokümanlar (kısmi indeks)
+        Index(
+            "ix_documents_user_summarized", "user_id", "id",
+            sqlite_where=text("summary IS NOT NULL"),
+            postgresql_where=text("summary IS NOT NULL")
+        ),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
@@ -21,11 +54,16 @@ class Document(Base):
     file_path = Column(String, nullable=False)
     file_size = Column(Integer, nullable=False)  # bytes
     file_type = Column(String, nullable=False)   # pdf, docx, txt
+    content_hash = Column(String(64), nullable=True)  # Dosya içeriğinin SHA-256 özeti (blobs.digest)
     content = Column(Text, nullable=True)        # Çıkarılan metin
     summary = Column(Text, nullable=True)        # AI özeti
-    keywords = Column(Text, nullable=True)       # Anahtar kelimeler (JSON)
+    keywords = Column(Text, nullable=True)       # Anahtar kelimeler (virgülle ayrılmış; bkz. document_keywords)
+    term_count = Column(Integer, nullable=True)  # İndekslenen terim sayısı (BM25 doküman uzunluğu)
+    index_version = Column(Integer, nullable=True)  # Türetilmiş indekslerin yazıldığı sürüm (geriye dönük doldurma işareti)
+    status = Column(String, nullable=False, default=DocumentStatus.READY, server_default=DocumentStatus.READY)
+    processing_error = Column(Text, nullable=True)  # İşleme hatası (status=failed)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(Timestamp, server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     # İlişkiler
@@ -55,6 +93,8 @@ class DocumentResponse(BaseModel):
     content: Optional[str] = None
     summary: Optional[str] = None
     keywords: Optional[str] = None
+    status: str = DocumentStatus.READY
+    processing_error: Optional[str] = None
     user_id: int
     created_at: datetime
     updated_at: Optional[datetime] = None
@@ -62,6 +102,45 @@ class DocumentResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class DocumentListItem(BaseModel):
+    """Doküman liste öğesi şeması
+
+    Liste ve arama yanıtlarında kullanılır; büyük metin alanları
+    (`content`, `summary`) veritabanından hiç okunmaz. Bu alanlar
+    `fields=` parametresiyle veya tekil doküman endpoint'inden alınır.
+    """
+    id: int
+    title: str
+    filename: str
+    file_size: int
+    file_type: str
+    keywords: Optional[str] = None
+    status: str = DocumentStatus.READY
+    processing_error: Optional[str] = None
+    user_id: int
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+# Liste yanıtlarına istek üzerine eklenebilen büyük alanlar
+DOCUMENT_DEFERRED_FIELDS = ("content", "summary")
+
+# Sonraki sayfa imlecinin döndürüldüğü yanıt başlığı
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# `fields=` sorgu parametresi deseni (ör. "summary" veya "content,summary")
+DOCUMENT_FIELDS_PATTERN = "^(content|summary)(,(content|summary))*$"
+
+class DocumentStatusResponse(BaseModel):
+    """Doküman işleme durumu şeması"""
+    document_id: int
+    status: str
+    processing_error: Optional[str] = None
+    has_content: bool
+    has_summary: bool
+
 class DocumentSearch(BaseModel):
     """Doküman arama şeması"""
     query: str
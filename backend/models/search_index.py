@@ -0,0 +1,54 @@
+"""
+Arama İndeksi Modeli
+====================
+"""
+
+from sqlalchemy import Column, Float, Integer, String, Text, ForeignKey, Index, JSON
+from pydantic import BaseModel
+from app.database import Base
+
+# Saklanan anahtar kelimenin azami uzunluğu
+MAX_KEYWORD_LENGTH = 128
+
+class DocumentTerm(Base):
+    """Ters indeks kaydı (terim -> doküman)"""
+    __tablename__ = "document_terms"
+
+    document_id = Column(Integer, ForeignKey("documents.id", ondelete="CASCADE"), primary_key=True)
+    term = Column(String(64), primary_key=True)  # Normalize edilmiş terim
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    term_frequency = Column(Integer, nullable=False, default=1)
+
+    __table_args__ = (
+        # Kullanıcı bazlı terim (ve önek) aramaları için
+        Index("ix_document_terms_user_term", "user_id", "term"),
+    )
+
+class DocumentChunk(Base):
+    """Soru-cevap için indekslenmiş doküman parçası"""
+    __tablename__ = "document_chunks"
+
+    document_id = Column(Integer, ForeignKey("documents.id", ondelete="CASCADE"), primary_key=True)
+    position = Column(Integer, primary_key=True)  # Dokümandaki sıra (0'dan başlar)
+    content = Column(Text, nullable=False)
+    term_count = Column(Integer, nullable=False, default=0)  # BM25 parça uzunluğu
+    term_frequencies = Column(JSON, nullable=False)  # Normalize terim -> frekans
+
+class DocumentKeyword(Base):
+    """Dokümanın yapılandırılmış anahtar kelimesi (etiket indeksi)"""
+    __tablename__ = "document_keywords"
+
+    document_id = Column(Integer, ForeignKey("documents.id", ondelete="CASCADE"), primary_key=True)
+    keyword = Column(String(MAX_KEYWORD_LENGTH), primary_key=True)  # Türkçe kurallarıyla küçültülmüş
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    weight = Column(Float, nullable=False, default=1.0)  # Listedeki sıraya göre (ilk: 1.0)
+
+    __table_args__ = (
+        # Kullanıcı bazlı etiket filtresi ve faset sayımları için
+        Index("ix_document_keywords_user_keyword", "user_id", "keyword"),
+    )
+
+class KeywordFacet(BaseModel):
+    """Anahtar kelime faseti şeması"""
+    keyword: str
+    count: int
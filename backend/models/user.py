@@ -54,6 +54,22 @@ class UserResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class UserPrincipal(BaseModel):
+    """Kimliği doğrulanmış istek sahibi
+
+    Korumalı endpoint'lerin ihtiyaç duyduğu kullanıcı bilgileri; önbellekte
+    veya (stateless modda) token içinde taşınır.
+    """
+    id: int
+    email: str
+    username: str
+    is_active: bool = True
+    is_superuser: bool = False
+    
+    class Config:
+        from_attributes = True
+        frozen = True
+
 class UserLogin(BaseModel):
     """Kullanıcı giriş şeması"""
     email: str
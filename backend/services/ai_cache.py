@@ -0,0 +1,157 @@
+"""
+AI Sonuç Önbelleği
+==================
+
+Özet ve soru-cevap sonuçlarını (model, prompt sürümü, içerik, soru)
+özetinden türetilen anahtarla saklar. Aynı içerik farklı kullanıcılar
+tarafından yüklense bile LLM yalnızca bir kez çağrılır.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+from app.config import settings
+
+class CacheBackend:
+    """Önbellek arka ucu arayüzü"""
+
+    name = "none"
+
+    async def get(self, key: str) -> Optional[str]:
+        return None
+
+    async def set(self, key: str, value: str, ttl: int) -> None:
+        return None
+
+    async def clear(self) -> None:
+        return None
+
+class InMemoryCacheBackend(CacheBackend):
+    """Süre sınırlı, süreç içi LRU önbellek"""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    async def set(self, key: str, value: str, ttl: int) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    async def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class RedisCacheBackend(CacheBackend):
+    """Redis tabanlı paylaşımlı önbellek (tüm worker'lar arasında)"""
+
+    name = "redis"
+
+    def __init__(self, url: str, prefix: str = "ai-cache:"):
+        import redis.asyncio as redis
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+
+    async def get(self, key: str) -> Optional[str]:
+        try:
+            value = await self._client.get(self.prefix + key)
+        except Exception as e:
+            print(f"Redis önbellek okunamadı: {e}")
+            return None
+        return value.decode("utf-8") if value is not None else None
+
+    async def set(self, key: str, value: str, ttl: int) -> None:
+        try:
+            await self._client.set(self.prefix + key, value, ex=ttl)
+        except Exception as e:
+            print(f"Redis önbelleğe yazılamadı: {e}")
+
+    async def clear(self) -> None:
+        try:
+            async for key in self._client.scan_iter(match=self.prefix + "*"):
+                await self._client.delete(key)
+        except Exception as e:
+            print(f"Redis önbellek temizlenemedi: {e}")
+
+class AIResultCache:
+    """AI sonuç önbelleği (isabet/ıskalama sayaçlarıyla)"""
+
+    def __init__(self, backend: CacheBackend, ttl: int):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(*parts: str) -> str:
+        """Parçalardan içerik adresli önbellek anahtarı üret"""
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\x1f")
+        return digest.hexdigest()
+
+    async def get(self, key: str) -> Optional[Any]:
+        value = await self.backend.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(value)
+
+    async def set(self, key: str, value: Any) -> None:
+        await self.backend.set(key, json.dumps(value, ensure_ascii=False), self.ttl)
+
+    async def clear(self) -> None:
+        await self.backend.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict:
+        """Önbellek istatistikleri"""
+        total = self.hits + self.misses
+        return {
+            "backend": self.backend.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / total) if total > 0 else 0
+        }
+
+def create_cache_backend() -> CacheBackend:
+    """Ayarlara göre önbellek arka ucunu oluştur"""
+    backend = settings.AI_CACHE_BACKEND.lower()
+    if backend == "redis":
+        try:
+            return RedisCacheBackend(settings.REDIS_URL)
+        except ImportError:
+            print("redis paketi bulunamadı, süreç içi önbellek kullanılacak")
+            return InMemoryCacheBackend(settings.AI_CACHE_MAX_ENTRIES)
+    if backend == "memory":
+        return InMemoryCacheBackend(settings.AI_CACHE_MAX_ENTRIES)
+    return CacheBackend()
+
+# Uygulama genelinde paylaşılan önbellek
+ai_result_cache = AIResultCache(create_cache_backend(), settings.AI_CACHE_TTL)
@@ -3,10 +3,60 @@ AI Servisi - Gemini API Entegrasyonu
 ====================================
 """
 
+import asyncio
 import json
+import threading
+import weakref
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 import google.generativeai as genai
-from typing import Tuple, List
+from fastapi.concurrency import run_in_threadpool
+from typing import Dict, Hashable, Optional, Tuple, List, Union
 from app.config import settings
+from services.ai_cache import ai_result_cache
+from services.chunking import estimate_tokens, split_into_chunks
+from services.extractive import summarize as summarize_extractive
+from services.keywords import CorpusStatistics, extract_keywords
+from services.ranking import BM25Scorer
+from services.text_analysis import term_frequency, tokenize
+
+# Prompt şablonları değiştiğinde artırılır; eski önbellek kayıtları geçersizleşir
+# (3: parça tabanlı soru-cevap prompt'u)
+PROMPT_TEMPLATE_VERSION = "3"
+
+# Async API kullanılamadığında senkron çağrılar için sınırlı thread havuzu
+_generation_executor = ThreadPoolExecutor(
+    max_workers=settings.GEMINI_THREAD_POOL_SIZE,
+    thread_name_prefix="gemini"
+)
+
+# Event loop başına eşzamanlılık sınırı (semaphore'lar loop'a bağlıdır)
+_generation_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+    weakref.WeakKeyDictionary()
+)
+
+def _generation_semaphore() -> asyncio.Semaphore:
+    """Çalışan event loop için Gemini eşzamanlılık semaphore'unu döndür"""
+    loop = asyncio.get_running_loop()
+    semaphore = _generation_semaphores.get(loop)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(settings.GEMINI_MAX_CONCURRENCY)
+        _generation_semaphores[loop] = semaphore
+    return semaphore
+
+# Basit aramada terim istatistikleri saklanan doküman metni sayısı
+DOCUMENT_STATISTICS_CACHE_SIZE = 256
+
+@lru_cache(maxsize=DOCUMENT_STATISTICS_CACHE_SIZE)
+def _document_statistics(document: str) -> Tuple[Dict[str, int], int]:
+    """Doküman metninin terim frekansları ve uzunluğu
+
+    Aynı metin sonraki sorgularda yeniden taranmaz. Dönen sözlük
+    paylaşıldığından değiştirilmemelidir.
+    """
+    term_counts = Counter(tokenize(document))
+    return dict(term_counts), sum(term_counts.values())
 
 class AIService:
     """AI servisi - Gemini API entegrasyonu"""
@@ -14,6 +64,7 @@ class AIService:
     def __init__(self):
         """AI servisi başlat"""
         self.use_gemini = bool(settings.GEMINI_API_KEY and settings.GEMINI_API_KEY != "your-gemini-api-key-here")
+        self.model_name = None
         
         if self.use_gemini:
             try:
@@ -24,12 +75,14 @@ class AIService:
                     model_name = "gemini-1.5-pro"
                 
                 self.model = genai.GenerativeModel(model_name)
+                self.model_name = model_name
                 print(f"Gemini model başlatıldı: {model_name}")
             except Exception as e:
                 print(f"Gemini API hatası: {e}")
                 # Fallback olarak eski model adını dene
                 try:
                     self.model = genai.GenerativeModel("gemini-pro")
+                    self.model_name = "gemini-pro"
                     print("Fallback model kullanılıyor: gemini-pro")
                 except Exception as e2:
                     print(f"Fallback model de başarısız: {e2}")
@@ -37,95 +90,236 @@ class AIService:
         else:
             print("Gemini API anahtarı bulunamadı, basit özetleme kullanılacak")
     
-    async def generate_summary_and_keywords(self, content: str) -> Tuple[str, str]:
-        """Metin özeti ve anahtar kelimeler oluştur"""
+    def _cache_key(self, kind: str, *parts: str) -> str:
+        """Model, prompt sürümü ve girdilerden önbellek anahtarı üret"""
+        return ai_result_cache.make_key(str(self.model_name), PROMPT_TEMPLATE_VERSION, kind, *parts)
+    
+    async def generate_summary_and_keywords(
+        self,
+        content: str,
+        corpus: Optional[CorpusStatistics] = None
+    ) -> Tuple[str, str]:
+        """Metin özeti ve anahtar kelimeler oluştur
+
+        `corpus` verilirse Gemini'sız özetlemede anahtar kelimeler
+        kullanıcının korpusuna göre TF-IDF ile ağırlıklandırılır.
+        """
+        if not self.use_gemini:
+            # Geliştirilmiş basit özetleme
+            return await run_in_threadpool(self._enhanced_simple_summary_and_keywords, content, corpus)
+        
+        cache_key = self._cache_key("summary", content)
+        cached = await ai_result_cache.get(cache_key)
+        if cached is not None:
+            return cached[0], cached[1]
+        
         try:
-            if self.use_gemini:
-                # Gemini API ile detaylı özetleme
-                summary_prompt = f"""
-                Aşağıdaki metni Türkçe olarak detaylı bir şekilde özetle. 
-                
-                ÖNEMLİ: Sadece makale başlığı, yazar bilgileri veya kaynakça kısmını özetleme. 
-                Metnin ana içeriğini, bulgularını, sonuçlarını ve önemli noktalarını özetle.
-                
-                Özet şu özelliklere sahip olmalı:
-                1. Makalenin ana konusu ve amacı
-                2. Kullanılan araştırma yöntemi
-                3. Ana bulgular ve sonuçlar
-                4. Önemli veriler ve istatistikler
-                5. Makalenin katkısı ve önemi
-                
-                Özet 300-400 kelime arasında olsun ve metnin gerçek içeriğini yansıtsın:
-                
-                {content}
-                """
-                
-                summary_response = await self._generate_text(summary_prompt)
-                summary = summary_response.strip()
-                
-                # Anahtar kelimeler çıkar
-                keywords_prompt = f"""
-                Aşağıdaki metinden en önemli 15 anahtar kelimeyi ve kavramı Türkçe olarak çıkar. 
-                
-                ÖNEMLİ: Sadece makale başlığı veya kaynakça kısmından değil, metnin ana içeriğinden anahtar kelimeler çıkar.
-                Teknik terimler, kavramlar, araştırma yöntemleri ve önemli bulgular dahil et.
-                Sadece kelimeleri virgülle ayırarak listele:
-                
-                {content}
-                """
-                
-                keywords_response = await self._generate_text(keywords_prompt)
-                keywords = keywords_response.strip()
-                
-                return summary, keywords
-            else:
-                # Geliştirilmiş basit özetleme
-                return self._enhanced_simple_summary_and_keywords(content)
-                
+            # Uzun dokümanlar önce parça parça özetlenir (map), final özet
+            # parça özetlerinden üretilir (reduce)
+            source = content
+            if estimate_tokens(content) > settings.SUMMARY_CHUNK_TOKENS:
+                source = await self._reduce_to_chunk_summaries(content)
+            
+            # Tek çağrıda özet + anahtar kelime; yanıt çözümlenemezse iki çağrıya düş
+            result = None
+            if settings.GEMINI_COMBINED_SUMMARY:
+                result = await self._generate_combined_summary_and_keywords(source)
+            if result is None:
+                result = await self._generate_summary_and_keywords_separately(source)
         except Exception as e:
-            # Hata durumunda geliştirilmiş basit özetleme kullan
-            return self._enhanced_simple_summary_and_keywords(content)
-    
-    def _enhanced_simple_summary_and_keywords(self, content: str) -> Tuple[str, str]:
-        """Geliştirilmiş basit özetleme ve anahtar kelime çıkarma"""
-        # Metni paragraflara böl
-        paragraphs = content.split('\n\n')
-        
-        # İlk 10 paragrafı al (daha fazla içerik için)
-        summary_paragraphs = paragraphs[:10]
-        summary = '\n\n'.join(summary_paragraphs)
-        
-        # Eğer çok uzunsa kısalt ama daha fazla içerik bırak
-        if len(summary) > 1500:
-            sentences = summary.split('.')
-            summary = '. '.join(sentences[:12]) + '.'
-        
-        # Geliştirilmiş anahtar kelime çıkarma
-        words = content.lower().split()
-        word_freq = {}
-        
-        # Türkçe stop words genişletildi
-        stop_words = {
-            've', 'bir', 'bu', 'da', 'de', 'ile', 'için', 'olarak', 'gibi', 'kadar', 'daha', 'en', 'çok', 'az', 
-            'bazı', 'her', 'hiç', 'yok', 'var', 'olmak', 'oldu', 'olacak', 'ise', 'ama', 'fakat', 'ancak', 
-            'lakin', 'çünkü', 'zira', 'madem', 'mademki', 'şu', 'o', 'bu', 'şu', 'bunlar', 'onlar', 'biz', 
-            'siz', 'onlar', 'ben', 'sen', 'o', 'bizim', 'sizin', 'onların', 'benim', 'senin', 'onun',
-            'için', 'tarafından', 'hakkında', 'üzerinde', 'altında', 'yanında', 'karşısında', 'önünde',
-            'arkasında', 'içinde', 'dışında', 'arasında', 'yukarıda', 'aşağıda', 'sağında', 'solunda',
-            'öncesinde', 'sonrasında', 'sırasında', 'esnasında', 'zamanında', 'vaktinde', 'sırasında',
-            'gibi', 'kadar', 'dolayı', 'sebebiyle', 'nedeniyle', 'yüzünden', 'sayesinde', 'beraber',
-            'birlikte', 'yanında', 'karşısında', 'önünde', 'arkasında', 'içinde', 'dışında', 'arasında'
-        }
-        
-        for word in words:
-            # Kelime temizleme
-            word = word.strip('.,!?;:()[]{}"\'').strip()
-            if len(word) > 3 and word not in stop_words and not word.isdigit():
-                word_freq[word] = word_freq.get(word, 0) + 1
-        
-        # En sık geçen 15 kelimeyi al
-        keywords = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)[:15]
-        keywords_str = ', '.join([word for word, freq in keywords])
+            # Hata durumunda geliştirilmiş basit özetleme kullan (önbelleğe alınmaz)
+            return await run_in_threadpool(self._enhanced_simple_summary_and_keywords, content, corpus)
+        
+        await ai_result_cache.set(cache_key, list(result))
+        return result
+    
+    async def _reduce_to_chunk_summaries(self, content: str) -> str:
+        """Metni parçalara böl, parçaları eşzamanlı özetle ve birleştir
+
+        Parça özetleri de sınırı aşıyorsa aynı işlem özetler üzerinde
+        tekrarlanır. Eşzamanlılık Gemini semaphore'u ile sınırlıdır.
+        """
+        while estimate_tokens(content) > settings.SUMMARY_CHUNK_TOKENS:
+            chunks = split_into_chunks(content, settings.SUMMARY_CHUNK_TOKENS)
+            summaries = await asyncio.gather(*(self._summarize_chunk(chunk) for chunk in chunks))
+            reduced = "\n\n".join(summaries)
+            # Özetler kısalmıyorsa döngüyü sonlandır
+            if len(chunks) == 1 or estimate_tokens(reduced) >= estimate_tokens(content):
+                return reduced
+            content = reduced
+        return content
+    
+    async def _summarize_chunk(self, chunk: str) -> str:
+        """Tek bir parçayı özetle (parça içeriğine göre önbelleğe alınır)
+
+        Düzenlenen dokümanda yalnızca değişen parçalar yeniden özetlenir.
+        """
+        cache_key = self._cache_key("chunk_summary", chunk)
+        cached = await ai_result_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        chunk_prompt = f"""
+        Aşağıdaki metin uzun bir dokümanın bir bölümüdür. Bu bölümü Türkçe olarak özetle.
+        
+        Bölümdeki ana fikirleri, yöntemleri, bulguları, önemli verileri ve istatistikleri koru.
+        Özet 150-200 kelime arasında olsun; yalnızca özet metnini yaz:
+        
+        {chunk}
+        """
+        
+        summary = (await self._generate_text(chunk_prompt)).strip()
+        await ai_result_cache.set(cache_key, summary)
+        return summary
+    
+    async def _generate_combined_summary_and_keywords(self, content: str) -> Optional[Tuple[str, str]]:
+        """Özet ve anahtar kelimeleri tek bir JSON yanıtıyla oluştur"""
+        combined_prompt = f"""
+        Aşağıdaki metni Türkçe olarak detaylı bir şekilde özetle ve metinden en önemli 15 anahtar kelimeyi çıkar.
+        
+        ÖNEMLİ: Sadece makale başlığı, yazar bilgileri veya kaynakça kısmını özetleme. 
+        Metnin ana içeriğini, bulgularını, sonuçlarını ve önemli noktalarını özetle.
+        
+        Özet şu özelliklere sahip olmalı:
+        1. Makalenin ana konusu ve amacı
+        2. Kullanılan araştırma yöntemi
+        3. Ana bulgular ve sonuçlar
+        4. Önemli veriler ve istatistikler
+        5. Makalenin katkısı ve önemi
+        
+        Özet 300-400 kelime arasında olsun ve metnin gerçek içeriğini yansıtsın.
+        Anahtar kelimeler teknik terimleri, kavramları, araştırma yöntemlerini ve önemli bulguları içersin.
+        
+        Yanıtı yalnızca şu formatta geçerli bir JSON nesnesi olarak ver, başka açıklama ekleme:
+        {{"summary": "özet metni", "keywords": ["kelime1", "kelime2"]}}
+        
+        {content}
+        """
+        
+        response = await self._generate_text(combined_prompt)
+        return self._parse_summary_payload(response)
+    
+    @staticmethod
+    def _parse_summary_payload(response: str) -> Optional[Tuple[str, str]]:
+        """Birleşik özet yanıtını doğrula ve (özet, anahtar kelimeler) döndür
+
+        Yanıt geçerli değilse None döner.
+        """
+        text = response.strip()
+        # Model yanıtı ```json ... ``` bloğu içinde döndürebilir
+        if text.startswith("```"):
+            text = text.strip("`").strip()
+            if text.lower().startswith("json"):
+                text = text[4:]
+        
+        try:
+            payload = json.loads(text)
+        except (json.JSONDecodeError, ValueError):
+            return None
+        if not isinstance(payload, dict):
+            return None
+        
+        summary = payload.get("summary")
+        keywords = payload.get("keywords")
+        if not isinstance(summary, str) or not summary.strip():
+            return None
+        if isinstance(keywords, str):
+            keywords = keywords.split(",")
+        if not isinstance(keywords, list):
+            return None
+        
+        keyword_list = [str(keyword).strip() for keyword in keywords if str(keyword).strip()]
+        if not keyword_list:
+            return None
+        return summary.strip(), ", ".join(keyword_list[:15])
+    
+    async def _generate_summary_and_keywords_separately(self, content: str) -> Tuple[str, str]:
+        """Özet ve anahtar kelimeleri iki ayrı çağrıyla oluştur"""
+        summary_prompt = f"""
+        Aşağıdaki metni Türkçe olarak detaylı bir şekilde özetle. 
+        
+        ÖNEMLİ: Sadece makale başlığı, yazar bilgileri veya kaynakça kısmını özetleme. 
+        Metnin ana içeriğini, bulgularını, sonuçlarını ve önemli noktalarını özetle.
+        
+        Özet şu özelliklere sahip olmalı:
+        1. Makalenin ana konusu ve amacı
+        2. Kullanılan araştırma yöntemi
+        3. Ana bulgular ve sonuçlar
+        4. Önemli veriler ve istatistikler
+        5. Makalenin katkısı ve önemi
+        
+        Özet 300-400 kelime arasında olsun ve metnin gerçek içeriğini yansıtsın:
+        
+        {content}
+        """
+        
+        summary_response = await self._generate_text(summary_prompt)
+        summary = summary_response.strip()
+        
+        # Anahtar kelimeler çıkar
+        keywords_prompt = f"""
+        Aşağıdaki metinden en önemli 15 anahtar kelimeyi ve kavramı Türkçe olarak çıkar. 
+        
+        ÖNEMLİ: Sadece makale başlığı veya kaynakça kısmından değil, metnin ana içeriğinden anahtar kelimeler çıkar.
+        Teknik terimler, kavramlar, araştırma yöntemleri ve önemli bulgular dahil et.
+        Sadece kelimeleri virgülle ayırarak listele:
+        
+        {content}
+        """
+        
+        keywords_response = await self._generate_text(keywords_prompt)
+        keywords = keywords_response.strip()
+        
+        return summary, keywords
+    
+    async def batch_generate_summary_and_keywords(
+        self,
+        contents: Dict[Hashable, str],
+        concurrency: Optional[int] = None,
+        timeout: Optional[float] = None,
+        corpus: Optional[CorpusStatistics] = None
+    ) -> Dict[Hashable, Union[Tuple[str, str], Exception]]:
+        """Birden fazla metin için eşzamanlı özet ve anahtar kelime oluştur
+
+        En fazla `concurrency` metin aynı anda işlenir; her metin için
+        `timeout` saniyelik süre sınırı uygulanır. Başarısız olan metinler
+        için sonuç sözlüğünde ilgili hata nesnesi döner. `corpus` tüm
+        metinler için aynı TF-IDF istatistikleridir (bkz. tekil özetleme).
+        """
+        concurrency = concurrency or settings.BATCH_SUMMARY_CONCURRENCY
+        timeout = timeout or settings.BATCH_SUMMARY_TIMEOUT
+        semaphore = asyncio.Semaphore(max(concurrency, 1))
+        
+        async def run_one(key: Hashable, content: str):
+            async with semaphore:
+                try:
+                    result = await asyncio.wait_for(
+                        self.generate_summary_and_keywords(content, corpus), timeout
+                    )
+                    return key, result
+                except asyncio.TimeoutError:
+                    return key, TimeoutError("Özet oluşturma zaman aşımına uğradı")
+                except Exception as e:
+                    return key, e
+        
+        pairs = await asyncio.gather(*(run_one(key, content) for key, content in contents.items()))
+        return dict(pairs)
+    
+    def _enhanced_simple_summary_and_keywords(
+        self,
+        content: str,
+        corpus: Optional[CorpusStatistics] = None
+    ) -> Tuple[str, str]:
+        """Geliştirilmiş basit özetleme ve anahtar kelime çıkarma
+
+        CPU yoğundur (TextRank); event loop'u bloklamamak için thread
+        havuzunda çağrılır (bkz. generate_summary_and_keywords).
+        """
+        # Yerel çıkarımsal özet (TextRank); LLM maliyeti ve gecikmesi yok
+        summary = summarize_extractive(content, settings.EXTRACTIVE_SUMMARY_SENTENCES)
+        
+        # Anahtar kelimeler (derlenmiş regex + Counter, isteğe bağlı TF-IDF)
+        keywords_str = ', '.join(extract_keywords(content, 15, corpus))
         
         return summary, keywords_str
     
@@ -168,74 +362,116 @@ class AIService:
             raise Exception(f"Arama hatası: {str(e)}")
     
     def _simple_text_search(self, query: str, documents: List[str]) -> List[dict]:
-        """Basit metin arama - Gemini API olmadan"""
-        query_lower = query.lower()
-        results = []
+        """Basit metin arama - Gemini API olmadan (BM25 puanlama)"""
+        query_terms = list(dict.fromkeys(tokenize(query)))
+        if not query_terms:
+            return []
         
+        # Terim istatistikleri doküman başına bir kez çıkarılıp saklanır;
+        # puanlama BM25 ile, eşleşme arama indeksiyle aynı önek kuralıyla yapılır
+        postings = {term: {} for term in query_terms}
+        document_lengths = {}
         for i, doc in enumerate(documents):
-            doc_lower = doc.lower()
-            # Basit kelime eşleşmesi
-            score = 0
-            reason = ""
-            
-            # Query'deki her kelimeyi kontrol et
-            query_words = query_lower.split()
-            matches = []
-            
-            for word in query_words:
-                if len(word) > 2 and word in doc_lower:
-                    matches.append(word)
-                    score += 1
-            
-            if matches:
-                reason = f"Eşleşen kelimeler: {', '.join(matches)}"
-                # Score'u 0-10 arasına normalize et
-                normalized_score = min(score / len(query_words) * 10, 10)
-                results.append({
-                    "index": i,
-                    "score": normalized_score,
-                    "reason": reason
-                })
-        
-        # Score'a göre sırala
-        results.sort(key=lambda x: x["score"], reverse=True)
+            term_counts, document_lengths[i] = _document_statistics(doc)
+            for term in query_terms:
+                frequency = term_frequency(term_counts, term)
+                if frequency:
+                    postings[term][i] = frequency
+        
+        average_length = sum(document_lengths.values()) / len(documents) if documents else 0
+        scores = BM25Scorer(len(documents), average_length).score_all(
+            postings, document_lengths, require_all=False
+        )
+        if not scores:
+            return []
+        
+        # Score'u 0-10 arasına normalize et
+        max_score = scores[0][1] or 1
+        results = []
+        for index, score in scores:
+            matches = [term for term in query_terms if index in postings[term]]
+            results.append({
+                "index": index,
+                "score": round(score / max_score * 10, 2),
+                "reason": f"Eşleşen kelimeler: {', '.join(matches)}"
+            })
         return results
     
     async def answer_question(self, question: str, context: str) -> str:
-        """Doküman içeriğine dayalı soru cevapla"""
+        """Doküman içeriğine dayalı soru cevapla
+
+        `context` soruyla ilgili doküman parçalarıdır (bkz.
+        SearchIndexService.retrieve_chunks); boyutu parça sayısıyla sınırlıdır.
+        """
+        cache_key = self._cache_key("answer", context, question.strip())
+        cached = await ai_result_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
             answer_prompt = f"""
-            Aşağıdaki doküman içeriğine dayalı olarak soruyu cevapla:
+            Aşağıdaki doküman bölümlerine dayalı olarak soruyu cevapla.
+            Cevap bölümlerde yer almıyorsa bunu belirt.
             
-            Doküman: {context[:2000]}
+            Doküman bölümleri:
+            {context}
             
             Soru: {question}
             
             Cevap:
             """
             
-            answer = await self._generate_text(answer_prompt)
-            return answer.strip()
+            answer = (await self._generate_text(answer_prompt)).strip()
+            await ai_result_cache.set(cache_key, answer)
+            return answer
             
         except Exception as e:
             raise Exception(f"Soru cevaplama hatası: {str(e)}")
     
     async def _generate_text(self, prompt: str) -> str:
-        """Gemini API ile metin oluştur"""
+        """Gemini API ile metin oluştur (event loop'u bloklamadan)"""
         if not self.use_gemini:
             raise Exception("Gemini API kullanılamıyor")
-            
-        try:
-            # Önce sync versiyonu dene (daha güvenilir)
-            response = self.model.generate_content(prompt)
-            return response.text
-        except Exception as e:
-            # Eğer sync başarısızsa async versiyonu dene
+        
+        async with _generation_semaphore():
             try:
-                response = await self.model.generate_content_async(prompt)
+                response = await self._generate_content(prompt)
                 return response.text
-            except Exception as e2:
-                raise Exception(f"Gemini API hatası: {str(e2)}")
+            except Exception as e:
+                raise Exception(f"Gemini API hatası: {str(e)}")
+    
+    async def _generate_content(self, prompt: str):
+        """Önce native async API'yi, yoksa thread havuzunda sync API'yi kullan"""
+        generate_async = getattr(self.model, "generate_content_async", None)
+        if generate_async is not None:
+            try:
+                return await generate_async(prompt)
+            except NotImplementedError:
+                pass
+        
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_generation_executor, self.model.generate_content, prompt)
+    
+    async def warm_up(self) -> bool:
+        """İlk isteğin bağlantı kurulum maliyetini başlangıçta öde
+
+        Ücretsiz bir token sayımı çağrısı, istemci kanalını ve kimlik
+        doğrulamayı hazırlar. Hata uygulamanın açılmasını engellemez.
+        """
+        if not self.use_gemini:
+            return False
+        try:
+            count_async = getattr(self.model, "count_tokens_async", None)
+            if count_async is not None:
+                await count_async("Merhaba")
+            else:
+                loop = asyncio.get_running_loop()
+                await loop.run_in_executor(_generation_executor, self.model.count_tokens, "Merhaba")
+            print(f"Gemini bağlantısı hazır: {self.model_name}")
+            return True
+        except Exception as e:
+            print(f"Gemini ısınma çağrısı başarısız: {e}")
+            return False
     
     def validate_api_key(self) -> bool:
         """API anahtarını doğrula"""
@@ -244,4 +480,23 @@ class AIService:
             response = self.model.generate_content(test_prompt)
             return True
         except Exception:
-            return False 
\ No newline at end of file
+            return False
+
+# Uygulama genelinde paylaşılan AI istemcisi (model ve bağlantı kanalı yeniden kullanılır)
+_ai_service: Optional[AIService] = None
+_ai_service_lock = threading.Lock()
+
+def get_ai_service() -> AIService:
+    """Paylaşılan AIService örneğini döndür (ilk çağrıda oluşturulur)"""
+    global _ai_service
+    if _ai_service is None:
+        with _ai_service_lock:
+            if _ai_service is None:
+                _ai_service = AIService()
+    return _ai_service
+
+def reset_ai_service() -> None:
+    """Paylaşılan örneği bırak (ayar değişikliği ve testler için)"""
+    global _ai_service
+    with _ai_service_lock:
+        _ai_service = None
@@ -3,17 +3,137 @@ Kimlik Doğrulama Servisi
 ========================
 """
 
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple, Union
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, status
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.config import settings
-from models.user import User, UserCreate, UserLogin
+from models.user import User, UserCreate, UserLogin, UserPrincipal, UserUpdate
 
 # Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.PASSWORD_BCRYPT_ROUNDS
+)
+
+class PasswordHasher:
+    """Sınırlı thread havuzunda şifre hash'leme/doğrulama
+
+    bcrypt bilerek yavaştır (~100-300 ms CPU); event loop'u bloklamaması
+    için işler ayrı thread'lerde çalışır. Çalışan ve bekleyen iş sayısı
+    `workers + queue_depth` sınırına ulaşınca yeni istekler beklemeye
+    alınmadan 503 ile reddedilir.
+    """
+
+    def __init__(self, workers: int, queue_depth: int):
+        self.capacity = workers + queue_depth
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password")
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    async def run(self, func, *args):
+        """Fonksiyonu havuzda çalıştır; havuz doluysa 503 döndür"""
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Sunucu şu anda yoğun, lütfen tekrar deneyin",
+                    headers={"Retry-After": "1"}
+                )
+            self._in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func, *args)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self.run(pwd_context.hash, password)
+
+    async def verify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """Şifreyi doğrula; maliyet ayarı değiştiyse yeni hash'i de döndür"""
+        return await self.run(pwd_context.verify_and_update, password, hashed_password)
+
+# Uygulama genelinde paylaşılan şifre havuzu
+password_hasher = PasswordHasher(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_QUEUE_DEPTH)
+
+# Stateless modda kullanıcı bilgisinin taşındığı token claim'i
+PRINCIPAL_CLAIM = "usr"
+
+class PrincipalCache:
+    """Kullanıcı ID'sine göre kısa süreli principal önbelleği
+
+    Korumalı her istekte kullanıcı tablosuna gidilmesini önler. Kullanıcı
+    güncellendiğinde veya silindiğinde kayıt commit sonrasında düşürülür.
+    """
+
+    def __init__(self, ttl: int, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[int, tuple[float, UserPrincipal]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int) -> Optional[UserPrincipal]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            expires_at, principal = entry
+            if expires_at < time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return principal
+
+    def set(self, principal: UserPrincipal) -> None:
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[principal.id] = (time.monotonic() + self.ttl, principal)
+            self._entries.move_to_end(principal.id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+# Uygulama genelinde paylaşılan principal önbelleği
+principal_cache = PrincipalCache(settings.AUTH_PRINCIPAL_CACHE_TTL, settings.AUTH_PRINCIPAL_CACHE_MAX_ENTRIES)
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _mark_user_changed(mapper, connection, target) -> None:
+    """Değişen kullanıcıyı commit sonrası önbellekten düşürmek için işaretle"""
+    session = Session.object_session(target)
+    if session is not None:
+        session.info.setdefault("changed_user_ids", set()).add(target.id)
+    principal_cache.invalidate(target.id)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session: Session) -> None:
+    """Commit edilen kullanıcı değişikliklerini önbellekten düşür"""
+    for user_id in session.info.pop("changed_user_ids", ()):
+        principal_cache.invalidate(user_id)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_users(session: Session) -> None:
+    session.info.pop("changed_user_ids", None)
 
 class AuthService:
     """Kimlik doğrulama servisi"""
@@ -41,6 +161,31 @@ class AuthService:
         encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
         return encoded_jwt
     
+    @staticmethod
+    def create_user_token(user: Union[User, UserPrincipal], expires_delta: Optional[timedelta] = None) -> str:
+        """Kullanıcı için access token oluştur
+
+        Stateless modda route'ların ihtiyaç duyduğu kullanıcı bilgileri de
+        token'a eklenir; doğrulama sırasında veritabanına gidilmez.
+        """
+        data = {"sub": str(user.id)}
+        if settings.AUTH_STATELESS_TOKENS:
+            data[PRINCIPAL_CLAIM] = AuthService.to_principal(user).model_dump()
+        return AuthService.create_access_token(data, expires_delta)
+    
+    @staticmethod
+    def to_principal(user: Union[User, UserPrincipal]) -> UserPrincipal:
+        """Kullanıcı kaydından principal oluştur"""
+        if isinstance(user, UserPrincipal):
+            return user
+        return UserPrincipal(
+            id=user.id,
+            email=user.email,
+            username=user.username,
+            is_active=user.is_active is not False,
+            is_superuser=bool(user.is_superuser)
+        )
+    
     @staticmethod
     def verify_token(token: str) -> Optional[dict]:
         """Token doğrulama"""
@@ -58,11 +203,47 @@ class AuthService:
             return None
         if not AuthService.verify_password(password, user.hashed_password):
             return None
+        if user.is_active is False:
+            return None
+        return user
+    
+    @staticmethod
+    async def authenticate_user_async(db: AsyncSession, email: str, password: str) -> Optional[User]:
+        """Kullanıcı kimlik doğrulama (async session, bcrypt event loop dışında)
+
+        Hash eski maliyet ayarıyla üretilmişse başarılı girişte yeni
+        ayarla yeniden hash'lenip kaydedilir.
+        """
+        user = await db.scalar(select(User).where(User.email == email))
+        if not user:
+            return None
+        verified, new_hash = await password_hasher.verify_and_update(password, user.hashed_password)
+        if not verified:
+            return None
+        if user.is_active is False:
+            return None
+        if new_hash:
+            user.hashed_password = new_hash
+            await db.commit()
         return user
     
     @staticmethod
     def create_user(db: Session, user_create: UserCreate) -> User:
         """Yeni kullanıcı oluşturma"""
+        AuthService._check_user_unique(db, user_create)
+        hashed_password = AuthService.get_password_hash(user_create.password)
+        return AuthService._insert_user(db, user_create, hashed_password)
+    
+    @staticmethod
+    async def create_user_async(db: AsyncSession, user_create: UserCreate) -> User:
+        """Yeni kullanıcı oluşturma (async session, bcrypt event loop dışında)"""
+        await db.run_sync(AuthService._check_user_unique, user_create)
+        hashed_password = await password_hasher.hash(user_create.password)
+        return await db.run_sync(AuthService._insert_user, user_create, hashed_password)
+    
+    @staticmethod
+    def _check_user_unique(db: Session, user_create: UserCreate) -> None:
+        """Email ve kullanıcı adı benzersizliğini kontrol et"""
         # Email kontrolü
         existing_user = db.query(User).filter(User.email == user_create.email).first()
         if existing_user:
@@ -79,8 +260,10 @@ class AuthService:
                 detail="Bu kullanıcı adı zaten kullanımda"
             )
         
-        # Yeni kullanıcı oluştur
-        hashed_password = AuthService.get_password_hash(user_create.password)
+    
+    @staticmethod
+    def _insert_user(db: Session, user_create: UserCreate, hashed_password: str) -> User:
+        """Hash'lenmiş şifreyle kullanıcı kaydı oluştur"""
         db_user = User(
             email=user_create.email,
             username=user_create.username,
@@ -93,6 +276,83 @@ class AuthService:
         db.refresh(db_user)
         return db_user
     
+    @staticmethod
+    def update_user(db: Session, user: User, user_update: UserUpdate) -> User:
+        """Kullanıcıyı güncelle (principal önbelleği commit sonrası düşer)"""
+        for field, value in user_update.model_dump(exclude_unset=True).items():
+            setattr(user, field, value)
+        db.commit()
+        db.refresh(user)
+        return user
+    
+    @staticmethod
+    def deactivate_user(db: Session, user: User) -> User:
+        """Kullanıcıyı pasifleştir; mevcut token'ları bir sonraki istekte reddedilir"""
+        return AuthService.update_user(db, user, UserUpdate(is_active=False))
+    
+    @staticmethod
+    def resolve_principal(db: Session, token: str) -> Optional[UserPrincipal]:
+        """Token'dan istek sahibini çöz
+
+        Sırasıyla token claim'leri (stateless mod), principal önbelleği ve
+        veritabanı denenir. Pasif kullanıcılar için None döner.
+        """
+        user_id, principal = AuthService._principal_from_token(token)
+        if user_id is None:
+            return None
+        if principal is None:
+            user = db.query(User).filter(User.id == user_id).first()
+            principal = AuthService._cache_principal(user)
+        return principal if principal and principal.is_active else None
+    
+    @staticmethod
+    async def resolve_principal_async(db: AsyncSession, token: str) -> Optional[UserPrincipal]:
+        """Token'dan istek sahibini çöz (async session ile)"""
+        user_id, principal = AuthService._principal_from_token(token)
+        if user_id is None:
+            return None
+        if principal is None:
+            user = await db.scalar(select(User).where(User.id == user_id))
+            principal = AuthService._cache_principal(user)
+        return principal if principal and principal.is_active else None
+    
+    @staticmethod
+    def _principal_from_token(token: str) -> Tuple[Optional[int], Optional[UserPrincipal]]:
+        """Token'ı doğrula; principal'ı claim'lerden veya önbellekten al
+
+        (kullanıcı ID, principal) döndürür. Token geçersizse ID None'dır;
+        principal None ise veritabanından okunmalıdır.
+        """
+        payload = AuthService.verify_token(token)
+        if payload is None:
+            return None, None
+        
+        try:
+            user_id = int(payload.get("sub"))
+        except (TypeError, ValueError):
+            return None, None
+        
+        claims = payload.get(PRINCIPAL_CLAIM)
+        if settings.AUTH_STATELESS_TOKENS and isinstance(claims, dict):
+            try:
+                principal = UserPrincipal(**claims)
+            except ValueError:
+                return None, None
+            if principal.id != user_id:
+                return None, None
+            return user_id, principal
+        
+        return user_id, principal_cache.get(user_id)
+    
+    @staticmethod
+    def _cache_principal(user: Optional[User]) -> Optional[UserPrincipal]:
+        """Veritabanından okunan kullanıcıyı önbelleğe al"""
+        if user is None:
+            return None
+        principal = AuthService.to_principal(user)
+        principal_cache.set(principal)
+        return principal
+    
     @staticmethod
     def get_current_user(db: Session, token: str) -> Optional[User]:
         """Mevcut kullanıcıyı token'dan al"""
@@ -105,4 +365,11 @@ class AuthService:
             return None
         
         user = db.query(User).filter(User.id == user_id).first()
-        return user 
\ No newline at end of file
+        if user is None or user.is_active is False:
+            return None
+        return user
+    
+    @staticmethod
+    async def get_current_user_async(db: AsyncSession, token: str) -> Optional[User]:
+        """Mevcut kullanıcıyı token'dan al (async session ile)"""
+        return await db.run_sync(AuthService.get_current_user, token) 
\ No newline at end of file
@@ -0,0 +1,117 @@
+"""
+İçerik Adresli Dosya Deposu
+===========================
+
+Yüklenen dosyalar SHA-256 özetlerine göre `UPLOAD_DIR/blobs/ab/abcd...`
+altında tek kopya olarak saklanır. Aynı içerik tekrar yüklendiğinde yeni
+dosya yazılmaz; `blobs.ref_count` artırılır. Dosya, onu kullanan son
+doküman silindiğinde diskten kaldırılır.
+
+Eşzamanlı yükleme ve silme için sıralama:
+
+- yükleme önce referansı alır (`acquire`, satır kilidi commit'e kadar
+  tutulur), dosyayı ancak sonra yerine koyar (`store`),
+- silme referansı bırakır (`release`, kayıt 0 referansla kalır) ve
+  commit'ten sonra `remove_unreferenced` kaydı yalnızca referans hâlâ
+  0 ise siler; dosya bu silmenin kilidi tutulurken kaldırılır.
+
+Böylece bir silme, aynı içeriği az önce yerine koyan yüklemenin
+dosyasını kaldıramaz.
+"""
+
+import os
+from typing import Optional
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from app.config import settings
+from models.blob import Blob
+
+# Upsert (INSERT ... ON CONFLICT) destekleyen diyalektler
+_UPSERT_INSERTS = {
+    "sqlite": sqlite.insert,
+    "postgresql": postgresql.insert,
+}
+
+class BlobService:
+    """Paylaşılan dosya deposu servisi"""
+
+    @staticmethod
+    def blob_path(digest: str) -> str:
+        """Özet için depo yolu"""
+        return os.path.join(settings.UPLOAD_DIR, "blobs", digest[:2], digest)
+
+    @staticmethod
+    def store(temp_path: str, digest: str) -> str:
+        """Geçici dosyayı depodaki yerine taşı
+
+        Aynı içerik zaten varsa üzerine yazmak içeriği değiştirmez; taşıma
+        atomik olduğundan eşzamanlı yüklemeler yarım dosya görmez.
+        """
+        path = BlobService.blob_path(digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(temp_path, path)
+        return path
+
+    @staticmethod
+    def acquire(db: Session, digest: str, file_path: str, file_size: int) -> None:
+        """Blob referansını artır (yoksa oluştur)
+
+        Dosya `store` ile yerine konmadan önce çağrılmalıdır; satır kilidi
+        commit'e kadar eşzamanlı `remove_unreferenced` çağrısını bekletir.
+        Değişiklikler commit edilmez.
+        """
+        make_insert = _UPSERT_INSERTS.get(db.get_bind().dialect.name)
+        if make_insert is not None:
+            statement = make_insert(Blob).values(
+                digest=digest, file_path=file_path, file_size=file_size, ref_count=1
+            ).on_conflict_do_update(
+                index_elements=[Blob.digest],
+                set_={"ref_count": Blob.ref_count + 1}
+            )
+            db.execute(statement)
+            return
+
+        updated = db.execute(
+            update(Blob).where(Blob.digest == digest).values(ref_count=Blob.ref_count + 1)
+        ).rowcount
+        if not updated:
+            db.add(Blob(digest=digest, file_path=file_path, file_size=file_size, ref_count=1))
+            db.flush()
+
+    @staticmethod
+    def release(db: Session, digest: str) -> Optional[str]:
+        """Blob referansını azalt
+
+        Son referans bırakıldıysa dosya yolu döner; kayıt 0 referansla
+        kalır. Kayıt ve dosya commit'ten sonra `remove_unreferenced` ile
+        silinmelidir.
+        """
+        db.execute(
+            update(Blob).where(Blob.digest == digest).values(ref_count=Blob.ref_count - 1)
+        )
+        return db.execute(
+            select(Blob.file_path).where(Blob.digest == digest, Blob.ref_count <= 0)
+        ).scalar()
+
+    @staticmethod
+    def remove_unreferenced(db: Session, digest: str, file_path: str) -> bool:
+        """Commit edilmiş `release` sonrasında kaydı ve dosyayı kaldır
+
+        Referans sayısı silme ifadesinin kendisinde yeniden kontrol edilir:
+        arada aynı içerik yüklendiyse (referans artmışsa) hiçbir şey
+        silinmez. Yüklemenin kilidi tutuluyorsa silme onun commit'ini
+        bekler. Dosya, silinen kaydın kilidi bırakılmadan kaldırılır.
+        """
+        deleted = db.execute(
+            delete(Blob).where(Blob.digest == digest, Blob.ref_count <= 0)
+        ).rowcount
+        if not deleted:
+            db.rollback()
+            return False
+        try:
+            os.remove(file_path)
+        except OSError:
+            pass  # Dosya zaten yoksa kaydın silinmesi yeterli
+        db.commit()
+        return True
@@ -0,0 +1,99 @@
+"""
+Metin Parçalama
+===============
+
+Uzun dokümanları token sınırlı parçalara böler. Parça sınırları
+içeriğe göre belirlenir: bir paragrafın sınır olup olmadığı yalnızca
+kendi içeriğine bağlıdır. Böylece dokümanın bir bölümü düzenlendiğinde
+yalnızca o bölümü içeren parçalar değişir, diğer parçaların özetleri
+önbellekten kullanılabilir.
+"""
+
+import math
+import re
+import zlib
+from typing import Iterator, List
+
+# Token tahmini için ortalama karakter sayısı (model tokenizer'ı çağrılmaz)
+CHARS_PER_TOKEN = 4
+
+# Paragrafların yaklaşık 1/4'ü parça sınırı adayıdır
+ANCHOR_DIVISOR = 4
+
+_PARAGRAPH_RE = re.compile(r"\n\s*\n")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Metnin yaklaşık token sayısı"""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _split_oversized(text: str, max_tokens: int) -> Iterator[str]:
+    """Sınırı aşan paragrafı cümlelere, gerekirse kelime gruplarına böl
+
+    Sınırdan uzun tek kelimeler (URL, base64, boşluksuz tablo satırı)
+    kırpılmaz; sınır uzunluğunda dilimlere bölünür.
+    """
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    for sentence in _SENTENCE_RE.split(text):
+        if estimate_tokens(sentence) <= max_tokens:
+            yield sentence
+            continue
+        piece = ""
+        for word in sentence.split():
+            if piece and len(piece) + 1 + len(word) > max_chars:
+                yield piece
+                piece = ""
+            while len(word) > max_chars:
+                yield word[:max_chars]
+                word = word[max_chars:]
+            piece = f"{piece} {word}" if piece else word
+        if piece:
+            yield piece
+
+
+def iter_segments(text: str, max_tokens: int) -> Iterator[str]:
+    """Metni her biri sınırın altında kalan paragraf/cümle parçalarına böl"""
+    for paragraph in _PARAGRAPH_RE.split(text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if estimate_tokens(paragraph) <= max_tokens:
+            yield paragraph
+        else:
+            yield from _split_oversized(paragraph, max_tokens)
+
+
+def _is_anchor(segment: str) -> bool:
+    """Parçanın içeriğe bağlı sınır adayı olup olmadığı (süreçler arası kararlı)"""
+    return zlib.crc32(segment.encode("utf-8")) % ANCHOR_DIVISOR == 0
+
+
+def split_into_chunks(text: str, max_tokens: int) -> List[str]:
+    """Metni en fazla `max_tokens` tokenlık parçalara böl
+
+    Parça, en az yarı doluyken bir sınır adayı paragrafla biter; sınır
+    adayı gelmezse bir sonraki paragraf sınırı aşacağı anda kesilir.
+    """
+    min_tokens = max_tokens // 2
+    chunks: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+
+    for segment in iter_segments(text, max_tokens):
+        # Ayraç ("\n\n") için paragraf başına yaklaşık bir token eklenir
+        segment_tokens = estimate_tokens(segment) + 1
+        if current and current_tokens + segment_tokens > max_tokens:
+            chunks.append("\n\n".join(current))
+            current, current_tokens = [], 0
+
+        current.append(segment)
+        current_tokens += segment_tokens
+        if current_tokens >= min_tokens and _is_anchor(segment):
+            chunks.append("\n\n".join(current))
+            current, current_tokens = [], 0
+
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
@@ -3,22 +3,50 @@ Doküman İşleme Servisi
 =======================
 """
 
+import base64
+import binascii
+import hashlib
+import json
 import os
 import uuid
-from typing import Optional, List
-from fastapi import HTTPException, status, UploadFile
-from sqlalchemy.orm import Session
+from datetime import datetime
+from fastapi.concurrency import run_in_threadpool
+from typing import Optional, List, Sequence, Tuple
+from fastapi import HTTPException, Response, status, UploadFile
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import literal, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, load_only
 from app.config import settings
-from models.document import Document, DocumentCreate, DocumentUpdate
-from models.user import User
-from services.ai_service import AIService
+from models.document import (
+    NEXT_CURSOR_HEADER,
+    Document,
+    DocumentCreate,
+    DocumentUpdate,
+    DocumentStatus,
+    DocumentListItem
+)
+from models.user import UserPrincipal
+from services import extraction_service
+from services.ai_service import get_ai_service
+from services.blob_service import BlobService
+from services.search_service import SearchIndexService
 
 class DocumentService:
     """Doküman işleme servisi"""
     
     @staticmethod
-    def save_upload_file(upload_file: UploadFile, user_id: int) -> tuple[str, str]:
-        """Dosyayı kaydet ve yol döndür"""
+    def save_upload_file(upload_file: UploadFile) -> tuple[str, str, str, int]:
+        """Dosyayı parça parça diske yaz
+
+        Yükleme sabit boyutlu parçalarla kopyalanır, boyut sınırı aşıldığı
+        anda iptal edilir ve içerik özeti (SHA-256) yazarken hesaplanır.
+        Dosya geçici bir dosyaya yazılır; içerik adresli depodaki yerine
+        blob referansı alındıktan sonra `BlobService.store` ile taşınır
+        (bkz. create_document). (geçici dosya yolu, dosya adı, sha256
+        özeti, boyut) döndürür.
+        """
         # Dosya uzantısını kontrol et
         file_extension = os.path.splitext(upload_file.filename)[1].lower()
         if file_extension not in settings.ALLOWED_EXTENSIONS:
@@ -27,31 +55,62 @@ class DocumentService:
                 detail=f"Desteklenmeyen dosya türü: {file_extension}"
             )
         
-        # Benzersiz dosya adı oluştur
-        unique_filename = f"{uuid.uuid4()}{file_extension}"
-        file_path = os.path.join(settings.UPLOAD_DIR, unique_filename)
+        # Boyut biliniyorsa okumadan reddet
+        if upload_file.size is not None and upload_file.size > settings.MAX_FILE_SIZE:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail="Dosya boyutu çok büyük"
+            )
+        
+        # Özet yazma bitince belli olur; önce benzersiz geçici dosyaya yaz
+        temp_path = os.path.join(settings.UPLOAD_DIR, f"{uuid.uuid4()}.part")
         
         # Dosyayı kaydet
+        digest = hashlib.sha256()
+        total_size = 0
         try:
-            with open(file_path, "wb") as buffer:
-                content = upload_file.file.read()
-                if len(content) > settings.MAX_FILE_SIZE:
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail="Dosya boyutu çok büyük"
-                    )
-                buffer.write(content)
+            with open(temp_path, "wb") as buffer:
+                while True:
+                    chunk = upload_file.file.read(settings.UPLOAD_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    total_size += len(chunk)
+                    if total_size > settings.MAX_FILE_SIZE:
+                        raise HTTPException(
+                            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                            detail="Dosya boyutu çok büyük"
+                        )
+                    digest.update(chunk)
+                    buffer.write(chunk)
+            content_hash = digest.hexdigest()
+        except HTTPException:
+            DocumentService._remove_file(temp_path)
+            raise
         except Exception as e:
+            DocumentService._remove_file(temp_path)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Dosya kaydedilemedi: {str(e)}"
             )
         
-        return file_path, unique_filename
+        return temp_path, f"{content_hash}{file_extension}", content_hash, total_size
+    
+    @staticmethod
+    def _remove_file(file_path: str) -> None:
+        """Dosyayı sessizce sil"""
+        try:
+            if os.path.exists(file_path):
+                os.remove(file_path)
+        except OSError:
+            pass
     
     @staticmethod
     def extract_text_from_file(file_path: str, file_type: str) -> str:
-        """Dosyadan metin çıkar"""
+        """Dosyadan metin çıkar (çağıran süreçte, senkron)
+
+        Arka plan işleme hattı aynı ayrıştırıcıları `extraction_engine`
+        üzerinden süreç havuzunda çalıştırır.
+        """
         try:
             if file_type == "pdf":
                 return DocumentService._extract_from_pdf(file_path)
@@ -73,65 +132,35 @@ class DocumentService:
     @staticmethod
     def _extract_from_pdf(file_path: str) -> str:
         """PDF'den metin çıkar"""
-        try:
-            import PyPDF2
-            text = ""
-            with open(file_path, "rb") as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                for page in pdf_reader.pages:
-                    text += page.extract_text() + "\n"
-            return text.strip()
-        except Exception as e:
-            raise Exception(f"PDF işleme hatası: {str(e)}")
+        return extraction_service.extract_text(file_path, "pdf")
     
     @staticmethod
     def _extract_from_docx(file_path: str) -> str:
         """DOCX'den metin çıkar"""
-        try:
-            from docx import Document
-            doc = Document(file_path)
-            text = ""
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
-            return text.strip()
-        except Exception as e:
-            raise Exception(f"DOCX işleme hatası: {str(e)}")
+        return extraction_service.extract_docx_text(file_path)
     
     @staticmethod
     def _extract_from_txt(file_path: str) -> str:
         """TXT'den metin çıkar"""
-        encodings = ['utf-8', 'latin-1', 'cp1252', 'iso-8859-1']
-        
-        for encoding in encodings:
-            try:
-                with open(file_path, "r", encoding=encoding) as file:
-                    return file.read().strip()
-            except UnicodeDecodeError:
-                continue
-            except Exception as e:
-                raise Exception(f"TXT işleme hatası: {str(e)}")
-        
-        # Son çare olarak binary olarak oku ve decode et
-        try:
-            with open(file_path, "rb") as file:
-                content = file.read()
-                return content.decode('utf-8', errors='ignore').strip()
-        except Exception as e:
-            raise Exception(f"TXT işleme hatası: {str(e)}")
+        return extraction_service.extract_txt_text(file_path)
     
     @staticmethod
-    def create_document(db: Session, user: User, upload_file: UploadFile, title: str = None) -> Document:
-        """Yeni doküman oluştur"""
-        # Dosyayı kaydet
-        file_path, filename = DocumentService.save_upload_file(upload_file, user.id)
+    def create_document(db: Session, user: UserPrincipal, upload_file: UploadFile, title: str = None) -> Document:
+        """Yeni doküman oluştur
+
+        Dosya kaydedilir ve doküman `queued` durumunda oluşturulur; metin
+        çıkarma işlemi IngestionService tarafından arka planda yapılır.
+        Aynı içerik daha önce işlendiyse metin, özet ve anahtar kelimeler
+        kopyalanır ve doküman doğrudan `ready` olur.
+        """
+        # Dosyayı geçici olarak kaydet
+        temp_path, filename, content_hash, file_size = DocumentService.save_upload_file(upload_file)
+        file_path = BlobService.blob_path(content_hash)
         
         # Dosya türünü belirle
         file_extension = os.path.splitext(upload_file.filename)[1].lower()
         file_type = file_extension[1:]  # .pdf -> pdf
         
-        # Metin çıkar
-        content = DocumentService.extract_text_from_file(file_path, file_type)
-        
         # Başlık belirle
         document_title = title if title else upload_file.filename
         
@@ -139,7 +168,7 @@ class DocumentService:
         document_data = DocumentCreate(
             title=document_title,
             filename=filename,
-            file_size=upload_file.size,
+            file_size=file_size,
             file_type=file_type
         )
         
@@ -149,20 +178,181 @@ class DocumentService:
             file_path=file_path,
             file_size=document_data.file_size,
             file_type=document_data.file_type,
-            content=content,
+            content_hash=content_hash,
+            status=DocumentStatus.QUEUED,
             user_id=user.id
         )
         
-        db.add(db_document)
-        db.commit()
+        try:
+            db.add(db_document)
+            db.flush()
+            # Referans dosya yerine konmadan önce alınır; eşzamanlı bir silme
+            # bu commit'e kadar dosyayı kaldıramaz (bkz. BlobService)
+            BlobService.acquire(db, content_hash, file_path, file_size)
+            BlobService.store(temp_path, content_hash)
+            
+            # Arama indeksini güncelle (içerik çıkarılınca yeniden indekslenir)
+            if not DocumentService.reuse_processed_duplicate(db, db_document):
+                SearchIndexService.index_document(db, db_document)
+            
+            db.commit()
+        except Exception:
+            db.rollback()
+            DocumentService._remove_file(temp_path)
+            raise
         db.refresh(db_document)
         
         return db_document
     
     @staticmethod
-    def get_user_documents(db: Session, user_id: int, skip: int = 0, limit: int = 100) -> List[Document]:
-        """Kullanıcının dokümanlarını getir"""
-        return db.query(Document).filter(Document.user_id == user_id).offset(skip).limit(limit).all()
+    def reuse_processed_duplicate(db: Session, document: Document) -> bool:
+        """Aynı içerikli işlenmiş dokümanın türetilmiş alanlarını kopyala
+
+        Metin çıkarma ve AI özetleme tekrarlanmaz; doküman `ready` olur ve
+        indekslenir. Değişiklikler commit edilmez. Uygun doküman yoksa
+        False döner.
+        """
+        if not document.content_hash:
+            return False
+        source = db.query(Document).options(
+            load_only(Document.content, Document.summary, Document.keywords)
+        ).filter(
+            Document.content_hash == document.content_hash,
+            Document.file_type == document.file_type,
+            Document.status == DocumentStatus.READY,
+            Document.content.isnot(None),
+            Document.id != document.id
+        ).order_by(
+            # Özeti olan kopya tercih edilir
+            Document.summary.is_(None), Document.id.desc()
+        ).first()
+        if source is None:
+            return False
+        
+        document.content = source.content
+        document.summary = source.summary
+        document.keywords = source.keywords
+        document.status = DocumentStatus.READY
+        document.processing_error = None
+        SearchIndexService.index_document(db, document)
+        return True
+    
+    @staticmethod
+    def get_user_documents(
+        db: Session,
+        user_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        extra_fields: Sequence[str] = (),
+        cursor: Optional[str] = None
+    ) -> List[Document]:
+        """Kullanıcının dokümanlarını liste projeksiyonuyla getir
+
+        Sonuçlar (created_at, id) sırasındadır; `cursor` verilirse o
+        konumdan devam edilir.
+        """
+        query = db.query(Document).options(
+            DocumentService.list_load_options(extra_fields)
+        ).filter(Document.user_id == user_id)
+        query = DocumentService.paginate(query, cursor)
+        return query.offset(skip).limit(limit).all()
+    
+    @staticmethod
+    async def get_user_documents_async(
+        db: AsyncSession,
+        user_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        extra_fields: Sequence[str] = (),
+        cursor: Optional[str] = None
+    ) -> List[Document]:
+        """Kullanıcının dokümanlarını liste projeksiyonuyla getir (async)"""
+        statement = select(Document).options(
+            DocumentService.list_load_options(extra_fields)
+        ).where(Document.user_id == user_id)
+        statement = DocumentService.paginate(statement, cursor).offset(skip).limit(limit)
+        return list((await db.scalars(statement)).all())
+    
+    @staticmethod
+    def paginate(query, cursor: Optional[str] = None):
+        """Sorguyu (created_at, id) sırasına koy ve imleçten sonrasını seç
+
+        ORM `Query` ve 2.0 tarzı `select()` ile birlikte kullanılabilir.
+
+        `(user_id, created_at, id)` indeksi sayesinde her sayfa önceki
+        satırları taramadan doğrudan indeks aralığından okunur.
+        """
+        if cursor:
+            created_at, document_id = DocumentService.decode_cursor(cursor)
+            query = query.filter(
+                tuple_(Document.created_at, Document.id)
+                > tuple_(literal(created_at, Document.created_at.type), document_id)
+            )
+        return query.order_by(Document.created_at, Document.id)
+    
+    @staticmethod
+    def encode_cursor(document: Document) -> str:
+        """Dokümanın sıralama konumunu opak bir imlece çevir"""
+        payload = json.dumps([document.created_at.isoformat(), document.id])
+        return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+    
+    @staticmethod
+    def decode_cursor(cursor: str) -> tuple[datetime, int]:
+        """İmleci (created_at, id) değerlerine çöz"""
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            created_at, document_id = json.loads(base64.urlsafe_b64decode(padded))
+            return datetime.fromisoformat(created_at), int(document_id)
+        except (binascii.Error, ValueError, TypeError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Geçersiz sayfalama imleci"
+            )
+    
+    @staticmethod
+    def next_cursor(documents: List[Document], limit: int) -> Optional[str]:
+        """Sayfa doluysa son dokümandan sonraki sayfanın imlecini döndür"""
+        if limit <= 0 or len(documents) < limit:
+            return None
+        return DocumentService.encode_cursor(documents[-1])
+    
+    @staticmethod
+    def parse_fields(fields: Optional[str]) -> List[str]:
+        """`fields=` parametresini alan listesine çevir ("content,summary")"""
+        if not fields:
+            return []
+        return list(dict.fromkeys(field for field in fields.split(",") if field))
+    
+    @staticmethod
+    def list_load_options(extra_fields: Sequence[str] = ()):
+        """Liste sorgularında yalnızca projeksiyon kolonlarını yükle
+
+        `content` ve `summary` istenmedikçe SELECT'e dahil edilmez.
+        """
+        columns = [getattr(Document, name) for name in DocumentListItem.model_fields]
+        columns.extend(getattr(Document, name) for name in extra_fields)
+        return load_only(*columns)
+    
+    @staticmethod
+    def list_response(
+        documents: List[Document],
+        extra_fields: Sequence[str] = (),
+        response: Optional[Response] = None,
+        next_cursor: Optional[str] = None
+    ):
+        """Liste yanıtını oluştur; istenen büyük alanları öğelere ekle
+
+        `next_cursor` varsa X-Next-Cursor başlığıyla döndürülür.
+        """
+        items = [DocumentListItem.from_orm(doc) for doc in documents]
+        if extra_fields:
+            response = JSONResponse(jsonable_encoder([
+                {**item.model_dump(), **{field: getattr(doc, field) for field in extra_fields}}
+                for item, doc in zip(items, documents)
+            ]))
+        if next_cursor and response is not None:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
+        return response if extra_fields else items
     
     @staticmethod
     def get_document(db: Session, document_id: int, user_id: int) -> Optional[Document]:
@@ -172,6 +362,44 @@ class DocumentService:
             Document.user_id == user_id
         ).first()
     
+    @staticmethod
+    async def get_document_async(db: AsyncSession, document_id: int, user_id: int) -> Optional[Document]:
+        """Belirli bir dokümanı getir (async)"""
+        return await db.scalar(
+            select(Document).where(
+                Document.id == document_id,
+                Document.user_id == user_id
+            )
+        )
+    
+    @staticmethod
+    def get_documents(db: Session, document_ids: Sequence[int], user_id: int) -> List[Document]:
+        """Kullanıcının verilen ID'lerdeki dokümanlarını tek sorguyla getir"""
+        if not document_ids:
+            return []
+        return db.query(Document).filter(
+            Document.id.in_(document_ids),
+            Document.user_id == user_id
+        ).all()
+    
+    @staticmethod
+    def save_summaries(db: Session, summaries: Sequence[Tuple[Document, str, str]]) -> None:
+        """(doküman, özet, anahtar kelimeler) sonuçlarını tek commit'le kaydet
+
+        Anahtar kelimeler etiket indeksine de yazılır.
+        """
+        for document, summary, keywords in summaries:
+            document.summary = summary
+            document.keywords = keywords
+            SearchIndexService.write_keywords(db, document)
+        db.commit()
+    
+    @staticmethod
+    def save_summary(db: Session, document: Document, summary: str, keywords: str) -> None:
+        """Özeti kaydet ve dokümanı yenile (yanıt için yeniden yüklenir)"""
+        DocumentService.save_summaries(db, [(document, summary, keywords)])
+        db.refresh(document)
+    
     @staticmethod
     def delete_document(db: Session, document_id: int, user_id: int) -> bool:
         """Dokümanı sil"""
@@ -179,21 +407,33 @@ class DocumentService:
         if not document:
             return False
         
-        # Dosyayı fiziksel olarak sil
-        try:
-            if os.path.exists(document.file_path):
-                os.remove(document.file_path)
-        except Exception:
-            pass  # Dosya silinmezse devam et
+        content_hash = document.content_hash
+        file_path = document.file_path
+        released_path = BlobService.release(db, content_hash) if content_hash else None
         
+        SearchIndexService.remove_document(db, document.id)
         db.delete(document)
         db.commit()
+        
+        # Dosyayı fiziksel olarak sil (paylaşılan içerik son referansla silinir)
+        if released_path:
+            BlobService.remove_unreferenced(db, content_hash, released_path)
+        elif not content_hash:
+            try:
+                if os.path.exists(file_path):
+                    os.remove(file_path)
+            except Exception:
+                pass  # Dosya silinmezse devam et
         return True
     
     @staticmethod
     async def process_document_with_ai(db: Session, document_id: int, user_id: int) -> Document:
-        """Dokümanı AI ile işle"""
-        document = DocumentService.get_document(db, document_id, user_id)
+        """Dokümanı AI ile işle
+
+        Veritabanı işlemleri thread havuzunda yürütülür; event loop yalnızca
+        AI yanıtını bekler.
+        """
+        document = await run_in_threadpool(DocumentService.get_document, db, document_id, user_id)
         if not document:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -208,13 +448,13 @@ class DocumentService:
         
         # AI ile özet ve anahtar kelimeler oluştur
         try:
-            summary, keywords = await AIService.generate_summary_and_keywords(document.content)
+            corpus = await run_in_threadpool(SearchIndexService.corpus_statistics, db, user_id)
+            summary, keywords = await get_ai_service().generate_summary_and_keywords(
+                document.content, corpus
+            )
             
             # Dokümanı güncelle
-            document.summary = summary
-            document.keywords = keywords
-            db.commit()
-            db.refresh(document)
+            await run_in_threadpool(DocumentService.save_summary, db, document, summary, keywords)
             
             return document
         except Exception as e:
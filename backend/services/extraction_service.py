@@ -0,0 +1,282 @@
+"""
+Metin Çıkarma Motoru
+====================
+
+PDF/DOCX ayrıştırma CPU yoğun, saf Python işidir. Bu modül çıkarma
+işlerini ayrı süreçlerden oluşan bir havuzda (ProcessPoolExecutor)
+çalıştırır:
+
+- worker sayısı, dosya başına süre sınırı ve bellek sınırı ayarlanabilir,
+- hatalı bir dosya worker sürecini çökertirse API süreci etkilenmez,
+  havuz yeniden oluşturulur,
+- aynı anda en fazla worker sayısı kadar iş gönderilir; süre sınırı
+  kuyrukta beklerken değil, iş bir worker'a verildiğinde başlar,
+- takılan bir iş için havuz yenilendiğinde aynı havuzdaki diğer işler
+  yeni havuza yeniden gönderilir (başarısız sayılmaz),
+- büyük PDF'ler sayfa aralıklarına bölünerek worker'lara dağıtılır.
+
+Worker'larda çalışan fonksiyonlar modül seviyesindedir ve yalnızca
+standart kütüphane + ayrıştırıcıları yükler.
+"""
+
+import asyncio
+import multiprocessing
+import threading
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import AsyncIterator, Iterable, Iterator, List, Optional, Tuple
+from app.config import settings
+
+class ExtractionError(Exception):
+    """Metin çıkarma hatası (süreçler arasında taşınabilir)"""
+
+# Beklenmedik worker çökmesinde işin yeniden denenme sayısı
+MAX_CRASH_RETRIES = 1
+
+# ---------------------------------------------------------------------------
+# Worker fonksiyonları
+# ---------------------------------------------------------------------------
+
+def _init_worker(memory_limit_mb: int) -> None:
+    """Worker süreci için bellek sınırı uygula (yalnızca Unix)"""
+    if memory_limit_mb <= 0:
+        return
+    try:
+        import resource
+        limit = memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (ImportError, ValueError, OSError):
+        pass
+
+def pdf_page_count(file_path: str) -> int:
+    """PDF sayfa sayısını döndür"""
+    try:
+        import PyPDF2
+        with open(file_path, "rb") as file:
+            return len(PyPDF2.PdfReader(file).pages)
+    except Exception as e:
+        raise ExtractionError(f"PDF işleme hatası: {str(e)}")
+
+def iter_pdf_pages(file_path: str, start: int = 0, end: Optional[int] = None) -> Iterator[str]:
+    """PDF'in [start, end) aralığındaki sayfa metinlerini sırayla üret
+
+    Sayfalar okundukça döndürülür; tüm metnin bellekte birikmesi
+    gerekmez.
+    """
+    try:
+        import PyPDF2
+        with open(file_path, "rb") as file:
+            pages = PyPDF2.PdfReader(file).pages
+            end = len(pages) if end is None else min(end, len(pages))
+            for index in range(start, end):
+                yield pages[index].extract_text()
+    except Exception as e:
+        raise ExtractionError(f"PDF işleme hatası: {str(e)}")
+
+def iter_docx_paragraphs(file_path: str) -> Iterator[str]:
+    """DOCX paragraf metinlerini sırayla üret"""
+    try:
+        from docx import Document
+        for paragraph in Document(file_path).paragraphs:
+            yield paragraph.text
+    except Exception as e:
+        raise ExtractionError(f"DOCX işleme hatası: {str(e)}")
+
+def extract_txt_text(file_path: str) -> str:
+    """TXT'den metin çıkar"""
+    encodings = ['utf-8', 'latin-1', 'cp1252', 'iso-8859-1']
+
+    for encoding in encodings:
+        try:
+            with open(file_path, "r", encoding=encoding) as file:
+                return file.read().strip()
+        except UnicodeDecodeError:
+            continue
+        except Exception as e:
+            raise ExtractionError(f"TXT işleme hatası: {str(e)}")
+
+    # Son çare olarak binary olarak oku ve decode et
+    try:
+        with open(file_path, "rb") as file:
+            content = file.read()
+            return content.decode('utf-8', errors='ignore').strip()
+    except Exception as e:
+        raise ExtractionError(f"TXT işleme hatası: {str(e)}")
+
+def iter_text(file_path: str, file_type: str) -> Iterator[str]:
+    """Dosya türüne göre metni parça parça (sayfa/paragraf) üret"""
+    if file_type == "pdf":
+        return iter_pdf_pages(file_path)
+    elif file_type == "docx":
+        return iter_docx_paragraphs(file_path)
+    elif file_type == "txt":
+        return iter([extract_txt_text(file_path)])
+    raise ExtractionError(f"Desteklenmeyen dosya türü: {file_type}")
+
+def join_segments(segments: Iterable[str]) -> str:
+    """Sayfa/paragraf metinlerini tek seferde birleştir"""
+    return "\n".join(segments).strip()
+
+def extract_pdf_range(file_path: str, start: int = 0, end: Optional[int] = None) -> str:
+    """PDF'in [start, end) sayfa aralığındaki metni çıkar"""
+    return "\n".join(iter_pdf_pages(file_path, start, end))
+
+def extract_docx_text(file_path: str) -> str:
+    """DOCX'den metin çıkar"""
+    return join_segments(iter_docx_paragraphs(file_path))
+
+def extract_text(file_path: str, file_type: str) -> str:
+    """Dosya türüne göre metin çıkar"""
+    return join_segments(iter_text(file_path, file_type))
+
+# ---------------------------------------------------------------------------
+# Motor
+# ---------------------------------------------------------------------------
+
+class ExtractionEngine:
+    """Süreç havuzu tabanlı metin çıkarma motoru"""
+
+    def __init__(
+        self,
+        max_workers: int,
+        timeout: float,
+        memory_limit_mb: int = 0,
+        pdf_pages_per_task: int = 50,
+        start_method: str = "spawn"
+    ):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.memory_limit_mb = memory_limit_mb
+        self.pdf_pages_per_task = max(pdf_pages_per_task, 1)
+        self.start_method = start_method
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        # Zaman aşımı nedeniyle bilerek sonlandırılan havuzlar
+        self._recycled: "weakref.WeakSet[ProcessPoolExecutor]" = weakref.WeakSet()
+        # Event loop başına iş sınırı (semaphore'lar loop'a bağlıdır)
+        self._slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def _slot(self) -> asyncio.Semaphore:
+        """Çalışan event loop için worker sayısı kadar iş izni veren semaphore"""
+        loop = asyncio.get_running_loop()
+        semaphore = self._slots.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(max(self.max_workers, 1))
+            self._slots[loop] = semaphore
+        return semaphore
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context(self.start_method),
+                    initializer=_init_worker,
+                    initargs=(self.memory_limit_mb,)
+                )
+            return self._executor
+
+    def _reset(self, executor: ProcessPoolExecutor) -> None:
+        """Çökmüş veya takılmış havuzu sonlandır; sonraki iş yeni havuz açar"""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        # Çalışmakta olan işler iptal edilemediğinden süreçler sonlandırılır;
+        # havuzdaki diğer işler BrokenProcessPool alır (bkz. run)
+        for process in list((getattr(executor, "_processes", None) or {}).values()):
+            if process.is_alive():
+                process.terminate()
+        executor.shutdown(wait=False)
+
+    def _recycle(self, executor: ProcessPoolExecutor) -> None:
+        """Takılan iş için havuzu yenile; diğer işler yeniden gönderilecek"""
+        self._recycled.add(executor)
+        self._reset(executor)
+
+    def shutdown(self) -> None:
+        """Havuzu kapat"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    async def run(self, func, *args):
+        """Fonksiyonu worker havuzunda süre sınırıyla çalıştır"""
+        if self.max_workers <= 0:
+            # Havuz kapalı: süreç içinde, thread'de çalıştır
+            loop = asyncio.get_running_loop()
+            try:
+                return await asyncio.wait_for(loop.run_in_executor(None, func, *args), self.timeout)
+            except asyncio.TimeoutError:
+                raise ExtractionError(f"Metin çıkarma zaman aşımına uğradı ({self.timeout:g} sn)")
+
+        # Gönderilen iş sayısı worker sayısını aşmaz; böylece iş havuz
+        # kuyruğunda beklemez ve süre sınırı yalnızca çalışma süresini ölçer
+        async with self._slot():
+            crashes = 0
+            while True:
+                executor = self._get_executor()
+                try:
+                    future = executor.submit(func, *args)
+                    return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+                except asyncio.TimeoutError:
+                    self._recycle(executor)
+                    raise ExtractionError(f"Metin çıkarma zaman aşımına uğradı ({self.timeout:g} sn)")
+                except BrokenProcessPool:
+                    if executor in self._recycled:
+                        # Başka bir işin zaman aşımı havuzu sonlandırdı; yeniden gönder
+                        continue
+                    self._reset(executor)
+                    crashes += 1
+                    if crashes > MAX_CRASH_RETRIES:
+                        raise ExtractionError("Metin çıkarma worker süreci beklenmedik şekilde sonlandı")
+
+    async def iter_extract(self, file_path: str, file_type: str) -> AsyncIterator[str]:
+        """Dosya metnini parça parça üret
+
+        Büyük PDF'ler sayfa aralıklarına bölünür; aralıklar boş worker
+        oldukça gönderilir (bkz. run) ve metinleri belge sırasıyla, hazır
+        oldukça döndürülür. Böylece indeksleme gibi sonraki aşamalar çıkarma
+        bitmeden başlayabilir.
+        """
+        if file_type != "pdf":
+            yield await self.run(extract_text, file_path, file_type)
+            return
+
+        page_count = await self.run(pdf_page_count, file_path)
+        ranges = self._page_ranges(page_count)
+        if len(ranges) <= 1:
+            yield await self.run(extract_pdf_range, file_path)
+            return
+
+        tasks = [
+            asyncio.ensure_future(self.run(extract_pdf_range, file_path, start, end))
+            for start, end in ranges
+        ]
+        try:
+            for task in tasks:
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def extract(self, file_path: str, file_type: str) -> str:
+        """Dosyadan metin çıkar; büyük PDF'leri sayfa aralıklarına böl"""
+        return join_segments([part async for part in self.iter_extract(file_path, file_type)])
+
+    def _page_ranges(self, page_count: int) -> List[Tuple[int, int]]:
+        """Sayfa sayısını worker'lara dağıtılacak aralıklara böl"""
+        step = self.pdf_pages_per_task
+        return [(start, min(start + step, page_count)) for start in range(0, page_count, step)]
+
+# Uygulama genelinde paylaşılan motor
+extraction_engine = ExtractionEngine(
+    max_workers=settings.EXTRACTION_WORKERS,
+    timeout=settings.EXTRACTION_TIMEOUT,
+    memory_limit_mb=settings.EXTRACTION_MEMORY_LIMIT_MB,
+    pdf_pages_per_task=settings.EXTRACTION_PDF_PAGES_PER_TASK,
+    start_method=settings.EXTRACTION_START_METHOD
+)
@@ -0,0 +1,123 @@
+"""
+Çıkarımsal Özetleme
+===================
+
+Gemini kullanılamadığında kullanılan yerel özetleyici (TextRank). Cümleler
+TF-IDF vektörleriyle temsil edilir ve kosinüs benzerliği grafiği üzerinde
+PageRank ile puanlanır. Cümle-terim matrisi seyrek (COO) dizilerde
+tutulur; benzerlik matrisi hiç oluşturulmaz, her yinelemede
+S·y = X·(Xᵀ·y) çarpımı `np.bincount` ile hesaplanır. Böylece maliyet
+cümle sayısının karesiyle değil sıfır olmayan eleman sayısıyla büyür.
+"""
+
+import re
+from typing import List
+import numpy as np
+from services.keywords import STOP_WORDS
+from services.text_analysis import normalize_turkish, tokenize
+
+# PageRank sönümleme katsayısı ve yakınsama ayarları
+DAMPING = 0.85
+MAX_ITERATIONS = 50
+TOLERANCE = 1e-6
+
+# Özete alınabilecek cümlelerin kelime sayısı sınırları
+MIN_SENTENCE_WORDS = 5
+MAX_SENTENCE_WORDS = 80
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+|\n\s*\n")
+
+# Cümle vektörlerinde yer almayan terimler (tokenize ile aynı biçimde)
+_STOP_TERMS = frozenset(normalize_turkish(word) for word in STOP_WORDS)
+
+
+def split_sentences(text: str) -> List[str]:
+    """Metni cümlelere böl; satır sonları birleştirilir"""
+    sentences = []
+    for sentence in _SENTENCE_RE.split(text):
+        sentence = " ".join(sentence.split())
+        if sentence:
+            sentences.append(sentence)
+    return sentences
+
+
+def _sentence_matrix(token_lists: List[List[str]]):
+    """L2 normalize TF-IDF cümle-terim matrisi (COO: satır, sütun, değer)"""
+    vocabulary = {}
+    rows, cols, counts = [], [], []
+    for row, tokens in enumerate(token_lists):
+        term_counts = {}
+        for token in tokens:
+            term_counts[token] = term_counts.get(token, 0) + 1
+        for term, count in term_counts.items():
+            rows.append(row)
+            cols.append(vocabulary.setdefault(term, len(vocabulary)))
+            counts.append(count)
+
+    rows = np.asarray(rows, dtype=np.int64)
+    cols = np.asarray(cols, dtype=np.int64)
+    values = np.asarray(counts, dtype=np.float64)
+    if not len(values):
+        return rows, cols, values, len(vocabulary)
+
+    # Sublinear tf ve cümle frekansına göre idf
+    sentence_count = len(token_lists)
+    document_frequency = np.bincount(cols, minlength=len(vocabulary))
+    idf = np.log((1 + sentence_count) / (1 + document_frequency)) + 1
+    values = (1 + np.log(values)) * idf[cols]
+
+    norms = np.sqrt(np.bincount(rows, weights=values ** 2, minlength=sentence_count))
+    values /= norms[rows]
+    return rows, cols, values, len(vocabulary)
+
+
+def rank_sentences(token_lists: List[List[str]]) -> np.ndarray:
+    """Her cümle için TextRank puanı"""
+    n = len(token_lists)
+    rows, cols, values, term_count = _sentence_matrix(token_lists)
+    if n == 0:
+        return np.zeros(0)
+
+    def similarity_dot(vector: np.ndarray) -> np.ndarray:
+        # (X·Xᵀ - diag)·vector; köşegen (öz benzerlik) çıkarılır
+        projected = np.bincount(cols, weights=values * vector[rows], minlength=term_count)
+        product = np.bincount(rows, weights=values * projected[cols], minlength=n)
+        return product - np.bincount(rows, weights=values ** 2, minlength=n) * vector
+
+    degree = similarity_dot(np.ones(n))
+    connected = degree > 0
+    scores = np.full(n, 1.0 / n)
+    for _ in range(MAX_ITERATIONS):
+        spread = np.divide(scores, degree, out=np.zeros(n), where=connected)
+        # Bağlantısız cümlelerin puanı tüm cümlelere eşit dağıtılır
+        dangling = scores[~connected].sum() / n
+        updated = (1 - DAMPING) / n + DAMPING * (similarity_dot(spread) + dangling)
+        if np.abs(updated - scores).sum() < TOLERANCE:
+            return updated
+        scores = updated
+    return scores
+
+
+def summarize(text: str, max_sentences: int = 12) -> str:
+    """Metnin en merkezi `max_sentences` cümlesini doküman sırasıyla döndür"""
+    sentences = split_sentences(text)
+    if len(sentences) <= max_sentences:
+        return " ".join(sentences)
+
+    candidates = []
+    token_lists = []
+    for index, sentence in enumerate(sentences):
+        if MIN_SENTENCE_WORDS <= len(sentence.split()) <= MAX_SENTENCE_WORDS:
+            candidates.append(index)
+            token_lists.append([
+                token for token in tokenize(sentence) if token not in _STOP_TERMS
+            ])
+    if len(candidates) <= max_sentences:
+        # Uygun cümle azsa baştaki cümleler kullanılır
+        chosen = candidates or list(range(max_sentences))
+        return " ".join(sentences[index] for index in chosen)
+
+    scores = rank_sentences(token_lists)
+    # Eşit puanda önce gelen cümle tercih edilir (kararlı sıralama)
+    top = np.argsort(-scores, kind="stable")[:max_sentences]
+    return " ".join(sentences[candidates[position]] for position in sorted(top))
@@ -0,0 +1,178 @@
+"""
+Doküman İşleme Hattı
+====================
+
+Yükleme isteği dosyayı kaydedip `queued` durumunda bir doküman kaydı
+oluşturduktan hemen sonra döner. Metin çıkarma (ve isteğe bağlı AI
+özetleme) arka planda, süreç havuzlu çıkarma motorunda yürütülür; istemci
+ilerlemeyi durum endpoint'inden takip eder.
+"""
+
+import asyncio
+import logging
+from collections import Counter
+from typing import List, Optional, Set, Tuple
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+from app.config import settings
+from models.document import Document, DocumentStatus
+from services.ai_service import get_ai_service
+from services.document_service import DocumentService
+from services.extraction_service import extraction_engine, join_segments
+from services.search_service import INDEX_VERSION, SearchIndexService
+from services.text_analysis import tokenize
+
+logger = logging.getLogger(__name__)
+
+# Uygulama başlangıcında yeniden kuyruğa alınan işlerin referansları
+_pending_tasks: Set[asyncio.Task] = set()
+
+class IngestionService:
+    """Arka plan doküman işleme servisi
+
+    Coroutine yalnızca bekler: veritabanı işlemleri, tokenizasyon ve
+    indeks yazımı thread havuzunda, metin çıkarma süreç havuzunda
+    yürütülür; event loop bloklanmaz.
+    """
+
+    @staticmethod
+    async def run(bind, document_id: int) -> None:
+        """Dokümanın metnini çıkar, indeksle ve isteğe bağlı olarak özetle
+
+        `bind` isteğin kullandığı engine/bağlantıdır; iş kendi session'ını
+        açar çünkü isteğin session'ı yanıt döndükten sonra kapanır.
+        Session thread'ler arasında sırayla (eşzamanlı değil) kullanılır.
+        """
+        db = Session(bind=bind)
+        try:
+            document, reused = await run_in_threadpool(IngestionService._start, db, document_id)
+            if document is None:
+                return
+            if reused:
+                if settings.AUTO_SUMMARIZE_ON_UPLOAD and document.content and not document.summary:
+                    await IngestionService._summarize(db, document)
+                return
+
+            try:
+                # Sayfalar geldikçe terimleri say; metin bir kez birleştirilir
+                segments = []
+                term_counts = Counter()
+                await run_in_threadpool(IngestionService._count_terms, term_counts, document.title or "")
+                async for segment in extraction_engine.iter_extract(document.file_path, document.file_type):
+                    segments.append(segment)
+                    await run_in_threadpool(IngestionService._count_terms, term_counts, segment)
+            except Exception as e:
+                await run_in_threadpool(IngestionService._fail, db, document, str(e))
+                return
+
+            try:
+                content = await run_in_threadpool(
+                    IngestionService._store_content, db, document, segments, term_counts
+                )
+            except Exception as e:
+                # İndeks veya commit hatasında doküman `extracting`te kalmaz
+                await run_in_threadpool(db.rollback)
+                await run_in_threadpool(IngestionService._fail, db, document, str(e))
+                return
+
+            if settings.AUTO_SUMMARIZE_ON_UPLOAD and content:
+                await IngestionService._summarize(db, document)
+        finally:
+            await run_in_threadpool(db.close)
+
+    @staticmethod
+    def _start(db: Session, document_id: int) -> Tuple[Optional[Document], bool]:
+        """Dokümanı yükle; işlenmiş kopyası varsa kullan, yoksa `extracting` yap
+
+        (doküman, kopyadan kullanıldı mı) döndürür.
+        """
+        document = db.get(Document, document_id)
+        if document is None:
+            return None, False
+
+        # Aynı içerik bu arada başka bir yüklemede işlendiyse onu kullan
+        if DocumentService.reuse_processed_duplicate(db, document):
+            db.commit()
+            return document, True
+
+        document.status = DocumentStatus.EXTRACTING
+        document.processing_error = None
+        db.commit()
+        return document, False
+
+    @staticmethod
+    def _count_terms(term_counts: Counter, text: str) -> None:
+        """Metnin terimlerini sayaca ekle"""
+        term_counts.update(tokenize(text))
+
+    @staticmethod
+    def _fail(db: Session, document: Document, error: str) -> None:
+        """Dokümanı başarısız olarak işaretle"""
+        document.status = DocumentStatus.FAILED
+        document.processing_error = error
+        db.commit()
+
+    @staticmethod
+    def _store_content(db: Session, document: Document, segments: List[str], term_counts: Counter) -> str:
+        """Çıkarılan metni kaydet, indeksle ve dokümanı `ready` yap"""
+        content = join_segments(segments)
+        document.content = content
+        SearchIndexService.write_postings(db, document, term_counts)
+        SearchIndexService.write_chunks(db, document.id, content)
+        SearchIndexService.write_keywords(db, document)
+        document.index_version = INDEX_VERSION
+        document.status = DocumentStatus.READY
+        db.commit()
+        return content
+
+    @staticmethod
+    async def _summarize(db: Session, document: Document) -> None:
+        """Hazır dokümanı AI ile özetle (hata işleme durumunu değiştirmez)"""
+        # Geri almadan sonra doküman alanları süresi dolmuş olur (yeniden yüklenmez)
+        document_id = document.id
+        try:
+            corpus = await run_in_threadpool(
+                SearchIndexService.corpus_statistics, db, document.user_id
+            )
+            summary, keywords = await get_ai_service().generate_summary_and_keywords(
+                document.content, corpus
+            )
+            await run_in_threadpool(DocumentService.save_summary, db, document, summary, keywords)
+        except Exception:
+            await run_in_threadpool(db.rollback)
+            logger.exception("Otomatik özetleme başarısız (doküman %s)", document_id)
+
+    @staticmethod
+    def resume_pending(bind) -> int:
+        """Yarım kalmış (queued/extracting) dokümanları yeniden kuyruğa al
+
+        Çalışan bir event loop içinden çağrılmalıdır. Dokümanlar en fazla
+        INGESTION_RESUME_CONCURRENCY iş ile sırayla işlenir; başlangıçta
+        doküman başına ayrı görev açılmaz.
+        """
+        db = Session(bind=bind)
+        try:
+            document_ids = [
+                row[0] for row in db.query(Document.id).filter(
+                    Document.status.in_([DocumentStatus.QUEUED, DocumentStatus.EXTRACTING])
+                ).order_by(Document.id)
+            ]
+        finally:
+            db.close()
+
+        pending = iter(document_ids)
+
+        async def worker() -> None:
+            # Tek event loop'ta ortak iteratörden sırayla al (kilit gerekmez)
+            for document_id in pending:
+                try:
+                    await IngestionService.run(bind, document_id)
+                except Exception:
+                    logger.exception("Doküman işleme devam ettirilemedi (doküman %s)", document_id)
+
+        worker_count = min(max(settings.INGESTION_RESUME_CONCURRENCY, 1), len(document_ids))
+        for _ in range(worker_count):
+            task = asyncio.create_task(worker())
+            _pending_tasks.add(task)
+            task.add_done_callback(_pending_tasks.discard)
+        return len(document_ids)
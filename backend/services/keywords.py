@@ -0,0 +1,128 @@
+"""
+Anahtar Kelime Çıkarma
+======================
+
+Gemini kullanılamadığında özetle birlikte döndürülen anahtar kelimeler
+için hızlı, sözlük tabanlı çıkarıcı. Tokenizasyon ve sayım tek geçişte
+C düzeyinde yapılır (`str.split` + `Counter`); noktalama temizliği
+derlenmiş regex ile yalnızca farklı tokenler üzerinde yapılır ve en iyi
+adaylar tüm kelimeler sıralanmadan `heapq` ile seçilir. İsteğe bağlı olarak
+kullanıcının doküman korpusundaki doküman frekanslarıyla TF-IDF
+ağırlıklandırması uygulanır.
+
+Saklanan anahtar kelime metinleri `parse_keyword_list` ile etiket
+indeksine (`document_keywords`) yazılacak listeye çevrilir.
+"""
+
+import heapq
+import json
+import math
+import re
+from collections import Counter
+from typing import Callable, List, Mapping, NamedTuple, Optional, Sequence
+from services.text_analysis import fold_case_turkish, normalize_turkish
+
+# En az 4 karakterli harf/rakam dizileri (alt çizgi hariç)
+KEYWORD_RE = re.compile(r"[^\W_]{4,}", re.UNICODE)
+
+# Anahtar kelime listelerindeki ayraçlar ve madde işaretleri ("1.", "-", "•")
+_KEYWORD_SEPARATOR_RE = re.compile(r"[,;\n]+")
+_KEYWORD_BULLET_RE = re.compile(r"^(?:\d+[.)]|[-*•])\s*")
+
+# TF-IDF'te korpus istatistiği sorgulanacak aday sayısı (limit katı)
+CANDIDATE_FACTOR = 4
+
+# Türkçe bağlaç, zamir ve edatlar (küçük harf)
+STOP_WORDS = frozenset({
+    've', 'bir', 'bu', 'da', 'de', 'ile', 'için', 'olarak', 'gibi', 'kadar', 'daha', 'en', 'çok', 'az',
+    'bazı', 'her', 'hiç', 'yok', 'var', 'olmak', 'oldu', 'olacak', 'ise', 'ama', 'fakat', 'ancak',
+    'lakin', 'çünkü', 'zira', 'madem', 'mademki', 'şu', 'o', 'bunlar', 'onlar', 'biz',
+    'siz', 'ben', 'sen', 'bizim', 'sizin', 'onların', 'benim', 'senin', 'onun',
+    'tarafından', 'hakkında', 'üzerinde', 'altında', 'yanında', 'karşısında', 'önünde',
+    'arkasında', 'içinde', 'dışında', 'arasında', 'yukarıda', 'aşağıda', 'sağında', 'solunda',
+    'öncesinde', 'sonrasında', 'sırasında', 'esnasında', 'zamanında', 'vaktinde',
+    'dolayı', 'sebebiyle', 'nedeniyle', 'yüzünden', 'sayesinde', 'beraber', 'birlikte',
+    'olan', 'olup', 'olduğu', 'olduğunu', 'olması', 'şekilde', 'şekli', 'göre',
+    'ayrıca', 'yani', 'veya', 'ya', 'hem', 'diğer', 'tüm', 'bütün', 'bunu', 'buna',
+    'bunun', 'şunu', 'onu', 'ona', 'sonra', 'önce', 'kendi', 'gelen', 'eden', 'edilen',
+    'yapılan', 'ilgili', 'birçok', 'çeşitli', 'farklı', 'aynı', 'nasıl', 'neden', 'niçin'
+})
+
+class CorpusStatistics(NamedTuple):
+    """TF-IDF için korpus istatistikleri
+
+    `document_frequency` normalize edilmiş terimler için doküman
+    frekanslarını döndürür (bkz. SearchIndexService.corpus_statistics).
+    """
+    total_documents: int
+    document_frequency: Callable[[Sequence[str]], Mapping[str, int]]
+
+def count_words(text: str) -> Counter:
+    """Durak kelimeler ve sayılar hariç kelime frekansları"""
+    # Ham tokenler C düzeyinde sayılır; küçültme ve regex yalnızca farklı
+    # tokenlere uygulanır
+    raw_counts = Counter(text.split())
+    counts: Counter = Counter()
+    for token, count in raw_counts.items():
+        for word in KEYWORD_RE.findall(fold_case_turkish(token)):
+            counts[word] += count
+    # Silme işlemi token başına değil, farklı kelimeler üzerinde yapılır
+    for word in STOP_WORDS.intersection(counts):
+        del counts[word]
+    for word in [word for word in counts if word.isdigit()]:
+        del counts[word]
+    return counts
+
+def extract_keywords(
+    text: str,
+    limit: int = 15,
+    corpus: Optional[CorpusStatistics] = None
+) -> List[str]:
+    """Metnin en önemli `limit` anahtar kelimesini döndür
+
+    Korpus istatistikleri verilirse en sık adaylar doküman frekanslarıyla
+    yeniden puanlanır; her dokümanda geçen genel kelimeler geriye düşer.
+    """
+    counts = count_words(text)
+    if corpus is None or corpus.total_documents <= 1:
+        return [word for word, _ in counts.most_common(limit)]
+
+    candidates = counts.most_common(limit * CANDIDATE_FACTOR)
+    normalized = {word: normalize_turkish(word) for word, _ in candidates}
+    frequencies = corpus.document_frequency(list(set(normalized.values())))
+    total = corpus.total_documents
+
+    def tf_idf(item):
+        word, count = item
+        document_frequency = frequencies.get(normalized[word], 0)
+        return count * (math.log((1 + total) / (1 + document_frequency)) + 1)
+
+    return [word for word, _ in heapq.nlargest(limit, candidates, key=tf_idf)]
+
+def parse_keyword_list(keywords: Optional[str], max_length: int = 128) -> List[str]:
+    """`Document.keywords` metnini tekilleştirilmiş anahtar kelime listesine çevir
+
+    Virgülle/satırla ayrılmış metin (AI ve yerel çıkarıcı çıktısı) veya
+    JSON dizi kabul edilir. Kelimeler Türkçe kurallarıyla küçültülür,
+    sıra korunur.
+    """
+    if not keywords:
+        return []
+    items: Sequence = ()
+    if keywords.lstrip().startswith("["):
+        try:
+            parsed = json.loads(keywords)
+            if isinstance(parsed, list):
+                items = [str(item) for item in parsed]
+        except ValueError:
+            pass
+    if not items:
+        items = _KEYWORD_SEPARATOR_RE.split(keywords)
+
+    result = {}
+    for item in items:
+        keyword = " ".join(fold_case_turkish(_KEYWORD_BULLET_RE.sub("", item.strip())).split())
+        keyword = keyword.strip("\"'.")[:max_length]
+        if keyword:
+            result.setdefault(keyword, None)
+    return list(result)
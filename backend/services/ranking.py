@@ -0,0 +1,78 @@
+"""
+Alaka Düzeyi Sıralaması
+=======================
+
+BM25 puanlama fonksiyonları. Terim frekansları, doküman uzunlukları ve
+doküman frekansları çağıran tarafça (ör. arama indeksinden) sağlanır.
+"""
+
+import math
+from typing import Dict, List, Optional, Tuple
+
+# BM25 parametreleri
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+def bm25_idf(document_frequency: int, total_documents: int) -> float:
+    """Terimin ters doküman frekansı (her zaman pozitif)"""
+    return math.log(1 + (total_documents - document_frequency + 0.5) / (document_frequency + 0.5))
+
+def bm25_term_score(
+    term_frequency: int,
+    idf: float,
+    document_length: int,
+    average_length: float,
+    k1: float = BM25_K1,
+    b: float = BM25_B
+) -> float:
+    """Tek bir terimin doküman için BM25 katkısı"""
+    if term_frequency <= 0:
+        return 0.0
+    length_ratio = document_length / average_length if average_length > 0 else 1.0
+    denominator = term_frequency + k1 * (1 - b + b * length_ratio)
+    return idf * term_frequency * (k1 + 1) / denominator
+
+class BM25Scorer:
+    """Önceden hesaplanmış istatistiklerle BM25 puanlayıcı"""
+
+    def __init__(self, total_documents: int, average_length: float):
+        self.total_documents = max(total_documents, 1)
+        self.average_length = average_length or 0.0
+
+    def score_all(
+        self,
+        postings: Dict[str, Dict[int, int]],
+        document_lengths: Dict[int, int],
+        document_frequencies: Optional[Dict[str, int]] = None,
+        require_all: bool = True
+    ) -> List[Tuple[int, float]]:
+        """Terim -> {doküman: frekans} eşlemesinden doküman puanlarını hesapla
+
+        `document_frequencies` verilmezse doküman frekansı posting listesinin
+        uzunluğundan alınır. `require_all` True ise yalnızca tüm terimleri
+        içeren dokümanlar puanlanır. Sonuç puana göre azalan sırada döner.
+        """
+        document_frequencies = document_frequencies or {}
+        if require_all:
+            doc_sets = [set(term_postings) for term_postings in postings.values()]
+            candidates = set.intersection(*doc_sets) if doc_sets else set()
+        else:
+            candidates = set().union(*(set(p) for p in postings.values()))
+
+        idfs = {
+            term: bm25_idf(document_frequencies.get(term, len(term_postings)), self.total_documents)
+            for term, term_postings in postings.items()
+        }
+
+        scores = []
+        for document_id in candidates:
+            length = document_lengths.get(document_id) or 0
+            score = sum(
+                bm25_term_score(term_postings.get(document_id, 0), idfs[term], length, self.average_length)
+                for term, term_postings in postings.items()
+            )
+            scores.append((document_id, score))
+
+        # Eşit puanlarda yeni dokümanlar önce gelsin
+        scores.sort(key=lambda item: (-item[1], -item[0]))
+        return scores
@@ -0,0 +1,402 @@
+"""
+Tam Metin Arama Servisi
+=======================
+
+Doküman başlık ve içeriklerinden oluşturulan ters indeks (posting list)
+üzerinden arama yapar. İndeks `document_terms` tablosunda tutulur; bu
+sayede hem SQLite hem PostgreSQL üzerinde `(user_id, term)` indeksiyle
+aralık taraması yapılır ve sorgu süresi doküman sayısından bağımsız kalır.
+
+Alaka sıralaması için terim frekansları (`document_terms.term_frequency`)
+ve doküman uzunlukları (`documents.term_count`) indeksleme sırasında
+hesaplanıp saklanır; sorgu anında metin yeniden taranmaz.
+
+Soru-cevap için dokümanlar ayrıca küçük parçalara bölünüp
+`document_chunks` tablosunda terim frekanslarıyla saklanır; soru
+sorulduğunda yalnızca en alakalı parçalar (BM25) prompt'a eklenir.
+
+Özetleme sırasında üretilen anahtar kelimeler `document_keywords`
+tablosunda tutulur; etiket filtresi ve faset sayımları
+`(user_id, keyword)` indeksinden yapılır.
+"""
+
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import or_, select, intersect, func
+from sqlalchemy.orm import Session
+from app.config import settings
+from models.document import Document, DocumentStatus
+from models.search_index import MAX_KEYWORD_LENGTH, DocumentChunk, DocumentKeyword, DocumentTerm
+from services.chunking import split_into_chunks
+from services.keywords import CorpusStatistics, parse_keyword_list
+from services.ranking import BM25Scorer
+from services.text_analysis import MIN_PREFIX_LENGTH, fold_case_turkish, term_frequency, tokenize, tokenize_all
+
+# Türetilmiş indekslerin (terimler, parçalar, anahtar kelimeler) biçim sürümü;
+# artırıldığında mevcut dokümanlar geriye dönük doldurmada yeniden işlenir
+INDEX_VERSION = 1
+
+class SearchIndexService:
+    """Ters indeks yönetimi ve arama servisi"""
+
+    @staticmethod
+    def index_document(db: Session, document: Document) -> None:
+        """Dokümanı indeksle (mevcut kayıtların yerine yazar)
+
+        Değişiklikler commit edilmez; çağıran taraf kendi transaction'ı
+        içinde commit etmelidir.
+        """
+        term_counts = Counter(tokenize_all((document.title or "", document.content or "")))
+        SearchIndexService.write_postings(db, document, term_counts)
+        SearchIndexService.write_chunks(db, document.id, document.content or "")
+        SearchIndexService.write_keywords(db, document)
+        document.index_version = INDEX_VERSION
+
+    @staticmethod
+    def write_postings(db: Session, document: Document, term_counts: Counter) -> None:
+        """Önceden sayılmış terim frekanslarını dokümanın indeksi olarak yaz
+
+        Metni sayfa sayfa işleyen çağıranlar (ör. işleme hattı) terimleri
+        parçalar geldikçe sayar; tam metnin yeniden taranması gerekmez.
+        Değişiklikler commit edilmez.
+        """
+        SearchIndexService.remove_document(db, document.id)
+
+        document.term_count = sum(term_counts.values())
+        if not term_counts:
+            return
+
+        db.execute(
+            DocumentTerm.__table__.insert(),
+            [
+                {
+                    "document_id": document.id,
+                    "user_id": document.user_id,
+                    "term": term,
+                    "term_frequency": count,
+                }
+                for term, count in term_counts.items()
+            ],
+        )
+
+    @staticmethod
+    def write_chunks(db: Session, document_id: int, content: str) -> int:
+        """Metni soru-cevap parçalarına bölüp terim frekanslarıyla yaz
+
+        Değişiklikler commit edilmez. Yazılan parça sayısını döndürür.
+        """
+        db.query(DocumentChunk).filter(
+            DocumentChunk.document_id == document_id
+        ).delete(synchronize_session=False)
+
+        rows = []
+        for position, chunk in enumerate(split_into_chunks(content, settings.ASK_CHUNK_TOKENS)):
+            term_counts = Counter(tokenize(chunk))
+            rows.append({
+                "document_id": document_id,
+                "position": position,
+                "content": chunk,
+                "term_count": sum(term_counts.values()),
+                "term_frequencies": dict(term_counts),
+            })
+        if rows:
+            db.execute(DocumentChunk.__table__.insert(), rows)
+        return len(rows)
+
+    @staticmethod
+    def write_keywords(db: Session, document: Document) -> int:
+        """`document.keywords` metnini etiket indeksine yaz
+
+        Ağırlık listedeki sıraya göre azalır (ilk kelime 1.0). Değişiklikler
+        commit edilmez. Yazılan anahtar kelime sayısını döndürür.
+        """
+        db.query(DocumentKeyword).filter(
+            DocumentKeyword.document_id == document.id
+        ).delete(synchronize_session=False)
+
+        keywords = parse_keyword_list(document.keywords, MAX_KEYWORD_LENGTH)
+        if keywords:
+            db.execute(
+                DocumentKeyword.__table__.insert(),
+                [
+                    {
+                        "document_id": document.id,
+                        "user_id": document.user_id,
+                        "keyword": keyword,
+                        "weight": 1.0 - position / len(keywords),
+                    }
+                    for position, keyword in enumerate(keywords)
+                ],
+            )
+        return len(keywords)
+
+    @staticmethod
+    def remove_document(db: Session, document_id: int) -> None:
+        """Dokümanın indeks kayıtlarını sil"""
+        db.query(DocumentTerm).filter(
+            DocumentTerm.document_id == document_id
+        ).delete(synchronize_session=False)
+        db.query(DocumentChunk).filter(
+            DocumentChunk.document_id == document_id
+        ).delete(synchronize_session=False)
+        db.query(DocumentKeyword).filter(
+            DocumentKeyword.document_id == document_id
+        ).delete(synchronize_session=False)
+
+    @staticmethod
+    def match_keywords(user_id: int, keywords: Sequence[str]):
+        """Verilen anahtar kelimelerin tümüne sahip doküman ID'leri için select döndür
+
+        Karşılaştırma küçültülmüş tam eşleşmedir (etiket seçimi).
+        Geçerli anahtar kelime yoksa None döner.
+        """
+        normalized = list(dict.fromkeys(
+            " ".join(fold_case_turkish(keyword).split()) for keyword in keywords
+        ))
+        normalized = [keyword for keyword in normalized if keyword]
+        if not normalized:
+            return None
+
+        selects = [
+            select(DocumentKeyword.document_id).where(
+                DocumentKeyword.user_id == user_id,
+                DocumentKeyword.keyword == keyword
+            )
+            for keyword in normalized
+        ]
+        return selects[0] if len(selects) == 1 else intersect(*selects)
+
+    @staticmethod
+    def keyword_facets(
+        db: Session,
+        user_id: int,
+        filters: Tuple = (),
+        limit: int = 50
+    ) -> List[Tuple[str, int]]:
+        """Anahtar kelime başına doküman sayıları (çoktan aza)
+
+        `filters` Document üzerindeki ek koşullardır (ör. dosya türü,
+        seçili etiketler); koşul yoksa sayım yalnızca etiket indeksinden
+        yapılır.
+        """
+        count = func.count(DocumentKeyword.document_id)
+        query = db.query(DocumentKeyword.keyword, count).filter(
+            DocumentKeyword.user_id == user_id
+        )
+        if filters:
+            query = query.join(Document, Document.id == DocumentKeyword.document_id).filter(*filters)
+        return [
+            (keyword, total)
+            for keyword, total in query.group_by(DocumentKeyword.keyword).order_by(
+                count.desc(), DocumentKeyword.keyword
+            ).limit(limit)
+        ]
+
+    @staticmethod
+    def match_query(user_id: int, query: str):
+        """Sorgudaki tüm terimleri içeren doküman ID'leri için select döndür
+
+        Türkçe eklemeli bir dil olduğundan yeterince uzun terimler önek
+        olarak eşleştirilir ("doküman" -> "dokümanı", "dokümanlar").
+        Sorgudan hiç terim çıkmazsa None döner.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return None
+
+        selects = [
+            select(DocumentTerm.document_id).where(
+                DocumentTerm.user_id == user_id,
+                SearchIndexService._term_condition(term)
+            )
+            for term in terms
+        ]
+        return selects[0] if len(selects) == 1 else intersect(*selects)
+
+    @staticmethod
+    def _term_condition(term: str):
+        """Terim için indeks dostu (aralık) eşleşme koşulu"""
+        if len(term) < MIN_PREFIX_LENGTH:
+            return DocumentTerm.term == term
+        upper_bound = term[:-1] + chr(ord(term[-1]) + 1)
+        return (DocumentTerm.term >= term) & (DocumentTerm.term < upper_bound)
+
+    @staticmethod
+    def rank(
+        db: Session,
+        user_id: int,
+        query: str,
+        filters: tuple = (),
+        limit: int = 20,
+        offset: int = 0
+    ) -> List[Tuple[int, float]]:
+        """Sorguyla eşleşen dokümanları BM25 puanına göre sırala
+
+        `filters` Document üzerindeki ek filtrelerdir (ör. dosya türü).
+        (doküman_id, puan) çiftlerinin istenen sayfasını döndürür.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+
+        postings: Dict[str, Dict[int, int]] = {}
+        document_frequencies: Dict[str, int] = {}
+        document_lengths: Dict[int, int] = {}
+        for term in terms:
+            condition = SearchIndexService._term_condition(term)
+            rows = db.query(
+                DocumentTerm.document_id,
+                DocumentTerm.term_frequency,
+                Document.term_count
+            ).join(
+                Document, Document.id == DocumentTerm.document_id
+            ).filter(
+                DocumentTerm.user_id == user_id,
+                condition,
+                *filters
+            ).all()
+
+            # Önek eşleşmesinde aynı doküman birden fazla terimle gelebilir
+            term_postings: Dict[int, int] = {}
+            for document_id, frequency, length in rows:
+                term_postings[document_id] = term_postings.get(document_id, 0) + frequency
+                document_lengths[document_id] = length or 0
+            if not term_postings:
+                return []
+            postings[term] = term_postings
+
+            # IDF, ek filtrelerden bağımsız olarak kullanıcının tüm korpusundan hesaplanır
+            if filters:
+                document_frequencies[term] = db.query(
+                    func.count(func.distinct(DocumentTerm.document_id))
+                ).filter(DocumentTerm.user_id == user_id, condition).scalar()
+            else:
+                document_frequencies[term] = len(term_postings)
+
+        total_documents, average_length = db.query(
+            func.count(Document.id),
+            func.avg(Document.term_count)
+        ).filter(Document.user_id == user_id).one()
+
+        scores = BM25Scorer(total_documents, float(average_length or 0)).score_all(
+            postings, document_lengths, document_frequencies
+        )
+
+        return scores[offset:offset + limit]
+
+    @staticmethod
+    def corpus_statistics(db: Session, user_id: int) -> CorpusStatistics:
+        """Kullanıcının korpusu için TF-IDF istatistikleri
+
+        Doküman frekansları yalnızca istenen terimler için, ters indeksten
+        (`user_id, term` indeksiyle) sorgulanır. Sorgu her çağrıda kendi
+        kısa ömürlü session'ını açar; istatistikler thread havuzunda
+        (eşzamanlı) çalışan özetlemelerde güvenle kullanılabilir.
+        """
+        total_documents = db.query(func.count(Document.id)).filter(
+            Document.user_id == user_id
+        ).scalar()
+
+        bind = db.get_bind()
+
+        def document_frequency(terms) -> Dict[str, int]:
+            if not terms:
+                return {}
+            with Session(bind=bind) as session:
+                return dict(
+                    session.query(DocumentTerm.term, func.count(DocumentTerm.document_id)).filter(
+                        DocumentTerm.user_id == user_id,
+                        DocumentTerm.term.in_(terms)
+                    ).group_by(DocumentTerm.term).all()
+                )
+
+        return CorpusStatistics(total_documents, document_frequency)
+
+    @staticmethod
+    def retrieve_chunks(
+        db: Session,
+        document: Document,
+        question: str,
+        top_k: Optional[int] = None
+    ) -> List[str]:
+        """Soruyla en alakalı parçaları doküman sırasıyla döndür
+
+        Parçalar BM25 ile puanlanır; eşleşme yoksa dokümanın ilk parçaları
+        kullanılır. Parçaları henüz yazılmamış dokümanlar bellekte bölünür.
+        """
+        top_k = top_k or settings.ASK_CONTEXT_CHUNKS
+        rows = db.query(
+            DocumentChunk.position,
+            DocumentChunk.content,
+            DocumentChunk.term_count,
+            DocumentChunk.term_frequencies
+        ).filter(
+            DocumentChunk.document_id == document.id
+        ).order_by(DocumentChunk.position).all()
+
+        if rows:
+            chunks = {position: content for position, content, _, _ in rows}
+            lengths = {position: term_count for position, _, term_count, _ in rows}
+            frequencies = {position: term_frequencies for position, _, _, term_frequencies in rows}
+        else:
+            chunks, lengths, frequencies = {}, {}, {}
+            for position, chunk in enumerate(split_into_chunks(document.content or "", settings.ASK_CHUNK_TOKENS)):
+                term_counts = Counter(tokenize(chunk))
+                chunks[position] = chunk
+                lengths[position] = sum(term_counts.values())
+                frequencies[position] = term_counts
+
+        if len(chunks) <= top_k:
+            return list(chunks.values())
+
+        postings: Dict[str, Dict[int, int]] = {}
+        for term in dict.fromkeys(tokenize(question)):
+            term_postings: Dict[int, int] = {}
+            for position, term_counts in frequencies.items():
+                frequency = term_frequency(term_counts, term)
+                if frequency:
+                    term_postings[position] = frequency
+            postings[term] = term_postings
+
+        average_length = sum(lengths.values()) / len(lengths)
+        scores = BM25Scorer(len(chunks), average_length).score_all(
+            postings, lengths, require_all=False
+        ) if postings else []
+
+        selected = [position for position, _ in scores[:top_k]] or list(chunks)[:top_k]
+        return [chunks[position] for position in sorted(selected)]
+
+    @staticmethod
+    def reindex_missing(db: Session, batch_size: int = 100, stop: Optional[threading.Event] = None) -> int:
+        """Henüz indekslenmemiş dokümanları indeksle (geriye dönük doldurma)
+
+        Yalnızca `index_version` işareti eksik veya eski olan dokümanlar
+        taranır; işlenen her doküman işaretlenir ve her parti ayrı commit
+        edilir. Böylece terim, parça veya anahtar kelime üretmeyen dokümanlar
+        her başlangıçta yeniden işlenmez. `stop` kurulursa sonraki partiye
+        geçilmez. Terimleri yazılan doküman sayısını döndürür.
+        """
+        indexed = 0
+        last_id = 0
+        while stop is None or not stop.is_set():
+            documents: List[Document] = db.query(Document).filter(
+                Document.id > last_id,
+                or_(Document.index_version.is_(None), Document.index_version < INDEX_VERSION)
+            ).order_by(Document.id).limit(batch_size).all()
+            if not documents:
+                break
+            for document in documents:
+                if document.status == DocumentStatus.READY and document.term_count is None:
+                    SearchIndexService.index_document(db, document)
+                    indexed += 1
+                    continue
+                if document.status == DocumentStatus.READY and document.content is not None:
+                    # Terimleri yazılmış eski dokümanların soru-cevap parçaları
+                    SearchIndexService.write_chunks(db, document.id, document.content)
+                # İşlenmemiş dokümanların terimlerini ve parçalarını işleme hattı yazar
+                SearchIndexService.write_keywords(db, document)
+                document.index_version = INDEX_VERSION
+            db.commit()
+            last_id = documents[-1].id
+        return indexed
@@ -0,0 +1,68 @@
+"""
+Metin Analizi Yardımcıları
+==========================
+
+Arama indeksi ve anahtar kelime çıkarma için ortak, Türkçe'ye duyarlı
+normalizasyon ve tokenizasyon fonksiyonları.
+"""
+
+import re
+import unicodedata
+from typing import Iterable, List, Mapping
+
+# Harf ve rakam dizileri (alt çizgi hariç)
+TOKEN_RE = re.compile(r"[^\W_]+", re.UNICODE)
+
+# İndekslenen terimlerin uzunluk sınırları
+MIN_TOKEN_LENGTH = 2
+MAX_TOKEN_LENGTH = 64
+
+# Bu uzunluktan kısa sorgu terimleri önek olarak değil, tam eşleşme ile aranır
+MIN_PREFIX_LENGTH = 3
+
+
+def fold_case_turkish(text: str) -> str:
+    """Metni Türkçe kurallarıyla küçült ("I" -> "ı", "İ" -> "i")"""
+    # str.replace, eşleme tablolu str.translate'ten belirgin şekilde hızlıdır
+    return text.replace("I", "ı").replace("İ", "i").lower()
+
+
+def normalize_turkish(text: str) -> str:
+    """Metni Türkçe kurallarıyla küçült ve aksanlardan arındır.
+
+    "Doküman", "DOKÜMAN" ve "dokuman" aynı biçime ("dokuman") indirgenir;
+    böylece kullanıcı Türkçe karakter kullanmadan da arama yapabilir.
+    """
+    lowered = fold_case_turkish(text).replace("ı", "i")
+    decomposed = unicodedata.normalize("NFKD", lowered)
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def tokenize(text: str) -> List[str]:
+    """Metni normalize edilmiş terimlere böl"""
+    if not text:
+        return []
+    return [
+        token[:MAX_TOKEN_LENGTH]
+        for token in TOKEN_RE.findall(normalize_turkish(text))
+        if len(token) >= MIN_TOKEN_LENGTH
+    ]
+
+
+def tokenize_all(texts: Iterable[str]) -> List[str]:
+    """Birden fazla metni sırayla tokenize et"""
+    tokens: List[str] = []
+    for text in texts:
+        tokens.extend(tokenize(text))
+    return tokens
+
+
+def term_frequency(term_counts: Mapping[str, int], term: str) -> int:
+    """Sorgu teriminin sayılmış terimlerdeki frekansı
+
+    Kısa terimler tam, diğerleri önek olarak eşleşir (arama indeksiyle aynı
+    kural; bkz. SearchIndexService._term_condition).
+    """
+    if len(term) < MIN_PREFIX_LENGTH:
+        return term_counts.get(term, 0)
+    return sum(count for token, count in term_counts.items() if token.startswith(term))
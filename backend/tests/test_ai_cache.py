@@ -0,0 +1,118 @@
+"""
+AI Sonuç Önbelleği Testleri
+===========================
+"""
+
+import asyncio
+import pytest
+from services.ai_cache import AIResultCache, InMemoryCacheBackend, ai_result_cache
+from services.ai_service import AIService
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+class CountingModel:
+    """Çağrı sayısını tutan sahte Gemini modeli"""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def generate_content_async(self, prompt):
+        self.calls += 1
+        return FakeResponse('{"summary": "Önbellekli özet", "keywords": ["önbellek"]}')
+
+@pytest.fixture(autouse=True)
+def clear_ai_cache():
+    asyncio.run(ai_result_cache.clear())
+    yield
+    asyncio.run(ai_result_cache.clear())
+
+def make_ai_service(model, model_name="test-model"):
+    ai_service = AIService()
+    ai_service.use_gemini = True
+    ai_service.model = model
+    ai_service.model_name = model_name
+    return ai_service
+
+class TestInMemoryBackend:
+    """Süreç içi LRU önbellek testleri"""
+
+    def test_lru_eviction(self):
+        """Kapasite aşılınca en eski kullanılan kayıt atılır"""
+        backend = InMemoryCacheBackend(max_entries=2)
+
+        async def run():
+            await backend.set("a", "1", 60)
+            await backend.set("b", "2", 60)
+            await backend.get("a")
+            await backend.set("c", "3", 60)
+            return [await backend.get(key) for key in ("a", "b", "c")]
+
+        assert asyncio.run(run()) == ["1", None, "3"]
+
+    def test_ttl_expiry(self):
+        """Süresi dolan kayıt döndürülmez"""
+        backend = InMemoryCacheBackend()
+
+        async def run():
+            await backend.set("a", "1", -1)
+            return await backend.get("a")
+
+        assert asyncio.run(run()) is None
+        assert len(backend) == 0
+
+class TestAIResultCache:
+    """Önbellek katmanı testleri"""
+
+    def test_hit_miss_counters(self):
+        """İsabet ve ıskalama sayaçları güncellenir"""
+        cache = AIResultCache(InMemoryCacheBackend(), ttl=60)
+
+        async def run():
+            await cache.get("anahtar")
+            await cache.set("anahtar", ["özet", "kelime"])
+            return await cache.get("anahtar")
+
+        assert asyncio.run(run()) == ["özet", "kelime"]
+        assert cache.stats() == {"backend": "memory", "hits": 1, "misses": 1, "hit_rate": 0.5}
+
+    def test_key_depends_on_all_parts(self):
+        """Anahtar model, içerik ve soruya göre değişir"""
+        key = AIResultCache.make_key("model", "1", "içerik", "soru")
+        assert key == AIResultCache.make_key("model", "1", "içerik", "soru")
+        assert key != AIResultCache.make_key("model-2", "1", "içerik", "soru")
+        assert key != AIResultCache.make_key("model", "1", "içerik", "başka soru")
+        assert AIResultCache.make_key("ab", "c") != AIResultCache.make_key("a", "bc")
+
+class TestAIServiceCaching:
+    """AIService önbellek entegrasyonu testleri"""
+
+    def test_summary_is_cached_by_content(self):
+        """Aynı içerik için LLM yalnızca bir kez çağrılır"""
+        model = CountingModel()
+        ai_service = make_ai_service(model)
+
+        async def run():
+            first = await ai_service.generate_summary_and_keywords("aynı içerik")
+            second = await make_ai_service(model).generate_summary_and_keywords("aynı içerik")
+            await ai_service.generate_summary_and_keywords("farklı içerik")
+            return first, second
+
+        first, second = asyncio.run(run())
+        assert first == second == ("Önbellekli özet", "önbellek")
+        assert model.calls == 2
+
+    def test_answer_is_cached_by_question(self):
+        """Aynı soru tekrarlandığında önbellekten cevaplanır"""
+        model = CountingModel()
+        ai_service = make_ai_service(model)
+
+        async def run():
+            await ai_service.answer_question("Nedir?", "içerik")
+            await ai_service.answer_question("Nedir?", "içerik")
+            await ai_service.answer_question("Neden?", "içerik")
+
+        asyncio.run(run())
+        assert model.calls == 2
+        assert ai_result_cache.hits == 1
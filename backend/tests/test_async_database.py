@@ -0,0 +1,136 @@
+"""
+Async Veritabanı Katmanı Testleri
+=================================
+"""
+
+import asyncio
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from app.database import Base, get_async_database_url
+from models.document import Document
+from fastapi import HTTPException
+from models.user import User, UserCreate
+from services.auth_service import AuthService, principal_cache
+from services.document_service import DocumentService
+
+# Test veritabanı
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+@pytest.fixture(autouse=True)
+def setup_database():
+    Base.metadata.create_all(bind=engine)
+    principal_cache.clear()
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+@pytest.fixture
+def user_with_documents():
+    db = TestingSessionLocal()
+    user = User(email="async@example.com", username="asyncuser", hashed_password="x")
+    db.add(user)
+    db.flush()
+    for index in range(5):
+        db.add(Document(
+            title=f"Doküman {index}",
+            filename=f"doc_{index}.txt",
+            file_path=f"uploads/doc_{index}.txt",
+            file_size=10,
+            file_type="txt",
+            content="içerik",
+            user_id=user.id
+        ))
+    db.commit()
+    user_id = user.id
+    db.close()
+    return user_id
+
+def run_with_session(scenario):
+    """Senaryoyu yeni bir async engine ile çalıştır"""
+    async def runner():
+        async_engine = create_async_engine(get_async_database_url(SQLALCHEMY_DATABASE_URL))
+        try:
+            return await scenario(async_sessionmaker(async_engine, expire_on_commit=False))
+        finally:
+            await async_engine.dispose()
+    return asyncio.run(runner())
+
+class TestAsyncDatabase:
+    """Async engine ve servis varyantları testleri"""
+
+    def test_async_url_derivation(self):
+        """Senkron adresten async sürücü adresi türetilir"""
+        assert get_async_database_url("sqlite:///./db.sqlite") == "sqlite+aiosqlite:///./db.sqlite"
+        assert get_async_database_url("postgresql://u:p@host/db") == "postgresql+asyncpg://u:p@host/db"
+        assert get_async_database_url("postgresql+psycopg2://u:p@host/db") == "postgresql+asyncpg://u:p@host/db"
+        with pytest.raises(ValueError):
+            get_async_database_url("mssql+pyodbc://host/db")
+
+    def test_async_document_queries(self, user_with_documents):
+        """Async liste ve tekil doküman sorguları"""
+        async def scenario(session_factory):
+            async with session_factory() as db:
+                documents = await DocumentService.get_user_documents_async(db, user_with_documents, limit=3)
+                document = await DocumentService.get_document_async(db, documents[0].id, user_with_documents)
+                missing = await DocumentService.get_document_async(db, documents[0].id, user_with_documents + 1)
+                return documents, document, missing
+
+        documents, document, missing = run_with_session(scenario)
+        assert [doc.title for doc in documents] == ["Doküman 0", "Doküman 1", "Doküman 2"]
+        assert document.content == "içerik"
+        assert missing is None
+
+    def test_async_principal_resolution(self, user_with_documents):
+        """Async session ile kullanıcı çözümleme ve önbellekleme"""
+        token = AuthService.create_access_token({"sub": str(user_with_documents)})
+
+        async def scenario(session_factory):
+            async with session_factory() as db:
+                return await AuthService.resolve_principal_async(db, token)
+
+        principal = run_with_session(scenario)
+        assert principal.username == "asyncuser"
+        assert principal_cache.get(user_with_documents) == principal
+        assert run_with_session(lambda factory: AuthService.resolve_principal_async(None, "bozuk")) is None
+
+    def test_async_user_registration_and_login(self):
+        """Kayıt ve giriş async session ile yapılır; benzersizlik kontrol edilir"""
+        user_create = UserCreate(
+            email="yeni@example.com",
+            username="yeni",
+            full_name="Yeni Kullanıcı",
+            password="gizlisifre123"
+        )
+
+        async def scenario(session_factory):
+            async with session_factory() as db:
+                user = await AuthService.create_user_async(db, user_create)
+                with pytest.raises(HTTPException) as duplicate:
+                    await AuthService.create_user_async(db, user_create)
+                authenticated = await AuthService.authenticate_user_async(db, user_create.email, "gizlisifre123")
+                rejected = await AuthService.authenticate_user_async(db, user_create.email, "yanlis")
+                token = AuthService.create_access_token({"sub": str(user.id)})
+                current = await AuthService.get_current_user_async(db, token)
+                return user, duplicate.value, authenticated, rejected, current
+
+        user, duplicate, authenticated, rejected, current = run_with_session(scenario)
+        assert user.id is not None
+        assert duplicate.status_code == 400
+        assert authenticated.id == user.id
+        assert rejected is None
+        assert current.id == user.id
+
+    def test_concurrent_queries(self, user_with_documents):
+        """Tek event loop'ta çok sayıda sorgu birlikte beklenebilir"""
+        async def scenario(session_factory):
+            async def list_documents():
+                async with session_factory() as db:
+                    return await DocumentService.get_user_documents_async(db, user_with_documents)
+            return await asyncio.gather(*(list_documents() for _ in range(100)))
+
+        results = run_with_session(scenario)
+        assert len(results) == 100
+        assert all(len(documents) == 5 for documents in results)
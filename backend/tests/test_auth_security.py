@@ -3,17 +3,23 @@ Yetkilendirme & Güvenlik Testleri
 =================================
 """
 
+import asyncio
+import threading
 import pytest
 import tempfile
 import os
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from app.database import Base, get_db
+from sqlalchemy.pool import NullPool
+from app.config import settings
+from app.database import Base, get_async_db, get_db
 from main import app
 from models.document import Document
-from models.user import User
-from services.auth_service import AuthService
+from models.user import User, UserUpdate
+from services.auth_service import AuthService, PasswordHasher, password_hasher, principal_cache
 
 # Test veritabanı
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
@@ -28,11 +34,23 @@ def override_get_db():
         db.close()
 
 app.dependency_overrides[get_db] = override_get_db
+
+# Async session'lar aynı test veritabanını kullanır (her istek kendi loop'unda)
+async_engine = create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+
+async def override_get_async_db():
+    async with TestingAsyncSessionLocal() as db:
+        yield db
+
+app.dependency_overrides[get_async_db] = override_get_async_db
+
 client = TestClient(app)
 
 @pytest.fixture(autouse=True)
 def setup_database():
     Base.metadata.create_all(bind=engine)
+    principal_cache.clear()
     yield
     Base.metadata.drop_all(bind=engine)
 
@@ -198,7 +216,7 @@ class TestAuthorization:
                 data = {"title": "Test Doküman"}
                 response = client.post("/api/documents/", files=files, data=data, headers=auth_headers)
             
-            assert response.status_code == 200
+            assert response.status_code == 202
             
         finally:
             os.unlink(test_file_path)
@@ -240,6 +258,139 @@ class TestAuthorization:
         response = client.get("/api/summary/statistics")
         assert response.status_code == 401
 
+def count_user_queries(func):
+    """Çağrı sırasında kullanıcı tablosuna giden sorguları say"""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if "FROM users" in statement:
+            statements.append(statement)
+
+    event.listen(Engine, "before_cursor_execute", capture)
+    try:
+        result = func()
+    finally:
+        event.remove(Engine, "before_cursor_execute", capture)
+    return result, len(statements)
+
+class TestPrincipalResolution:
+    """Önbellekli kullanıcı çözümleme testleri"""
+
+    def test_warm_cache_skips_user_query(self, auth_headers):
+        """Sıcak önbellekte korumalı istekler kullanıcı sorgusu yapmaz"""
+        response, queries = count_user_queries(
+            lambda: client.get("/api/documents/", headers=auth_headers)
+        )
+        assert response.status_code == 200
+        assert queries == 1
+
+        response, queries = count_user_queries(
+            lambda: client.get("/api/search/documents/count/total", headers=auth_headers)
+        )
+        assert response.status_code == 200
+        assert queries == 0
+
+    def test_update_invalidates_cache(self, auth_headers):
+        """Kullanıcı güncellenince önbellek düşer, pasif kullanıcı reddedilir"""
+        assert client.get("/api/documents/", headers=auth_headers).status_code == 200
+
+        db = TestingSessionLocal()
+        user = db.query(User).filter(User.email == "test@example.com").first()
+        AuthService.update_user(db, user, UserUpdate(full_name="Yeni İsim"))
+        assert principal_cache.get(user.id) is None
+
+        assert client.get("/api/documents/", headers=auth_headers).status_code == 200
+        AuthService.deactivate_user(db, user)
+        db.close()
+
+        assert client.get("/api/documents/", headers=auth_headers).status_code == 401
+        response = client.post("/api/auth/login", json={
+            "email": "test@example.com",
+            "password": "testpassword123"
+        })
+        assert response.status_code == 401
+
+    def test_stateless_tokens(self, test_user, monkeypatch):
+        """Stateless modda kullanıcı bilgisi token'dan okunur"""
+        monkeypatch.setattr(settings, "AUTH_STATELESS_TOKENS", True)
+        response = client.post("/api/auth/login", json={
+            "email": "test@example.com",
+            "password": "testpassword123"
+        })
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        principal_cache.clear()
+
+        response, queries = count_user_queries(
+            lambda: client.get("/api/documents/", headers=headers)
+        )
+        assert response.status_code == 200
+        assert queries == 0
+
+    def test_stateless_claims_ignored_when_disabled(self, test_user):
+        """Stateless mod kapalıyken token'daki kullanıcı bilgisine güvenilmez"""
+        token = AuthService.create_access_token({
+            "sub": str(test_user.id),
+            "usr": {"id": test_user.id, "email": "x@example.com", "username": "x", "is_active": True}
+        })
+        db = TestingSessionLocal()
+        AuthService.deactivate_user(db, db.get(User, test_user.id))
+        db.close()
+
+        response = client.get("/api/documents/", headers={"Authorization": f"Bearer {token}"})
+        assert response.status_code == 401
+
+class TestPasswordHashing:
+    """Şifre hash havuzu testleri"""
+
+    def test_saturated_pool_rejects(self):
+        """Havuz ve kuyruk doluyken yeni iş 503 ile reddedilir"""
+        hasher = PasswordHasher(workers=1, queue_depth=0)
+        release = threading.Event()
+
+        async def scenario():
+            running = asyncio.ensure_future(hasher.run(release.wait, 5))
+            await asyncio.sleep(0.05)
+            with pytest.raises(Exception) as error:
+                await hasher.run(len, "x")
+            release.set()
+            await running
+            return error.value
+
+        error = asyncio.run(scenario())
+        assert error.status_code == 503
+        assert error.headers["Retry-After"] == "1"
+        assert asyncio.run(hasher.run(len, "abc")) == 3
+
+    def test_login_returns_503_when_saturated(self, test_user, monkeypatch):
+        """Giriş, şifre havuzu doluyken 503 döndürür"""
+        monkeypatch.setattr(password_hasher, "capacity", 0)
+        response = client.post("/api/auth/login", json={
+            "email": "test@example.com",
+            "password": "testpassword123"
+        })
+        assert response.status_code == 503
+
+    def test_rehash_on_login(self, test_user):
+        """Maliyet ayarı değişmişse girişte şifre yeniden hash'lenir"""
+        from passlib.context import CryptContext
+        weak_hash = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash("testpassword123")
+        db = TestingSessionLocal()
+        user = db.get(User, test_user.id)
+        user.hashed_password = weak_hash
+        db.commit()
+
+        response = client.post("/api/auth/login", json={
+            "email": "test@example.com",
+            "password": "testpassword123"
+        })
+        assert response.status_code == 200
+
+        db.refresh(user)
+        assert user.hashed_password != weak_hash
+        assert user.hashed_password.startswith(f"$2b${settings.PASSWORD_BCRYPT_ROUNDS:02d}$")
+        assert AuthService.verify_password("testpassword123", user.hashed_password)
+        db.close()
+
 class TestSecurity:
     """Güvenlik testleri"""
     
@@ -0,0 +1,103 @@
+"""
+Bağlantı Havuzu Testleri
+========================
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, exc, text
+from sqlalchemy.pool import QueuePool
+from app.config import settings
+from app.database import engine_options
+from app.pool_metrics import LatencyHistogram, PoolMetrics, instrumented_pool_class
+from api.deps import get_current_user
+from main import app
+from models.user import UserPrincipal
+
+client = TestClient(app)
+
+@pytest.fixture
+def metered_engine(tmp_path):
+    """Tek bağlantılı, ölçümlü SQLite engine"""
+    metrics = PoolMetrics()
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=instrumented_pool_class(QueuePool, metrics),
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.1
+    )
+    yield engine, metrics
+    engine.dispose()
+
+class TestLatencyHistogram:
+    """Gecikme histogramı testleri"""
+
+    def test_cumulative_buckets(self):
+        """Ölçümler kümülatif kovalara dağılır"""
+        histogram = LatencyHistogram(buckets_ms=(1, 10))
+        for seconds in (0.0005, 0.005, 0.5):
+            histogram.observe(seconds)
+        snapshot = histogram.snapshot()
+        assert snapshot["count"] == 3
+        assert snapshot["buckets"] == {"le_1ms": 1, "le_10ms": 2, "le_inf": 3}
+        assert snapshot["max_ms"] == 500.0
+
+class TestPoolMetrics:
+    """Havuz ölçümleri testleri"""
+
+    def test_engine_options_from_settings(self):
+        """Havuz ayarları Settings'ten gelir, SQL echo varsayılan kapalı"""
+        options = engine_options("sqlite:///./pool.db", QueuePool, PoolMetrics())
+        assert options["echo"] is False
+        assert options["pool_size"] == settings.DB_POOL_SIZE
+        assert options["max_overflow"] == settings.DB_MAX_OVERFLOW
+        assert options["pool_pre_ping"] == settings.DB_POOL_PRE_PING
+        assert issubclass(options["poolclass"], QueuePool)
+        assert engine_options("sqlite://", QueuePool, PoolMetrics()) == {"echo": False}
+
+    def test_wait_and_checkout_are_recorded(self, metered_engine):
+        """Bekleme ve bağlantı tutma süreleri ölçülür"""
+        engine, metrics = metered_engine
+        for _ in range(3):
+            with engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
+
+        stats = metrics.snapshot(engine.pool)
+        assert stats["wait"]["count"] == 3
+        assert stats["checkout"]["count"] == 3
+        assert stats["connects"] == 1
+        assert stats["checkedout"] == 0
+
+    def test_timeout_is_counted(self, metered_engine):
+        """Havuz doluyken zaman aşımı sayılır"""
+        engine, metrics = metered_engine
+        with engine.connect():
+            assert metrics.snapshot(engine.pool)["checkedout"] == 1
+            with pytest.raises(exc.TimeoutError):
+                engine.connect()
+        assert metrics.timeouts == 1
+
+    def test_metrics_survive_dispose(self, metered_engine):
+        """engine.dispose sonrası yeni havuz aynı metriklere yazar"""
+        engine, metrics = metered_engine
+        engine.dispose()
+        with engine.connect():
+            pass
+        assert metrics.wait.snapshot()["count"] == 1
+
+    def test_pool_endpoint(self, monkeypatch):
+        """Havuz metrikleri sağlık uç noktasından yalnızca yöneticiye okunur"""
+        assert client.get("/health/pool").status_code in (401, 403)
+
+        principal = {"id": 1, "email": "admin@example.com", "username": "admin"}
+        monkeypatch.setitem(app.dependency_overrides, get_current_user, lambda: UserPrincipal(**principal))
+        assert client.get("/health/pool").status_code == 403
+
+        monkeypatch.setitem(
+            app.dependency_overrides, get_current_user,
+            lambda: UserPrincipal(**principal, is_superuser=True)
+        )
+        response = client.get("/health/pool")
+        assert response.status_code == 200
+        assert "wait" in response.json()["sync"]
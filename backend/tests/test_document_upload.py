@@ -4,16 +4,30 @@ Doküman Yükleme & Erişim Testleri
 """
 
 import pytest
+import asyncio
+import hashlib
+import time
+import io
 import tempfile
 import os
+from fastapi import HTTPException, UploadFile
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from app.database import Base, get_db
+from sqlalchemy.pool import NullPool
+from app.config import settings
+from app.database import Base, get_async_db, get_db
 from main import app
+from models.blob import Blob
 from models.document import Document
 from models.user import User
 from services.auth_service import AuthService
+from services.blob_service import BlobService
+from services import ingestion_service
+from services.document_service import DocumentService
+from services.ingestion_service import IngestionService, _pending_tasks
+from services.search_service import SearchIndexService
 
 # Test veritabanı
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
@@ -28,6 +42,17 @@ def override_get_db():
         db.close()
 
 app.dependency_overrides[get_db] = override_get_db
+
+# Async session'lar aynı test veritabanını kullanır (her istek kendi loop'unda)
+async_engine = create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+
+async def override_get_async_db():
+    async with TestingAsyncSessionLocal() as db:
+        yield db
+
+app.dependency_overrides[get_async_db] = override_get_async_db
+
 client = TestClient(app)
 
 @pytest.fixture(autouse=True)
@@ -78,7 +103,7 @@ class TestDocumentUpload:
                 data = {"title": "Test Doküman"}
                 response = client.post("/api/documents/", files=files, data=data, headers=auth_headers)
             
-            assert response.status_code == 200
+            assert response.status_code == 202
             result = response.json()
             assert result["title"] == "Test Doküman"
             assert result["filename"].endswith(".txt")  # UUID + .txt
@@ -105,7 +130,7 @@ class TestDocumentUpload:
                 files = {"file": ("test.txt", f, "text/plain")}
                 response = client.post("/api/documents/", files=files, headers=auth_headers)
             
-            assert response.status_code == 200  # Başlık opsiyonel olabilir
+            assert response.status_code == 202  # Başlık opsiyonel olabilir
             
         finally:
             os.unlink(test_file_path)
@@ -127,6 +152,372 @@ class TestDocumentUpload:
         finally:
             os.unlink(test_file_path)
 
+def create_queued_document(tmp_path, user_id, text, filename="bekleyen.txt"):
+    """Diskte dosyası olan, işlenmeyi bekleyen doküman kaydı oluştur"""
+    path = tmp_path / filename
+    path.write_text(text, encoding="utf-8")
+    db = TestingSessionLocal()
+    document = Document(
+        title=filename,
+        filename=filename,
+        file_path=str(path),
+        file_size=path.stat().st_size,
+        file_type="txt",
+        status="queued",
+        user_id=user_id
+    )
+    db.add(document)
+    db.commit()
+    document_id = document.id
+    db.close()
+    return document_id
+
+class TestBackgroundIngestion:
+    """Arka plan doküman işleme testleri"""
+
+    def test_upload_returns_queued_document(self, auth_headers):
+        """Yükleme metin çıkarılmadan kuyruğa alınmış dokümanla döner"""
+        files = {"file": ("kuyruk.txt", io.BytesIO("Kuyruk içeriği".encode("utf-8")), "text/plain")}
+        response = client.post("/api/documents/", files=files, headers=auth_headers)
+
+        assert response.status_code == 202
+        result = response.json()
+        assert result["status"] == "queued"
+        assert result["content"] is None
+
+    def test_document_status_after_ingestion(self, auth_headers):
+        """Arka plan işlemi tamamlanınca doküman hazır olur"""
+        files = {"file": ("hazir.txt", io.BytesIO("Hazır içerik".encode("utf-8")), "text/plain")}
+        doc_id = client.post("/api/documents/", files=files, headers=auth_headers).json()["id"]
+
+        response = client.get(f"/api/documents/{doc_id}/status", headers=auth_headers)
+        assert response.status_code == 200
+        result = response.json()
+        assert result["status"] == "ready"
+        assert result["has_content"] is True
+        assert result["has_summary"] is False
+
+        document = client.get(f"/api/documents/{doc_id}", headers=auth_headers).json()
+        assert document["content"] == "Hazır içerik"
+
+    def test_indexing_does_not_block_event_loop(self, tmp_path, test_user, monkeypatch):
+        """Tokenizasyon ve veritabanı yazımı event loop dışında yürür"""
+        original_tokenize = ingestion_service.tokenize
+        def slow_tokenize(text):
+            time.sleep(0.3)
+            return original_tokenize(text)
+        monkeypatch.setattr(ingestion_service, "tokenize", slow_tokenize)
+
+        document_id = create_queued_document(tmp_path, test_user.id, "Yavaş indekslenen içerik")
+
+        async def scenario():
+            gaps = []
+            async def ticker(done):
+                last = time.perf_counter()
+                while not done.is_set():
+                    await asyncio.sleep(0.01)
+                    now = time.perf_counter()
+                    gaps.append(now - last)
+                    last = now
+            done = asyncio.Event()
+            ticking = asyncio.create_task(ticker(done))
+            await IngestionService.run(engine, document_id)
+            done.set()
+            await ticking
+            return max(gaps)
+
+        assert asyncio.run(scenario()) < 0.2
+        db = TestingSessionLocal()
+        assert db.get(Document, document_id).status == "ready"
+        db.close()
+
+    def test_index_failure_marks_document_failed(self, tmp_path, test_user, monkeypatch):
+        """İndeks yazımı başarısız olursa doküman `failed` olur ve hata saklanır"""
+        def broken_write_chunks(db, document_id, content):
+            raise RuntimeError("parça yazılamadı")
+        monkeypatch.setattr(SearchIndexService, "write_chunks", staticmethod(broken_write_chunks))
+
+        document_id = create_queued_document(tmp_path, test_user.id, "Yarıda kalan içerik")
+        asyncio.run(IngestionService.run(engine, document_id))
+
+        db = TestingSessionLocal()
+        document = db.get(Document, document_id)
+        assert document.status == "failed"
+        assert document.processing_error == "parça yazılamadı"
+        assert document.term_count is None
+        db.close()
+
+    def test_resume_pending_is_bounded(self, tmp_path, test_user, monkeypatch):
+        """Başlangıçta yarım kalan işler sınırlı eşzamanlılıkla sürdürülür"""
+        document_ids = [
+            create_queued_document(tmp_path, test_user.id, f"içerik {i}", f"bekleyen_{i}.txt")
+            for i in range(5)
+        ]
+        processed, in_flight, peak = [], [0], [0]
+        async def fake_run(bind, document_id):
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+            await asyncio.sleep(0.01)
+            processed.append(document_id)
+            in_flight[0] -= 1
+        monkeypatch.setattr(IngestionService, "run", staticmethod(fake_run))
+        monkeypatch.setattr(settings, "INGESTION_RESUME_CONCURRENCY", 2)
+
+        async def scenario():
+            count = IngestionService.resume_pending(engine)
+            tasks = list(_pending_tasks)
+            await asyncio.gather(*tasks)
+            return count, len(tasks)
+
+        assert asyncio.run(scenario()) == (5, 2)
+        assert sorted(processed) == document_ids
+        assert peak[0] == 2
+
+    def test_document_status_not_found(self, auth_headers):
+        """Var olmayan doküman durumu testi"""
+        response = client.get("/api/documents/999/status", headers=auth_headers)
+        assert response.status_code == 404
+
+class TestStreamingUpload:
+    """Parçalı dosya kaydetme testleri"""
+
+    def test_save_upload_file_streams_and_hashes(self, monkeypatch):
+        """Dosya parça parça yazılır ve içerik özeti hesaplanır"""
+        monkeypatch.setattr(settings, "UPLOAD_CHUNK_SIZE", 4)
+        data = "Parçalı yükleme içeriği".encode("utf-8")
+        upload = UploadFile(file=io.BytesIO(data), filename="parca.txt")
+
+        file_path, filename, content_hash, size = DocumentService.save_upload_file(upload)
+        try:
+            assert filename.endswith(".txt")
+            assert size == len(data)
+            assert content_hash == hashlib.sha256(data).hexdigest()
+            with open(file_path, "rb") as f:
+                assert f.read() == data
+        finally:
+            os.remove(file_path)
+
+    def test_save_upload_file_rejects_oversize(self, monkeypatch):
+        """Boyut sınırı aşılınca yükleme iptal edilir ve geçici dosya kalmaz"""
+        monkeypatch.setattr(settings, "UPLOAD_CHUNK_SIZE", 4)
+        monkeypatch.setattr(settings, "MAX_FILE_SIZE", 10)
+        upload = UploadFile(file=io.BytesIO(b"x" * 64), filename="buyuk.txt")
+        before = set(os.listdir(settings.UPLOAD_DIR))
+
+        with pytest.raises(HTTPException) as exc_info:
+            DocumentService.save_upload_file(upload)
+
+        assert exc_info.value.status_code == 413
+        assert upload.file.tell() < 64
+        assert set(os.listdir(settings.UPLOAD_DIR)) == before
+
+    def test_upload_oversize_document(self, auth_headers, monkeypatch):
+        """Çok büyük dosya yükleme testi"""
+        monkeypatch.setattr(settings, "MAX_FILE_SIZE", 10)
+        files = {"file": ("buyuk.txt", io.BytesIO(b"x" * 64), "text/plain")}
+        response = client.post("/api/documents/", files=files, headers=auth_headers)
+
+        assert response.status_code == 413
+
+def upload(auth_headers, data: bytes, filename="kopya.txt"):
+    """Baytları yükle ve yanıt JSON'unu döndür"""
+    files = {"file": (filename, io.BytesIO(data), "text/plain")}
+    return client.post("/api/documents/", files=files, headers=auth_headers).json()
+
+class TestContentDeduplication:
+    """İçerik adresli depolama ve tekrar yükleme testleri"""
+
+    def test_duplicate_upload_shares_blob(self, auth_headers):
+        """Aynı içerik tek dosya olarak saklanır ve referansı sayılır"""
+        data = "Paylaşılan içerik".encode("utf-8")
+        first = upload(auth_headers, data)
+        second = upload(auth_headers, data)
+
+        db = TestingSessionLocal()
+        try:
+            documents = db.query(Document).order_by(Document.id).all()
+            blob = db.get(Blob, hashlib.sha256(data).hexdigest())
+            assert documents[0].file_path == documents[1].file_path == blob.file_path
+            assert blob.ref_count == 2
+        finally:
+            db.close()
+        assert first["filename"] == second["filename"]
+
+    def test_duplicate_reuses_processed_fields(self, auth_headers):
+        """İşlenmiş içerik tekrar yüklenince metin ve özet kopyalanır"""
+        data = "Tekrar eden rapor içeriği".encode("utf-8")
+        first = upload(auth_headers, data)
+
+        db = TestingSessionLocal()
+        document = db.get(Document, first["id"])
+        document.summary = "Önceki özet"
+        document.keywords = "rapor"
+        db.commit()
+        db.close()
+
+        second = upload(auth_headers, data)
+        assert second["status"] == "ready"
+        assert second["content"] == "Tekrar eden rapor içeriği"
+        assert second["summary"] == "Önceki özet"
+        assert second["keywords"] == "rapor"
+
+        results = client.get("/api/search/", params={"query": "rapor"}, headers=auth_headers).json()
+        assert {doc["id"] for doc in results} == {first["id"], second["id"]}
+
+    def test_different_type_is_extracted_again(self, auth_headers):
+        """Aynı baytlar farklı türde yüklenirse türetilmiş alanlar kopyalanmaz"""
+        data = b"Tur testi"
+        upload(auth_headers, data, "bir.txt")
+        other = upload(auth_headers, data, "bir.doc")
+        assert other["status"] == "queued"
+
+    def test_blob_removed_with_last_reference(self, auth_headers):
+        """Dosya son referans silinince diskten kaldırılır"""
+        data = "Silinecek paylaşılan içerik".encode("utf-8")
+        first = upload(auth_headers, data)
+        second = upload(auth_headers, data)
+        db = TestingSessionLocal()
+        file_path = db.get(Document, first["id"]).file_path
+        db.close()
+
+        assert client.delete(f"/api/documents/{first['id']}", headers=auth_headers).status_code == 200
+        assert os.path.exists(file_path)
+
+        assert client.delete(f"/api/documents/{second['id']}", headers=auth_headers).status_code == 200
+        assert not os.path.exists(file_path)
+        db = TestingSessionLocal()
+        try:
+            assert db.query(Blob).count() == 0
+        finally:
+            db.close()
+
+    def test_reference_acquired_before_file_is_placed(self, auth_headers, monkeypatch):
+        """Blob referansı dosya depoya taşınmadan önce alınır"""
+        calls = []
+        original_acquire, original_store = BlobService.acquire, BlobService.store
+        def acquire(*args):
+            calls.append("acquire")
+            return original_acquire(*args)
+        def store(*args):
+            calls.append("store")
+            return original_store(*args)
+        monkeypatch.setattr(BlobService, "acquire", staticmethod(acquire))
+        monkeypatch.setattr(BlobService, "store", staticmethod(store))
+
+        upload(auth_headers, "Sıralı içerik".encode("utf-8"))
+        assert calls == ["acquire", "store"]
+
+    def test_pending_removal_keeps_reacquired_blob(self, auth_headers):
+        """Silme sürerken aynı içerik yüklenirse dosya silinmez"""
+        data = "Yarışan içerik".encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        first = upload(auth_headers, data)
+
+        # Silme: referans bırakıldı ve commit edildi, dosya henüz silinmedi
+        db = TestingSessionLocal()
+        released_path = BlobService.release(db, digest)
+        db.delete(db.get(Document, first["id"]))
+        db.commit()
+        assert released_path is not None
+
+        second = upload(auth_headers, data)
+        assert BlobService.remove_unreferenced(db, digest, released_path) is False
+        assert os.path.exists(released_path)
+        assert db.get(Blob, digest).ref_count == 1
+        db.close()
+
+        response = client.get(f"/api/documents/{second['id']}/download", headers=auth_headers)
+        assert response.status_code == 200
+        assert response.content == data
+
+        assert client.delete(f"/api/documents/{second['id']}", headers=auth_headers).status_code == 200
+        assert not os.path.exists(released_path)
+
+class TestDocumentDownload:
+    """Akışlı indirme, Range ve koşullu GET testleri"""
+
+    DATA = bytes(range(256)) * 1024  # 256 KB, birden fazla parça
+
+    @pytest.fixture
+    def document_id(self, auth_headers):
+        files = {"file": ("veri.txt", io.BytesIO(self.DATA), "text/plain")}
+        return client.post("/api/documents/", files=files, data={"title": "Veri Dosyası"}, headers=auth_headers).json()["id"]
+
+    def test_full_download(self, auth_headers, document_id):
+        """Dosyanın tamamı ETag ve Last-Modified ile gönderilir"""
+        response = client.get(f"/api/documents/{document_id}/download", headers=auth_headers)
+
+        assert response.status_code == 200
+        assert response.content == self.DATA
+        assert response.headers["accept-ranges"] == "bytes"
+        assert response.headers["etag"] == f'"{hashlib.sha256(self.DATA).hexdigest()}"'
+        assert "last-modified" in response.headers
+        assert "Veri%20Dosyas%C4%B1.txt" in response.headers["content-disposition"]
+
+    def test_range_request(self, auth_headers, document_id):
+        """Range isteği 206 ile yalnızca istenen baytları döndürür"""
+        url = f"/api/documents/{document_id}/download"
+        response = client.get(url, headers={**auth_headers, "Range": "bytes=100-199"})
+        assert response.status_code == 206
+        assert response.content == self.DATA[100:200]
+        assert response.headers["content-range"] == f"bytes 100-199/{len(self.DATA)}"
+
+        tail = client.get(url, headers={**auth_headers, "Range": "bytes=-10"})
+        assert tail.content == self.DATA[-10:]
+
+        resumed = client.get(url, headers={**auth_headers, "Range": "bytes=200000-"})
+        assert resumed.content == self.DATA[200000:]
+
+    def test_unsatisfiable_range(self, auth_headers, document_id):
+        """Dosya dışındaki aralık 416 döndürür"""
+        response = client.get(
+            f"/api/documents/{document_id}/download",
+            headers={**auth_headers, "Range": f"bytes={len(self.DATA)}-"}
+        )
+        assert response.status_code == 416
+        assert response.headers["content-range"] == f"bytes */{len(self.DATA)}"
+
+    def test_conditional_get(self, auth_headers, document_id):
+        """Eşleşen ETag veya tarih 304 döndürür"""
+        url = f"/api/documents/{document_id}/download"
+        first = client.get(url, headers=auth_headers)
+
+        by_etag = client.get(url, headers={**auth_headers, "If-None-Match": first.headers["etag"]})
+        assert by_etag.status_code == 304
+        assert by_etag.content == b""
+
+        by_date = client.get(url, headers={**auth_headers, "If-Modified-Since": first.headers["last-modified"]})
+        assert by_date.status_code == 304
+
+        changed = client.get(url, headers={**auth_headers, "If-None-Match": '"baska"'})
+        assert changed.status_code == 200
+
+    def test_if_range_mismatch_sends_full_file(self, auth_headers, document_id):
+        """If-Range eşleşmezse tam dosya gönderilir"""
+        response = client.get(
+            f"/api/documents/{document_id}/download",
+            headers={**auth_headers, "Range": "bytes=0-9", "If-Range": '"eski"'}
+        )
+        assert response.status_code == 200
+        assert len(response.content) == len(self.DATA)
+
+    def test_head_request(self, auth_headers, document_id):
+        """HEAD yalnızca başlıkları döndürür"""
+        response = client.head(f"/api/documents/{document_id}/download", headers=auth_headers)
+        assert response.status_code == 200
+        assert response.headers["content-length"] == str(len(self.DATA))
+        assert response.content == b""
+
+    def test_download_requires_auth_and_ownership(self, auth_headers, document_id):
+        """Yetkisiz istek ve yüklemeler dizininin doğrudan sunulması engellenir"""
+        assert client.get(f"/api/documents/{document_id}/download").status_code in (401, 403)
+        assert client.get("/api/documents/999/download", headers=auth_headers).status_code == 404
+
+        db = TestingSessionLocal()
+        file_path = db.get(Document, document_id).file_path
+        db.close()
+        assert client.get("/" + file_path.replace(os.sep, "/")).status_code == 404
+
 class TestDocumentAccess:
     """Doküman erişim testleri"""
     
@@ -204,7 +595,7 @@ class TestDocumentFileTypes:
                 data = {"title": "Test PDF"}
                 response = client.post("/api/documents/", files=files, data=data, headers=auth_headers)
 
-                assert response.status_code == 200
+                assert response.status_code == 202
             result = response.json()
             assert result["file_type"] == "pdf"
             
@@ -226,10 +617,15 @@ class TestDocumentFileTypes:
                 response = client.post("/api/documents/", files=files, data=data, headers=auth_headers)
             
             # DOC processing might fail, so we accept either success or a specific error
-            assert response.status_code in [200, 400, 422, 500]
-            if response.status_code == 200:
+            assert response.status_code in [202, 400, 422, 500]
+            if response.status_code == 202:
                 result = response.json()
                 assert result["file_type"] == "doc"
+                
+                # Metin çıkarma arka planda başarısız olur
+                status_response = client.get(f"/api/documents/{result['id']}/status", headers=auth_headers)
+                assert status_response.json()["status"] == "failed"
+                assert status_response.json()["processing_error"]
             
         finally:
             os.unlink(test_file_path) 
\ No newline at end of file
@@ -0,0 +1,209 @@
+"""
+Metin Çıkarma Motoru Testleri
+=============================
+"""
+
+import asyncio
+import os
+import time
+import pytest
+from services.extraction_service import (
+    ExtractionEngine,
+    ExtractionError,
+    extract_docx_text,
+    extract_pdf_range,
+    extract_text,
+    iter_docx_paragraphs,
+    iter_pdf_pages,
+    join_segments,
+    pdf_page_count
+)
+
+def write_pdf(path, pages):
+    """Her sayfada bir satır metin olan basit bir PDF yaz"""
+    page_count = len(pages)
+    font_id = 3 + 2 * page_count
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [{}] /Count {} >>".format(
+            " ".join(f"{3 + 2 * i} 0 R" for i in range(page_count)), page_count
+        )
+    ]
+    for index, text in enumerate(pages):
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET"
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Contents {4 + 2 * index} 0 R /Resources << /Font << /F1 {font_id} 0 R >> >> >>"
+        )
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+    objects.append("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    data = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(data))
+        data += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref_offset = len(data)
+    data += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    for offset in offsets:
+        data += f"{offset:010d} 00000 n \n".encode("latin-1")
+    data += (
+        f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\n"
+        f"startxref\n{xref_offset}\n%%EOF\n"
+    ).encode("latin-1")
+    with open(path, "wb") as file:
+        file.write(data)
+
+@pytest.fixture
+def pdf_path(tmp_path):
+    path = str(tmp_path / "pages.pdf")
+    write_pdf(path, [f"Sayfa {i}" for i in range(1, 6)])
+    return path
+
+@pytest.fixture
+def pool_engine():
+    engine = ExtractionEngine(max_workers=2, timeout=30, pdf_pages_per_task=2)
+    yield engine
+    engine.shutdown()
+
+class TestExtractionFunctions:
+    """Worker fonksiyonları testleri"""
+
+    def test_extract_txt(self, tmp_path):
+        """TXT metni çıkarılır"""
+        path = tmp_path / "note.txt"
+        path.write_text("  Merhaba dünya  ", encoding="utf-8")
+        assert extract_text(str(path), "txt") == "Merhaba dünya"
+
+    def test_extract_pdf_pages(self, pdf_path):
+        """PDF sayfa sayısı ve sayfa aralıkları"""
+        assert pdf_page_count(pdf_path) == 5
+        assert extract_pdf_range(pdf_path, 1, 3).split("\n") == ["Sayfa 2", "Sayfa 3"]
+        assert extract_text(pdf_path, "pdf").split("\n")[-1] == "Sayfa 5"
+
+    def test_iter_pdf_pages_is_lazy(self, pdf_path):
+        """Sayfalar generator ile tek tek üretilir"""
+        pages = iter_pdf_pages(pdf_path)
+        assert next(pages) == "Sayfa 1"
+        assert list(pages) == ["Sayfa 2", "Sayfa 3", "Sayfa 4", "Sayfa 5"]
+        assert list(iter_pdf_pages(pdf_path, 3)) == ["Sayfa 4", "Sayfa 5"]
+
+    def test_docx_paragraphs(self, tmp_path):
+        """DOCX paragrafları sırayla üretilir ve tek seferde birleştirilir"""
+        from docx import Document
+        path = str(tmp_path / "note.docx")
+        doc = Document()
+        for text in ["Birinci", "İkinci", "Üçüncü"]:
+            doc.add_paragraph(text)
+        doc.save(path)
+
+        assert list(iter_docx_paragraphs(path)) == ["Birinci", "İkinci", "Üçüncü"]
+        assert extract_docx_text(path) == "Birinci\nİkinci\nÜçüncü"
+
+    def test_join_segments(self):
+        """Parçalar satır sonuyla birleştirilip kırpılır"""
+        assert join_segments(["  a", "b", "c  "]) == "a\nb\nc"
+        assert join_segments([]) == ""
+
+    def test_unsupported_type(self, tmp_path):
+        """Desteklenmeyen tür ExtractionError fırlatır"""
+        with pytest.raises(ExtractionError, match="Desteklenmeyen dosya türü"):
+            extract_text(str(tmp_path / "file.doc"), "doc")
+
+    def test_invalid_pdf(self, tmp_path):
+        """Bozuk PDF ExtractionError fırlatır"""
+        path = tmp_path / "broken.pdf"
+        path.write_bytes(b"bu bir pdf degil")
+        with pytest.raises(ExtractionError, match="PDF işleme hatası"):
+            extract_text(str(path), "pdf")
+
+class TestExtractionEngine:
+    """Süreç havuzu motoru testleri"""
+
+    def test_page_ranges(self):
+        """Sayfalar eşit aralıklara bölünür"""
+        engine = ExtractionEngine(max_workers=2, timeout=30, pdf_pages_per_task=2)
+        assert engine._page_ranges(5) == [(0, 2), (2, 4), (4, 5)]
+        assert engine._page_ranges(0) == []
+
+    def test_split_pdf_across_workers(self, pool_engine, pdf_path):
+        """Büyük PDF aralıklara bölünüp sırasıyla birleştirilir"""
+        text = asyncio.run(pool_engine.extract(pdf_path, "pdf"))
+        assert text.split("\n") == [f"Sayfa {i}" for i in range(1, 6)]
+
+    def test_iter_extract_streams_ranges_in_order(self, pool_engine, pdf_path):
+        """Sayfa aralıkları belge sırasıyla akış halinde döner"""
+        async def collect():
+            return [part async for part in pool_engine.iter_extract(pdf_path, "pdf")]
+
+        assert asyncio.run(collect()) == ["Sayfa 1\nSayfa 2", "Sayfa 3\nSayfa 4", "Sayfa 5"]
+
+    def test_worker_error_is_propagated(self, pool_engine, tmp_path):
+        """Worker'daki ayrıştırma hatası çağırana taşınır"""
+        with pytest.raises(ExtractionError):
+            asyncio.run(pool_engine.extract(str(tmp_path / "file.doc"), "doc"))
+
+    def test_worker_crash_is_isolated(self, pool_engine, tmp_path):
+        """Çöken worker API sürecini etkilemez, havuz yeniden oluşturulur"""
+        with pytest.raises(ExtractionError, match="beklenmedik"):
+            asyncio.run(pool_engine.run(os._exit, 1))
+
+        path = tmp_path / "note.txt"
+        path.write_text("kurtarıldı", encoding="utf-8")
+        assert asyncio.run(pool_engine.extract(str(path), "txt")) == "kurtarıldı"
+
+    def test_timeout(self, tmp_path):
+        """Süre sınırını aşan iş sonlandırılır"""
+        engine = ExtractionEngine(max_workers=1, timeout=0.5)
+        try:
+            started = time.monotonic()
+            with pytest.raises(ExtractionError, match="zaman aşımı"):
+                asyncio.run(engine.run(time.sleep, 30))
+            assert time.monotonic() - started < 10
+
+            path = tmp_path / "note.txt"
+            path.write_text("devam", encoding="utf-8")
+            assert asyncio.run(engine.extract(str(path), "txt")) == "devam"
+        finally:
+            engine.shutdown()
+
+    def test_queue_wait_does_not_count_toward_timeout(self):
+        """Worker bekleyen işlerin süresi çalışmaya başladıklarında başlar"""
+        engine = ExtractionEngine(max_workers=1, timeout=1.5)
+        try:
+            async def scenario():
+                return await asyncio.gather(
+                    *(engine.run(time.sleep, 1) for _ in range(3)), return_exceptions=True
+                )
+            assert asyncio.run(scenario()) == [None, None, None]
+        finally:
+            engine.shutdown()
+
+    def test_timeout_resubmits_collateral_jobs(self):
+        """Takılan iş için havuz yenilenince aynı havuzdaki diğer işler başarısız olmaz"""
+        engine = ExtractionEngine(max_workers=2, timeout=3)
+        try:
+            async def scenario():
+                # Worker'ları önceden başlat (süreç açılışı ölçüme girmesin)
+                await asyncio.gather(engine.run(time.sleep, 0.1), engine.run(time.sleep, 0.1))
+
+                async def collateral():
+                    # Takılan işin süresi dolduğunda hâlâ çalışıyor olur
+                    await asyncio.sleep(2.5)
+                    await engine.run(time.sleep, 1)
+                    return await engine.run(sum, [1, 2])
+
+                return await asyncio.gather(
+                    engine.run(time.sleep, 30), collateral(), return_exceptions=True
+                )
+            hung, collateral = asyncio.run(scenario())
+            assert isinstance(hung, ExtractionError) and "zaman aşımı" in str(hung)
+            assert collateral == 3
+        finally:
+            engine.shutdown()
+
+    def test_inline_mode(self, pdf_path):
+        """Worker sayısı 0 iken süreç içinde çalışır"""
+        engine = ExtractionEngine(max_workers=0, timeout=30, pdf_pages_per_task=2)
+        text = asyncio.run(engine.extract(pdf_path, "pdf"))
+        assert text.startswith("Sayfa 1")
@@ -0,0 +1,156 @@
+"""
+Migration ve Sorgu Planı Testleri
+=================================
+"""
+
+import io
+import os
+import pytest
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine, select, func
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex
+from app.database import Base
+from app.migrations import get_alembic_config, upgrade_database
+from models.document import Document
+from models.search_index import DocumentKeyword, DocumentTerm
+from services.document_service import DocumentService
+
+@pytest.fixture
+def migrated_engine(tmp_path):
+    """Migration'larla oluşturulmuş boş SQLite veritabanı"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'migrated.db'}")
+    upgrade_database(engine)
+    yield engine
+    engine.dispose()
+
+def query_plan(engine, statement) -> str:
+    """SQLite sorgu planını tek metin olarak döndür"""
+    sql = str(statement.compile(engine, compile_kwargs={"literal_binds": True}))
+    with engine.connect() as connection:
+        rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+    return "\n".join(row[-1] for row in rows)
+
+class TestMigrations:
+    """Alembic migration testleri"""
+
+    def test_migrations_match_models(self, migrated_engine):
+        """Migration'lar modellerle aynı şemayı üretir"""
+        with migrated_engine.connect() as connection:
+            context = MigrationContext.configure(connection)
+            assert context.get_current_revision() == "0007"
+            assert compare_metadata(context, Base.metadata) == []
+
+    def test_upgrade_is_idempotent(self, migrated_engine):
+        """Son sürümdeki veritabanında yeniden çalıştırma bir şey yapmaz"""
+        upgrade_database(migrated_engine)
+        with migrated_engine.connect() as connection:
+            assert MigrationContext.configure(connection).get_current_revision() == "0007"
+
+    def test_unversioned_database_is_stamped(self, tmp_path):
+        """create_all ile oluşturulmuş veritabanı işaretlenip yükseltilir"""
+        engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+        Base.metadata.create_all(bind=engine)
+        upgrade_database(engine)
+        with engine.connect() as connection:
+            context = MigrationContext.configure(connection)
+            assert context.get_current_revision() == "0007"
+            assert compare_metadata(context, Base.metadata) == []
+        engine.dispose()
+
+    def test_postgresql_offline_sql(self):
+        """Migration'lar PostgreSQL için SQL üretebilir (kısmi indeks dahil)"""
+        config = get_alembic_config()
+        config.set_main_option("sqlalchemy.url", "postgresql://localhost/dokuman")
+        config.output_buffer = io.StringIO()
+        command.upgrade(config, "head", sql=True)
+        sql = config.output_buffer.getvalue()
+        assert "CREATE INDEX ix_documents_user_file_type ON documents (user_id, file_type)" in sql
+        assert "CREATE INDEX ix_documents_user_summarized ON documents (user_id, id) WHERE summary IS NOT NULL" in sql
+
+class TestQueryPlans:
+    """Sıcak sorguların indeks kullanımı (regresyon) testleri"""
+
+    def test_user_listing_uses_cursor_index(self, migrated_engine):
+        """Kullanıcı listesi (created_at, id) indeksinden okunur"""
+        statement = DocumentService.paginate(
+            select(Document.id).where(Document.user_id == 1)
+        ).limit(20)
+        plan = query_plan(migrated_engine, statement)
+        assert "ix_documents_user_created_id" in plan
+        assert "USE TEMP B-TREE" not in plan
+
+    def test_document_by_id_uses_index(self, migrated_engine):
+        """Kullanıcının tekil dokümanı indeksle bulunur"""
+        statement = select(Document.id).where(Document.id == 5, Document.user_id == 1)
+        plan = query_plan(migrated_engine, statement)
+        assert "SCAN documents" not in plan
+        assert "SEARCH documents" in plan
+
+    def test_file_type_filter_uses_index(self, migrated_engine):
+        """Dosya türü filtresi bileşik indeksi kullanır"""
+        statement = select(func.count()).select_from(Document).where(
+            Document.user_id == 1, Document.file_type == "pdf"
+        )
+        plan = query_plan(migrated_engine, statement)
+        assert "ix_documents_user_file_type" in plan
+
+    def test_summarized_count_uses_partial_index(self, migrated_engine):
+        """Özetlenmiş doküman sayımı kısmi indeksi kullanır"""
+        statement = select(func.count()).select_from(Document).where(
+            Document.user_id == 1, Document.summary.isnot(None)
+        )
+        plan = query_plan(migrated_engine, statement)
+        assert "ix_documents_user_summarized" in plan
+
+    def test_term_lookup_uses_index(self, migrated_engine):
+        """Terim araması ters indeks üzerinden aralık taramasıdır"""
+        statement = select(DocumentTerm.document_id).where(
+            DocumentTerm.user_id == 1,
+            DocumentTerm.term >= "dok",
+            DocumentTerm.term < "dol"
+        )
+        plan = query_plan(migrated_engine, statement)
+        assert "ix_document_terms_user_term" in plan
+
+    def test_keyword_filter_and_facets_use_index(self, migrated_engine):
+        """Etiket filtresi ve faset sayımı etiket indeksinden okunur"""
+        lookup = select(DocumentKeyword.document_id).where(
+            DocumentKeyword.user_id == 1, DocumentKeyword.keyword == "bütçe"
+        )
+        facets = select(DocumentKeyword.keyword, func.count()).where(
+            DocumentKeyword.user_id == 1
+        ).group_by(DocumentKeyword.keyword)
+        for statement in (lookup, facets):
+            plan = query_plan(migrated_engine, statement)
+            assert "ix_document_keywords_user_keyword" in plan
+            assert "USE TEMP B-TREE" not in plan
+
+    def test_postgresql_partial_index_ddl(self):
+        """Kısmi indeks PostgreSQL için WHERE koşuluyla derlenir"""
+        index = next(i for i in Document.__table__.indexes if i.name == "ix_documents_user_summarized")
+        ddl = str(CreateIndex(index).compile(dialect=postgresql.dialect()))
+        assert "WHERE summary IS NOT NULL" in ddl
+
+    @pytest.mark.skipif(not os.getenv("TEST_POSTGRES_URL"), reason="TEST_POSTGRES_URL tanımlı değil")
+    def test_postgresql_plans(self):
+        """Gerçek PostgreSQL üzerinde indeks kullanımı (enable_seqscan kapalı)"""
+        engine = create_engine(os.environ["TEST_POSTGRES_URL"])
+        upgrade_database(engine)
+        statements = {
+            "ix_documents_user_file_type": select(func.count()).select_from(Document).where(
+                Document.user_id == 1, Document.file_type == "pdf"
+            ),
+            "ix_documents_user_summarized": select(func.count()).select_from(Document).where(
+                Document.user_id == 1, Document.summary.isnot(None)
+            ),
+        }
+        with engine.connect() as connection:
+            connection.exec_driver_sql("SET enable_seqscan = off")
+            for index_name, statement in statements.items():
+                sql = str(statement.compile(engine, compile_kwargs={"literal_binds": True}))
+                plan = "\n".join(row[0] for row in connection.exec_driver_sql(f"EXPLAIN {sql}"))
+                assert index_name in plan
+        engine.dispose()
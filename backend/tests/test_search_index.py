@@ -0,0 +1,328 @@
+"""
+Arama İndeksi Testleri
+======================
+"""
+
+import threading
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from app.config import settings
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.database import Base
+from models.document import Document
+from models.search_index import DocumentChunk, DocumentKeyword, DocumentTerm
+from models.user import User
+from services.keywords import parse_keyword_list
+from services.search_service import INDEX_VERSION, SearchIndexService
+from services.text_analysis import normalize_turkish, tokenize
+
+# Test veritabanı
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+@pytest.fixture(autouse=True)
+def setup_database():
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+@pytest.fixture
+def db():
+    session = TestingSessionLocal()
+    yield session
+    session.close()
+
+@pytest.fixture
+def user(db):
+    user = User(email="index@example.com", username="indexuser", hashed_password="x")
+    db.add(user)
+    db.commit()
+    return user
+
+def create_document(db, user, title, content):
+    document = Document(
+        title=title,
+        filename="test.txt",
+        file_path="uploads/test.txt",
+        file_size=len(content),
+        file_type="txt",
+        content=content,
+        user_id=user.id
+    )
+    db.add(document)
+    db.flush()
+    SearchIndexService.index_document(db, document)
+    db.commit()
+    return document
+
+def search(db, user_id, query):
+    matched = SearchIndexService.match_query(user_id, query)
+    if matched is None:
+        return set()
+    return {row[0] for row in db.execute(matched)}
+
+class TestTextAnalysis:
+    """Tokenizasyon testleri"""
+
+    def test_turkish_case_folding(self):
+        """Türkçe büyük/küçük harf ve aksan normalizasyonu"""
+        assert normalize_turkish("İSTANBUL") == "istanbul"
+        assert normalize_turkish("IĞDIR") == "igdir"
+        assert normalize_turkish("Doküman Şöyle") == "dokuman soyle"
+
+    def test_tokenize_skips_punctuation_and_short_tokens(self):
+        """Noktalama ve tek karakterli terimler atlanır"""
+        assert tokenize("Yapay zeka, (AI) ve a!") == ["yapay", "zeka", "ai", "ve"]
+
+class TestSearchIndex:
+    """Ters indeks testleri"""
+
+    def test_index_and_match(self, db, user):
+        """Tüm sorgu terimlerini içeren dokümanlar eşleşir"""
+        ai_doc = create_document(db, user, "Yapay Zeka", "Makine öğrenmesi hakkında")
+        data_doc = create_document(db, user, "Veri Bilimi", "İstatistik ve makine")
+
+        assert search(db, user.id, "makine") == {ai_doc.id, data_doc.id}
+        assert search(db, user.id, "yapay makine") == {ai_doc.id}
+        assert search(db, user.id, "ogrenme") == {ai_doc.id}
+        assert search(db, user.id, "istatistik zeka") == set()
+
+    def test_match_is_scoped_to_user(self, db, user):
+        """Başka kullanıcının dokümanları eşleşmez"""
+        create_document(db, user, "Rapor", "Gizli içerik")
+        assert search(db, user.id + 1, "gizli") == set()
+
+    def test_remove_document(self, db, user):
+        """Silinen dokümanın indeks kayıtları temizlenir"""
+        document = create_document(db, user, "Rapor", "Geçici içerik")
+        SearchIndexService.remove_document(db, document.id)
+        db.commit()
+
+        assert db.query(DocumentTerm).count() == 0
+        assert search(db, user.id, "gecici") == set()
+
+    def test_index_stores_document_length(self, db, user):
+        """Doküman uzunluğu BM25 için saklanır"""
+        document = create_document(db, user, "Kısa Not", "bir iki üç")
+        assert document.term_count == 5
+
+    def test_rank_orders_by_bm25(self, db, user):
+        """Terimi daha yoğun içeren doküman önce gelir"""
+        sparse = create_document(db, user, "Rapor", "zeka " + "dolgu " * 50)
+        dense = create_document(db, user, "Zeka Notları", "zeka zeka zeka öğrenme")
+        create_document(db, user, "Diğer", "ilgisiz içerik")
+
+        ranked = SearchIndexService.rank(db, user.id, "zeka")
+        assert [document_id for document_id, _ in ranked] == [dense.id, sparse.id]
+        assert ranked[0][1] > ranked[1][1] > 0
+
+    def test_rank_applies_filters_and_paging(self, db, user):
+        """Ek filtreler ve sayfalama sıralamaya uygulanır"""
+        first = create_document(db, user, "Zeka", "zeka zeka")
+        second = create_document(db, user, "Zeka", "zeka")
+
+        filtered = SearchIndexService.rank(db, user.id, "zeka", (Document.id != first.id,))
+        assert [document_id for document_id, _ in filtered] == [second.id]
+
+        assert SearchIndexService.rank(db, user.id, "zeka", limit=1)[0][0] == first.id
+        assert SearchIndexService.rank(db, user.id, "zeka", limit=1, offset=1)[0][0] == second.id
+
+    def test_reindex_missing(self, db, user):
+        """İndekslenmemiş dokümanlar geriye dönük indekslenir"""
+        document = Document(
+            title="Eski Doküman",
+            filename="old.txt",
+            file_path="uploads/old.txt",
+            file_size=10,
+            file_type="txt",
+            content="Arşivlenmiş içerik",
+            user_id=user.id
+        )
+        db.add(document)
+        db.commit()
+
+        assert SearchIndexService.reindex_missing(db) == 1
+        assert search(db, user.id, "arsiv") == {document.id}
+        assert document.index_version == INDEX_VERSION
+
+    def test_reindex_missing_skips_marked_documents(self, db, user, monkeypatch):
+        """İşaretlenen dokümanlar (terim/parça üretmese de) yeniden taranmaz"""
+        empty = create_document(db, user, "", "")
+        legacy = create_document(db, user, "Eski", "içerik")
+        legacy.index_version = None
+        db.commit()
+        assert empty.index_version == INDEX_VERSION
+
+        written = []
+        write_chunks = SearchIndexService.write_chunks
+
+        def counting_write_chunks(db, document_id, content):
+            written.append(document_id)
+            return write_chunks(db, document_id, content)
+
+        monkeypatch.setattr(SearchIndexService, "write_chunks", staticmethod(counting_write_chunks))
+        SearchIndexService.reindex_missing(db, batch_size=1)
+        assert written == [legacy.id]
+        assert legacy.index_version == INDEX_VERSION
+
+        SearchIndexService.reindex_missing(db)
+        assert written == [legacy.id]
+
+    def test_reindex_missing_stops_between_batches(self, db, user):
+        """Durdurma isteğinde sonraki partiye geçilmez"""
+        document = Document(
+            title="Eski", filename="old.txt", file_path="uploads/old.txt",
+            file_size=10, file_type="txt", content="içerik", user_id=user.id
+        )
+        db.add(document)
+        db.commit()
+
+        stop = threading.Event()
+        stop.set()
+        assert SearchIndexService.reindex_missing(db, stop=stop) == 0
+        assert document.index_version is None
+
+class TestCorpusStatistics:
+    """TF-IDF korpus istatistikleri testleri"""
+
+    def test_document_frequencies(self, db, user):
+        """Doküman sayısı ve istenen terimlerin doküman frekansları"""
+        create_document(db, user, "Bir", "bütçe raporu")
+        create_document(db, user, "İki", "bütçe planı")
+        create_document(db, user, "Üç", "ilgisiz")
+
+        corpus = SearchIndexService.corpus_statistics(db, user.id)
+        assert corpus.total_documents == 3
+        assert corpus.document_frequency(["butce", "plani", "yok"]) == {"butce": 2, "plani": 1}
+        assert corpus.document_frequency([]) == {}
+
+    def test_document_frequencies_from_threads(self, db, user):
+        """İstatistikler thread havuzundan eşzamanlı sorgulanabilir"""
+        create_document(db, user, "Bir", "bütçe raporu")
+        corpus = SearchIndexService.corpus_statistics(db, user.id)
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(corpus.document_frequency, [["butce"]] * 8))
+        assert results == [{"butce": 1}] * 8
+
+def long_report(needle_section=None):
+    """Her bölümü ayrı paragraf olan uzun rapor metni"""
+    sections = [
+        f"Bölüm {i}. " + " ".join(f"dolgu{i}x{j}" for j in range(40))
+        for i in range(30)
+    ]
+    if needle_section is not None:
+        sections[needle_section] += " Bütçe açığı yüzde on iki olarak hesaplandı."
+    return "\n\n".join(sections)
+
+class TestChunkRetrieval:
+    """Soru-cevap parça indeksi testleri"""
+
+    @pytest.fixture(autouse=True)
+    def small_chunks(self, monkeypatch):
+        monkeypatch.setattr(settings, "ASK_CHUNK_TOKENS", 200)
+        monkeypatch.setattr(settings, "ASK_CONTEXT_CHUNKS", 2)
+
+    def test_chunks_written_at_index_time(self, db, user):
+        """İndeksleme parçaları terim frekanslarıyla yazar"""
+        document = create_document(db, user, "Rapor", long_report())
+        chunks = db.query(DocumentChunk).filter(DocumentChunk.document_id == document.id).all()
+        assert len(chunks) > 5
+        assert all(chunk.term_count == sum(chunk.term_frequencies.values()) for chunk in chunks)
+
+    def test_retrieves_relevant_chunk_beyond_prefix(self, db, user):
+        """Dokümanın sonundaki ilgili bölüm bulunur, bağlam sınırlı kalır"""
+        content = long_report(needle_section=27)
+        document = create_document(db, user, "Rapor", content)
+
+        passages = SearchIndexService.retrieve_chunks(db, document, "Bütçe açığı ne kadar?")
+
+        assert 1 <= len(passages) <= 2
+        assert any("yüzde on iki" in passage for passage in passages)
+        assert content.index("Bütçe") > 2000
+        assert sum(len(passage) for passage in passages) < len(content) / 4
+
+    def test_no_match_falls_back_to_beginning(self, db, user):
+        """Eşleşme yoksa ilk parçalar kullanılır"""
+        document = create_document(db, user, "Rapor", long_report())
+        passages = SearchIndexService.retrieve_chunks(db, document, "uzay istasyonu")
+        assert passages[0].startswith("Bölüm 0.")
+
+    def test_unindexed_document_is_chunked_in_memory(self, db, user):
+        """Parçaları olmayan doküman bellekte bölünür; reindex parçaları yazar"""
+        document = create_document(db, user, "Rapor", long_report(needle_section=20))
+        # Parçalar eklenmeden önce indekslenmiş (işaretsiz) eski doküman
+        db.query(DocumentChunk).delete()
+        document.index_version = None
+        db.commit()
+
+        passages = SearchIndexService.retrieve_chunks(db, document, "bütçe")
+        assert any("Bütçe" in passage for passage in passages)
+
+        SearchIndexService.reindex_missing(db)
+        assert db.query(DocumentChunk).filter(DocumentChunk.document_id == document.id).count() > 5
+
+    def test_remove_document_removes_chunks(self, db, user):
+        """Silinen dokümanın parçaları temizlenir"""
+        document = create_document(db, user, "Rapor", long_report())
+        SearchIndexService.remove_document(db, document.id)
+        db.commit()
+        assert db.query(DocumentChunk).count() == 0
+
+class TestKeywordIndex:
+    """Yapılandırılmış anahtar kelime (etiket) indeksi testleri"""
+
+    def test_parse_keyword_list(self):
+        """Virgüllü, numaralı ve JSON listeler küçültülüp tekilleştirilir"""
+        assert parse_keyword_list("Yapay Zeka,  İSTANBUL\n1. Veri Analizi, yapay zeka") == [
+            "yapay zeka", "istanbul", "veri analizi"
+        ]
+        assert parse_keyword_list('["Model", "veri"]') == ["model", "veri"]
+        assert parse_keyword_list(None) == [] and parse_keyword_list(" , ") == []
+
+    def test_keywords_written_with_weights(self, db, user):
+        """Anahtar kelimeler sıraya göre azalan ağırlıkla yazılır"""
+        document = create_document(db, user, "Rapor", "içerik")
+        document.keywords = "bütçe, gelir, gider, rapor"
+        assert SearchIndexService.write_keywords(db, document) == 4
+        db.commit()
+        rows = dict(db.query(DocumentKeyword.keyword, DocumentKeyword.weight).filter(
+            DocumentKeyword.document_id == document.id
+        ))
+        assert rows == {"bütçe": 1.0, "gelir": 0.75, "gider": 0.5, "rapor": 0.25}
+
+    def test_match_keywords_and_facets(self, db, user):
+        """Etiket filtresi tüm kelimeleri arar; fasetler filtreye göre sayılır"""
+        first = create_document(db, user, "Birinci", "içerik")
+        second = create_document(db, user, "İkinci", "içerik")
+        first.keywords, second.keywords = "bütçe, gelir", "Bütçe, gider"
+        SearchIndexService.write_keywords(db, first)
+        SearchIndexService.write_keywords(db, second)
+        db.commit()
+
+        matched = SearchIndexService.match_keywords(user.id, ["BÜTÇE", "gider"])
+        assert {row[0] for row in db.execute(matched)} == {second.id}
+        assert SearchIndexService.match_keywords(user.id, [" "]) is None
+        assert SearchIndexService.keyword_facets(db, user.id) == [("bütçe", 2), ("gelir", 1), ("gider", 1)]
+        assert SearchIndexService.keyword_facets(db, user.id, (Document.id == first.id,)) == [
+            ("bütçe", 1), ("gelir", 1)
+        ]
+        assert SearchIndexService.keyword_facets(db, user.id + 1) == []
+
+    def test_remove_and_backfill_keywords(self, db, user):
+        """Silinen dokümanın etiketleri kalkar; eksik etiketler geriye dönük yazılır"""
+        document = create_document(db, user, "Rapor", "içerik")
+        # Etiket indeksi eklenmeden önce özetlenmiş (işaretsiz) eski doküman
+        document.keywords = "bütçe, gelir"
+        document.index_version = None
+        db.commit()
+        assert db.query(DocumentKeyword).count() == 0
+
+        SearchIndexService.reindex_missing(db)
+        assert db.query(DocumentKeyword).count() == 2
+
+        SearchIndexService.remove_document(db, document.id)
+        db.commit()
+        assert db.query(DocumentKeyword).count() == 0
@@ -6,14 +6,19 @@ Arama Sonucu Testleri
 import pytest
 import tempfile
 import os
+from datetime import datetime
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from app.database import Base, get_db
+from sqlalchemy.pool import NullPool
+from app.database import Base, get_async_db, get_db
 from main import app
 from models.document import Document
 from models.user import User
 from services.auth_service import AuthService
+from services.search_service import SearchIndexService
 
 # Test veritabanı
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
@@ -28,6 +33,17 @@ def override_get_db():
         db.close()
 
 app.dependency_overrides[get_db] = override_get_db
+
+# Async session'lar aynı test veritabanını kullanır (her istek kendi loop'unda)
+async_engine = create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+
+async def override_get_async_db():
+    async with TestingAsyncSessionLocal() as db:
+        yield db
+
+app.dependency_overrides[get_async_db] = override_get_async_db
+
 client = TestClient(app)
 
 @pytest.fixture(autouse=True)
@@ -111,6 +127,34 @@ class TestBasicSearch:
         assert isinstance(results, list)
         assert len(results) > 0
     
+    def test_search_turkish_normalization(self, auth_headers, test_documents):
+        """Türkçe karakter ve ek içermeyen sorgu ile arama testi"""
+        response = client.get("/api/search/",
+                            params={"query": "ogrenme"},
+                            headers=auth_headers)
+
+        assert response.status_code == 200
+        results = response.json()
+        assert [doc["title"] for doc in results] == ["Yapay Zeka Dokümanı"]
+
+    def test_search_sort_by_relevance(self, auth_headers, test_documents):
+        """Alaka düzeyine göre sıralı arama testi"""
+        response = client.get("/api/search/",
+                            params={"query": "doküman bilgi", "sort": "relevance"},
+                            headers=auth_headers)
+
+        assert response.status_code == 200
+        results = response.json()
+        assert len(results) == 2
+
+    def test_search_invalid_sort(self, auth_headers):
+        """Geçersiz sıralama parametresi testi"""
+        response = client.get("/api/search/",
+                            params={"query": "doküman", "sort": "random"},
+                            headers=auth_headers)
+
+        assert response.status_code == 422
+
     def test_search_with_file_type_filter(self, auth_headers, test_documents):
         """Dosya türü filtresi ile arama testi"""
         response = client.get("/api/search/", 
@@ -295,6 +339,132 @@ class TestSearchResultsFormat:
             if "keywords" in result:
                 assert isinstance(result["keywords"], str)
 
+class TestListProjection:
+    """Liste projeksiyonu testleri"""
+
+    def test_list_excludes_large_fields(self, auth_headers, test_documents):
+        """Liste ve arama yanıtlarında content/summary bulunmaz"""
+        for path, params in [
+            ("/api/search/", {"query": "doküman"}),
+            ("/api/search/documents/", {}),
+            ("/api/documents/", {}),
+        ]:
+            response = client.get(path, params=params, headers=auth_headers)
+            assert response.status_code == 200
+            results = response.json()
+            assert len(results) > 0
+            for result in results:
+                assert "content" not in result
+                assert "summary" not in result
+                assert "title" in result
+
+    def test_list_does_not_select_content(self, auth_headers, test_documents):
+        """Büyük kolonlar SQL seviyesinde okunmaz"""
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(Engine, "before_cursor_execute", capture)
+        try:
+            response = client.get("/api/search/documents/", headers=auth_headers)
+        finally:
+            event.remove(Engine, "before_cursor_execute", capture)
+
+        assert response.status_code == 200
+        selects = [sql for sql in statements if "FROM documents" in sql]
+        assert selects
+        assert all("documents.content" not in sql and "documents.summary" not in sql for sql in selects)
+
+    def test_fields_parameter_adds_content(self, auth_headers, test_documents):
+        """fields= ile istenen alanlar yanıta eklenir"""
+        response = client.get(
+            "/api/search/",
+            params={"query": "yapay", "fields": "content,summary"},
+            headers=auth_headers
+        )
+        assert response.status_code == 200
+        result = response.json()[0]
+        assert "yapay zeka" in result["content"]
+        assert "summary" in result
+
+        response = client.get("/api/documents/", params={"fields": "summary"}, headers=auth_headers)
+        assert response.status_code == 200
+        assert all("summary" in doc and "content" not in doc for doc in response.json())
+
+    def test_invalid_fields_parameter(self, auth_headers):
+        """Geçersiz alan isteği doğrulama hatası döndürür"""
+        response = client.get("/api/documents/", params={"fields": "hashed_password"}, headers=auth_headers)
+        assert response.status_code == 422
+
+    def test_single_document_includes_content(self, auth_headers, test_documents):
+        """Tekil doküman endpoint'i tam içeriği döndürür"""
+        doc_id = test_documents[0]["id"]
+        response = client.get(f"/api/search/documents/{doc_id}", headers=auth_headers)
+        assert response.status_code == 200
+        assert "yapay zeka" in response.json()["content"]
+
+def set_keywords(document_id, keywords):
+    """Doküman anahtar kelimelerini özetleme yolundaki gibi yaz"""
+    db = TestingSessionLocal()
+    document = db.query(Document).filter(Document.id == document_id).first()
+    document.keywords = keywords
+    SearchIndexService.write_keywords(db, document)
+    db.commit()
+    db.close()
+
+class TestKeywordFacets:
+    """Anahtar kelime filtresi ve faset testleri"""
+
+    @pytest.fixture
+    def tagged_documents(self, test_documents):
+        ai_id, data_id = test_documents[0]["id"], test_documents[1]["id"]
+        set_keywords(ai_id, "Yapay Zeka, öğrenme, Veri")
+        set_keywords(data_id, "veri, İstatistik")
+        return ai_id, data_id
+
+    def test_search_filters_by_keyword(self, auth_headers, tagged_documents):
+        """Anahtar kelime filtresi büyük/küçük harften bağımsız eşleşir"""
+        ai_id, data_id = tagged_documents
+        response = client.get("/api/search/", params={"keyword": "VERİ"}, headers=auth_headers)
+        assert response.status_code == 200
+        assert {doc["id"] for doc in response.json()} == {ai_id, data_id}
+        
+        response = client.get(
+            "/api/search/", params=[("keyword", "veri"), ("keyword", "istatistik")], headers=auth_headers
+        )
+        assert [doc["id"] for doc in response.json()] == [data_id]
+
+    def test_keyword_filter_combines_with_query(self, auth_headers, tagged_documents):
+        """Anahtar kelime filtresi metin sorgusu ve alaka sıralamasıyla birlikte çalışır"""
+        ai_id, _ = tagged_documents
+        for sort in ("date", "relevance"):
+            response = client.get(
+                "/api/search/",
+                params={"query": "doküman", "keyword": "öğrenme", "sort": sort},
+                headers=auth_headers
+            )
+            assert [doc["id"] for doc in response.json()] == [ai_id]
+
+    def test_keyword_facets(self, auth_headers, tagged_documents):
+        """Faset sayımları çoktan aza sıralanır ve seçimle daraltılır"""
+        response = client.get("/api/search/keywords", headers=auth_headers)
+        assert response.status_code == 200
+        facets = response.json()
+        assert facets[0] == {"keyword": "veri", "count": 2}
+        assert {facet["keyword"] for facet in facets} == {"veri", "yapay zeka", "öğrenme", "istatistik"}
+        
+        response = client.get("/api/search/keywords", params={"keyword": "istatistik"}, headers=auth_headers)
+        assert response.json() == [
+            {"keyword": "istatistik", "count": 1},
+            {"keyword": "veri", "count": 1}
+        ]
+
+    def test_keyword_facets_unauthorized(self):
+        """Yetkisiz faset isteği reddedilir"""
+        response = client.get("/api/search/keywords")
+        assert response.status_code in (401, 403)
+
 class TestSearchPagination:
     """Arama sayfalama testleri"""
     
@@ -331,6 +501,52 @@ class TestSearchPagination:
         if len(results1) > 0 and len(results2) > 0:
             assert results1[0]["id"] != results2[0]["id"]
 
+    def test_cursor_pagination(self, auth_headers, test_documents):
+        """İmleçle sayfalama tüm dokümanları sırasıyla ve tekrarsız döndürür"""
+        db = TestingSessionLocal()
+        user = db.query(User).filter(User.email == "test@example.com").first()
+        for index, created_at in enumerate([
+            datetime(2020, 1, 1, 12, 0, 0),
+            datetime(2020, 1, 1, 12, 0, 0),
+            datetime(2019, 6, 1, 8, 30, 0),
+        ]):
+            db.add(Document(
+                title=f"Eski doküman {index}",
+                filename=f"old_{index}.txt",
+                file_path=f"uploads/old_{index}.txt",
+                file_size=10,
+                file_type="txt",
+                user_id=user.id,
+                created_at=created_at
+            ))
+        db.commit()
+        db.close()
+
+        expected = [doc["id"] for doc in client.get(
+            "/api/search/documents/", params={"limit": 100}, headers=auth_headers
+        ).json()]
+        assert len(expected) == 5
+
+        for path in ["/api/search/documents/", "/api/documents/", "/api/search/"]:
+            seen = []
+            cursor = None
+            for _ in range(5):
+                params = {"limit": 2}
+                if cursor:
+                    params["cursor"] = cursor
+                response = client.get(path, params=params, headers=auth_headers)
+                assert response.status_code == 200
+                seen.extend(doc["id"] for doc in response.json())
+                cursor = response.headers.get("X-Next-Cursor")
+                if not cursor:
+                    break
+            assert seen == expected
+
+    def test_invalid_cursor(self, auth_headers):
+        """Bozuk imleç 400 döndürür"""
+        response = client.get("/api/search/documents/", params={"cursor": "bozuk!"}, headers=auth_headers)
+        assert response.status_code == 400
+
 class TestSearchErrorHandling:
     """Arama hata yönetimi testleri"""
     
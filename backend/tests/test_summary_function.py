@@ -4,17 +4,30 @@
 """
 
 import pytest
+import asyncio
 import tempfile
 import os
+import threading
+import time
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from app.database import Base, get_db
+from sqlalchemy.pool import NullPool
+from app.database import Base, get_async_db, get_db
 from main import app
 from models.document import Document
 from models.user import User
 from services.auth_service import AuthService
-from services.ai_service import AIService
+from services import ai_service as ai_service_module
+from services.ai_service import AIService, get_ai_service, reset_ai_service
+from services.ai_cache import ai_result_cache
+from services.chunking import estimate_tokens, split_into_chunks
+from services.extractive import rank_sentences, split_sentences, summarize
+from services.keywords import CorpusStatistics, count_words, extract_keywords
+from services.document_service import DocumentService
+from services.search_service import SearchIndexService
+from app.config import settings
 
 # Test veritabanı
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
@@ -29,6 +42,17 @@ def override_get_db():
         db.close()
 
 app.dependency_overrides[get_db] = override_get_db
+
+# Async session'lar aynı test veritabanını kullanır (her istek kendi loop'unda)
+async_engine = create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+
+async def override_get_async_db():
+    async with TestingAsyncSessionLocal() as db:
+        yield db
+
+app.dependency_overrides[get_async_db] = override_get_async_db
+
 client = TestClient(app)
 
 @pytest.fixture(autouse=True)
@@ -37,6 +61,11 @@ def setup_database():
     yield
     Base.metadata.drop_all(bind=engine)
 
+@pytest.fixture(autouse=True)
+def clear_ai_cache():
+    asyncio.run(ai_result_cache.clear())
+    yield
+
 @pytest.fixture
 def test_user():
     """Test kullanıcısı oluştur"""
@@ -95,6 +124,29 @@ class TestSummaryGeneration:
         assert len(result["summary"]) > 0
         assert len(result["keywords"]) > 0
     
+    def test_generate_summary_database_work_off_event_loop(self, monkeypatch, auth_headers, test_document):
+        """Doküman okuma ve özet kaydı event loop dışında yürür"""
+        monkeypatch.setattr(get_ai_service(), "use_gemini", False)
+        called_in_loop = []
+
+        def spying(method):
+            def spy(*args, **kwargs):
+                try:
+                    asyncio.get_running_loop()
+                    called_in_loop.append(True)
+                except RuntimeError:
+                    called_in_loop.append(False)
+                return method(*args, **kwargs)
+            return staticmethod(spy)
+
+        monkeypatch.setattr(DocumentService, "get_document", spying(DocumentService.get_document))
+        monkeypatch.setattr(DocumentService, "save_summary", spying(DocumentService.save_summary))
+        response = client.post(f"/api/summary/{test_document['id']}/generate", headers=auth_headers)
+
+        assert response.status_code == 200
+        assert response.json()["document"]["summary"] == response.json()["summary"]
+        assert called_in_loop == [False, False]
+
     def test_generate_summary_nonexistent_document(self, auth_headers):
         """Var olmayan doküman için özet oluşturma testi"""
         response = client.post("/api/summary/999/generate", headers=auth_headers)
@@ -168,8 +220,442 @@ class TestAIService:
         assert "score" in results[0]
         assert "reason" in results[0]
 
+    def test_simple_search_short_terms_match_exactly(self):
+        """Kısa sorgu terimleri önek olarak eşleşmez (arama indeksiyle aynı kural)"""
+        documents = ["ab testi sonuçları", "abartılı abonelik reklamı"]
+        results = AIService()._simple_text_search("ab", documents)
+        assert [result["index"] for result in results] == [0]
+
+        results = AIService()._simple_text_search("abo", documents)
+        assert [result["index"] for result in results] == [1]
+
+    def test_simple_search_reuses_document_statistics(self, monkeypatch):
+        """Doküman metni her sorguda yeniden tokenize edilmez"""
+        documents = ["bütçe raporu ve gelir tablosu", "gider raporu"]
+        ai_service_module._document_statistics.cache_clear()
+        tokenized = []
+        tokenize = ai_service_module.tokenize
+
+        def counting_tokenize(text):
+            tokenized.append(text)
+            return tokenize(text)
+
+        monkeypatch.setattr(ai_service_module, "tokenize", counting_tokenize)
+        service = AIService()
+        service._simple_text_search("rapor", documents)
+        service._simple_text_search("gelir", documents)
+        assert tokenized == ["rapor", *documents, "gelir"]
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+class FakeAsyncModel:
+    """Eşzamanlı çağrı sayısını ölçen sahte async Gemini modeli"""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def generate_content_async(self, prompt):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(self.delay)
+        self.in_flight -= 1
+        return FakeResponse(f"yanıt: {prompt}")
+
+class FakeSyncModel:
+    """Yalnızca senkron API sunan sahte Gemini modeli"""
+
+    def generate_content(self, prompt):
+        time.sleep(0.05)
+        return FakeResponse(threading.current_thread().name)
+
+class FakeScriptedModel:
+    """Sırayla önceden tanımlı yanıtlar döndüren sahte Gemini modeli"""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.prompts = []
+
+    async def generate_content_async(self, prompt):
+        self.prompts.append(prompt)
+        return FakeResponse(self.responses.pop(0))
+
+def make_ai_service(model):
+    ai_service = AIService()
+    ai_service.use_gemini = True
+    ai_service.model = model
+    return ai_service
+
+class FakeTokenCounter:
+    """Isınma çağrısını sayan sahte Gemini modeli"""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def count_tokens_async(self, prompt):
+        self.calls += 1
+        return {"total_tokens": 1}
+
+class TestSharedAIService:
+    """Uygulama genelinde paylaşılan AI istemcisi testleri"""
+
+    def test_get_ai_service_is_singleton(self):
+        """Aynı örnek tekrar kullanılır, sıfırlanınca yeniden oluşturulur"""
+        reset_ai_service()
+        first = get_ai_service()
+        assert get_ai_service() is first
+        reset_ai_service()
+        assert get_ai_service() is not first
+
+    def test_warm_up(self):
+        """Isınma çağrısı modelin token sayımını kullanır"""
+        model = FakeTokenCounter()
+        ai_service = make_ai_service(model)
+        assert asyncio.run(ai_service.warm_up()) is True
+        assert model.calls == 1
+
+        ai_service.use_gemini = False
+        assert asyncio.run(ai_service.warm_up()) is False
+        assert model.calls == 1
+
+    def test_process_document_uses_shared_service(self, monkeypatch, auth_headers, test_document):
+        """/process uç noktası paylaşılan istemciyle özet üretir"""
+        model = FakeScriptedModel(['{"summary": "Paylaşılan özet", "keywords": ["yapay zeka"]}'])
+        monkeypatch.setattr(ai_service_module, "_ai_service", make_ai_service(model))
+
+        response = client.post(f"/api/documents/{test_document['id']}/process", headers=auth_headers)
+
+        assert response.status_code == 200
+        assert response.json()["document"]["summary"] == "Paylaşılan özet"
+        assert len(model.prompts) == 1
+
+class TestNonBlockingGeneration:
+    """Event loop'u bloklamayan Gemini çağrıları testleri"""
+
+    def test_concurrent_calls_overlap(self, monkeypatch):
+        """Eşzamanlı çağrılar sıralı değil paralel yürür"""
+        monkeypatch.setattr(settings, "GEMINI_MAX_CONCURRENCY", 10)
+        model = FakeAsyncModel()
+        ai_service = make_ai_service(model)
+
+        async def run():
+            return await asyncio.gather(*(ai_service._generate_text(str(i)) for i in range(5)))
+
+        started = time.perf_counter()
+        results = asyncio.run(run())
+        elapsed = time.perf_counter() - started
+
+        assert results == [f"yanıt: {i}" for i in range(5)]
+        assert model.max_in_flight == 5
+        assert elapsed < 5 * model.delay
+
+    def test_concurrency_limit(self, monkeypatch):
+        """Eşzamanlı çağrı sayısı yapılandırılan sınırı aşmaz"""
+        monkeypatch.setattr(settings, "GEMINI_MAX_CONCURRENCY", 2)
+        model = FakeAsyncModel()
+        ai_service = make_ai_service(model)
+
+        async def run():
+            await asyncio.gather(*(ai_service._generate_text(str(i)) for i in range(6)))
+
+        asyncio.run(run())
+        assert model.max_in_flight == 2
+
+    def test_sync_model_runs_in_thread_pool(self):
+        """Async API yoksa çağrı thread havuzunda yürütülür"""
+        ai_service = make_ai_service(FakeSyncModel())
+
+        result = asyncio.run(ai_service._generate_text("merhaba"))
+        assert result.startswith("gemini")
+
+class TestCombinedSummary:
+    """Tek çağrıda özet ve anahtar kelime testleri"""
+
+    def test_combined_payload_uses_single_call(self):
+        """Geçerli JSON yanıtı tek çağrıda özet ve anahtar kelime verir"""
+        model = FakeScriptedModel([
+            '```json\n{"summary": "Kısa özet", "keywords": ["yapay zeka", "öğrenme"]}\n```'
+        ])
+        ai_service = make_ai_service(model)
+
+        summary, keywords = asyncio.run(ai_service.generate_summary_and_keywords("içerik"))
+
+        assert summary == "Kısa özet"
+        assert keywords == "yapay zeka, öğrenme"
+        assert len(model.prompts) == 1
+
+    def test_invalid_payload_falls_back_to_two_calls(self):
+        """Çözümlenemeyen yanıtta iki ayrı çağrıya dönülür"""
+        model = FakeScriptedModel(["özet: JSON değil", "Ayrı özet", "kelime1, kelime2"])
+        ai_service = make_ai_service(model)
+
+        summary, keywords = asyncio.run(ai_service.generate_summary_and_keywords("içerik"))
+
+        assert summary == "Ayrı özet"
+        assert keywords == "kelime1, kelime2"
+        assert len(model.prompts) == 3
+
+    def test_parse_summary_payload_validation(self):
+        """Eksik veya hatalı alanlı yanıtlar reddedilir"""
+        assert AIService._parse_summary_payload('{"summary": "", "keywords": ["a"]}') is None
+        assert AIService._parse_summary_payload('{"summary": "Özet", "keywords": 5}') is None
+        assert AIService._parse_summary_payload('["Özet"]') is None
+        assert AIService._parse_summary_payload('{"summary": "Özet", "keywords": "a, b"}') == ("Özet", "a, b")
+
+class FakeChunkModel(FakeAsyncModel):
+    """Parça özetlerini ve final özeti ayırt eden sahte Gemini modeli"""
+
+    def __init__(self, delay=0.05):
+        super().__init__(delay)
+        self.chunk_prompts = []
+        self.final_prompts = []
+
+    async def generate_content_async(self, prompt):
+        if "bir bölümüdür" in prompt:
+            self.chunk_prompts.append(prompt)
+            number = len(self.chunk_prompts)
+            await super().generate_content_async(prompt)
+            return FakeResponse(f"bölüm özeti {number}")
+        self.final_prompts.append(prompt)
+        return FakeResponse('{"summary": "Final özet", "keywords": ["rapor"]}')
+
+def long_document(paragraph_count=40, edited=None):
+    """Her paragrafı farklı, uzun bir test dokümanı"""
+    paragraphs = [
+        f"Bölüm {i}. " + " ".join(f"kelime{i}_{j}" for j in range(60))
+        for i in range(paragraph_count)
+    ]
+    if edited is not None:
+        paragraphs[edited] += " Bu paragraf düzenlendi."
+    return "\n\n".join(paragraphs)
+
+class TestChunkedSummarization:
+    """Uzun dokümanlar için map-reduce özetleme testleri"""
+
+    def test_chunks_respect_token_limit(self):
+        """Parçalar sınırı aşmaz ve tüm içeriği kapsar"""
+        text = long_document()
+        chunks = split_into_chunks(text, 1000)
+        assert len(chunks) > 1
+        assert all(estimate_tokens(chunk) <= 1000 for chunk in chunks)
+        assert "\n\n".join(chunks) == text
+
+    def test_oversized_paragraph_is_split(self):
+        """Sınırı aşan tek paragraf kelime gruplarına bölünür"""
+        text = " ".join(f"kelime{i}" for i in range(2000))
+        chunks = split_into_chunks(text, 500)
+        assert len(chunks) > 1
+        assert all(estimate_tokens(chunk) <= 500 for chunk in chunks)
+
+    def test_oversized_word_is_not_truncated(self):
+        """Sınırdan uzun boşluksuz metin dilimlenir, içerik kaybolmaz"""
+        blob = "".join(f"{i:04d}" for i in range(1500))
+        text = f"Ek: {blob} sonu."
+        chunks = split_into_chunks(text, 500)
+        assert len(chunks) > 1
+        assert all(estimate_tokens(chunk) <= 500 for chunk in chunks)
+        assert "".join(chunks).replace("\n\n", "").replace(" ", "") == text.replace(" ", "")
+
+    def test_edit_changes_only_local_chunks(self):
+        """Bir paragrafı düzenlemek yalnızca yakın parçaları değiştirir"""
+        original = split_into_chunks(long_document(200), 1000)
+        edited = split_into_chunks(long_document(200, edited=100), 1000)
+        assert len(set(edited) - set(original)) <= 2
+        assert len(original) > 10
+
+    def test_long_document_is_map_reduced(self, monkeypatch):
+        """Parçalar eşzamanlı özetlenir, final özet parça özetlerinden üretilir"""
+        monkeypatch.setattr(settings, "SUMMARY_CHUNK_TOKENS", 1000)
+        monkeypatch.setattr(settings, "GEMINI_MAX_CONCURRENCY", 10)
+        model = FakeChunkModel()
+        ai_service = make_ai_service(model)
+        content = long_document()
+
+        summary, keywords = asyncio.run(ai_service.generate_summary_and_keywords(content))
+
+        chunk_count = len(split_into_chunks(content, 1000))
+        assert (summary, keywords) == ("Final özet", "rapor")
+        assert len(model.chunk_prompts) == chunk_count
+        assert model.max_in_flight > 1
+        assert len(model.final_prompts) == 1
+        assert "bölüm özeti 1" in model.final_prompts[0]
+        assert "kelime0_0" not in model.final_prompts[0]
+
+    def test_resummarize_recomputes_changed_chunks(self, monkeypatch):
+        """Düzenlenen dokümanda yalnızca değişen parçalar yeniden özetlenir"""
+        monkeypatch.setattr(settings, "SUMMARY_CHUNK_TOKENS", 1000)
+        model = FakeChunkModel(delay=0)
+        ai_service = make_ai_service(model)
+
+        asyncio.run(ai_service.generate_summary_and_keywords(long_document(200)))
+        first_run = len(model.chunk_prompts)
+        asyncio.run(ai_service.generate_summary_and_keywords(long_document(200, edited=100)))
+
+        assert 1 <= len(model.chunk_prompts) - first_run <= 2
+        assert len(model.final_prompts) == 2
+
+    def test_short_document_uses_single_prompt(self):
+        """Sınırın altındaki metin parçalanmadan özetlenir"""
+        model = FakeChunkModel()
+        asyncio.run(make_ai_service(model).generate_summary_and_keywords("Kısa içerik"))
+        assert model.chunk_prompts == []
+        assert len(model.final_prompts) == 1
+
+class TestKeywordExtraction:
+    """Gemini'sız anahtar kelime çıkarma testleri"""
+
+    def test_counts_skip_stop_words_numbers_and_punctuation(self):
+        """Durak kelimeler, sayılar ve noktalama sayılmaz"""
+        counts = count_words("Öğrenme, öğrenme! (ÖĞRENME) için 2024 yılında; İSTANBUL'da çalışma tarafından")
+        assert counts["öğrenme"] == 3
+        assert counts["istanbul"] == 1
+        assert "için" not in counts and "tarafından" not in counts
+        assert "2024" not in counts
+
+    def test_top_keywords_by_frequency(self):
+        """En sık kelimeler sırayla döner"""
+        text = "model " * 5 + "veri " * 3 + "analiz " * 4 + "tekil"
+        assert extract_keywords(text, 3) == ["model", "analiz", "veri"]
+
+    def test_tf_idf_demotes_corpus_wide_words(self):
+        """Korpusun her yerinde geçen kelime geriye düşer"""
+        text = "rapor " * 6 + "bütçe " * 4 + "açık " * 3
+        corpus = CorpusStatistics(100, lambda terms: {"rapor": 100, "butce": 2})
+        assert extract_keywords(text, 1) == ["rapor"]
+        assert extract_keywords(text, 1, corpus) == ["bütçe"]
+
+    def test_fallback_summary_uses_extractor(self):
+        """Gemini'sız özetleme yeni çıkarıcıyı kullanır"""
+        ai_service = AIService()
+        ai_service.use_gemini = False
+        _, keywords = asyncio.run(ai_service.generate_summary_and_keywords("Yapay zeka, yapay zeka ve öğrenme."))
+        assert keywords.split(", ")[:2] == ["yapay", "zeka"]
+
+class TestExtractiveSummary:
+    """Gemini'sız çıkarımsal (TextRank) özetleme testleri"""
+
+    def test_split_sentences(self):
+        """Cümle sonları ve paragraflar ayrılır, satır sonları birleştirilir"""
+        text = "Birinci cümle burada.  İkinci\ncümle! Üçüncü?\n\nBaşlık\n\nSon"
+        assert split_sentences(text) == ["Birinci cümle burada.", "İkinci cümle!", "Üçüncü?", "Başlık", "Son"]
+
+    def test_central_sentence_ranks_highest(self):
+        """Diğer cümlelerle en çok terim paylaşan cümle öne çıkar"""
+        scores = rank_sentences([
+            ["model", "veri", "analiz"],
+            ["model", "veri"],
+            ["veri", "analiz"],
+            ["hava", "güneşli"],
+        ])
+        assert scores.argmax() == 0
+        assert scores[3] == scores.min()
+        assert abs(scores.sum() - 1) < 1e-3
+
+    def test_summary_keeps_document_order(self):
+        """Seçilen cümleler doküman sırasıyla döner, konu dışı cümleler elenir"""
+        sentences = [
+            "Makine öğrenmesi modelleri büyük veri kümeleri üzerinde eğitilir.",
+            "Bugün hava oldukça güneşli ve sıcak geçti.",
+            "Derin öğrenme modelleri veri kümeleri büyüdükçe daha iyi sonuç verir.",
+            "Kedim bahçede kelebek kovalamayı çok sever.",
+            "Model eğitimi için temiz ve etiketli veri kümeleri gerekir.",
+        ]
+        summary = summarize(" ".join(sentences), max_sentences=3)
+        assert summary == " ".join([sentences[0], sentences[2], sentences[4]])
+
+    def test_long_document_is_fast(self):
+        """100 sayfalık doküman milisaniyeler içinde özetlenir"""
+        text = long_document(paragraph_count=600)
+        started = time.perf_counter()
+        summary = summarize(text, max_sentences=12)
+        assert time.perf_counter() - started < 2
+        assert 0 < len(split_sentences(summary)) <= 12
+
+    def test_fallback_summary_is_extractive(self):
+        """Gemini'sız özet baştaki paragraflar yerine merkezi cümlelerden oluşur"""
+        ai_service = AIService()
+        ai_service.use_gemini = False
+        content = "Giriş başlığı\n\n" + " ".join([
+            "Makine öğrenmesi modelleri büyük veri kümeleri üzerinde eğitilir.",
+            "Bugün hava oldukça güneşli ve sıcak geçti.",
+        ] * 10)
+        summary, _ = asyncio.run(ai_service.generate_summary_and_keywords(content))
+        assert summary.startswith("Makine öğrenmesi")
+        assert len(split_sentences(summary)) <= settings.EXTRACTIVE_SUMMARY_SENTENCES
+
+    def test_fallback_runs_off_event_loop(self, monkeypatch):
+        """Yerel özetleme event loop'u bloklamaz; toplu özetlemeler paralel yürür"""
+        def slow_summary(self, content, corpus=None):
+            time.sleep(0.3)
+            return "özet", "anahtar"
+        monkeypatch.setattr(AIService, "_enhanced_simple_summary_and_keywords", slow_summary)
+        ai_service = AIService()
+        ai_service.use_gemini = False
+
+        async def scenario():
+            ticks = 0
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.01)
+                    ticks += 1
+            ticking = asyncio.create_task(ticker())
+            started = time.perf_counter()
+            outcomes = await ai_service.batch_generate_summary_and_keywords(
+                {i: f"içerik {i}" for i in range(3)}, concurrency=3
+            )
+            elapsed = time.perf_counter() - started
+            ticking.cancel()
+            return outcomes, elapsed, ticks
+
+        outcomes, elapsed, ticks = asyncio.run(scenario())
+        assert all(outcome == ("özet", "anahtar") for outcome in outcomes.values())
+        assert elapsed < 0.8
+        assert ticks >= 10
+
 class TestBatchSummarization:
     """Toplu özetleme testleri"""
+
+    def test_batch_engine_bounded_concurrency(self):
+        """Toplu özetleme eşzamanlılık sınırını aşmaz"""
+        model = FakeAsyncModel()
+        ai_service = make_ai_service(model)
+        contents = {i: f"içerik {i}" for i in range(6)}
+
+        outcomes = asyncio.run(ai_service.batch_generate_summary_and_keywords(contents, concurrency=3))
+
+        assert set(outcomes) == set(contents)
+        assert all(isinstance(outcome, tuple) for outcome in outcomes.values())
+        assert 1 < model.max_in_flight <= 3
+
+    def test_batch_engine_per_item_timeout(self):
+        """Zaman aşımına uğrayan doküman hata olarak döner"""
+        ai_service = make_ai_service(FakeAsyncModel(delay=1))
+
+        outcomes = asyncio.run(
+            ai_service.batch_generate_summary_and_keywords({1: "içerik"}, timeout=0.05)
+        )
+
+        assert isinstance(outcomes[1], TimeoutError)
+
+    def test_batch_summarize_mixed_ids(self, auth_headers, test_document):
+        """Var olan ve olmayan dokümanlarla toplu özetleme testi"""
+        doc_id = test_document["id"]
+        response = client.post("/api/summary/batch-summarize",
+                             json=[doc_id, 999],
+                             headers=auth_headers)
+
+        assert response.status_code == 200
+        result = response.json()
+        assert result["total_processed"] == 2
+        assert result["successful"] == 1
+        assert [r["document_id"] for r in result["results"]] == [doc_id, 999]
+
+        summary = client.get(f"/api/summary/{doc_id}/summary", headers=auth_headers).json()
+        assert summary["has_summary"] is True
     
     def test_batch_summarize_documents(self, auth_headers, test_document):
         """Toplu özetleme testi"""
@@ -186,6 +672,23 @@ class TestBatchSummarization:
         assert result["total_processed"] == 1
         assert result["successful"] == 1
     
+    def test_batch_uses_same_keywords_as_generate(self, monkeypatch, auth_headers, test_document):
+        """Toplu ve tekil özetleme aynı korpus istatistikleriyle aynı anahtar kelimeleri üretir"""
+        monkeypatch.setattr(get_ai_service(), "use_gemini", False)
+        doc_id = test_document["id"]
+        single = client.post(f"/api/summary/{doc_id}/generate", headers=auth_headers).json()
+
+        received = []
+        original = AIService.generate_summary_and_keywords
+        async def spy(self, content, corpus=None):
+            received.append(corpus)
+            return await original(self, content, corpus)
+        monkeypatch.setattr(AIService, "generate_summary_and_keywords", spy)
+
+        batch = client.post("/api/summary/batch-summarize", json=[doc_id], headers=auth_headers).json()
+        assert received and received[0] is not None
+        assert batch["results"][0]["keywords"] == single["keywords"]
+    
     def test_batch_summarize_empty_list(self, auth_headers):
         """Boş liste ile toplu özetleme testi"""
         response = client.post("/api/summary/batch-summarize", 
@@ -197,6 +700,25 @@ class TestBatchSummarization:
         assert result["total_processed"] == 0
         assert result["successful"] == 0
 
+class TestAICacheStatistics:
+    """AI önbellek istatistikleri yetki testleri"""
+
+    def test_regular_user_is_forbidden(self, auth_headers):
+        """Süreç geneli önbellek istatistikleri normal kullanıcıya kapalıdır"""
+        response = client.get("/api/summary/cache/stats", headers=auth_headers)
+        assert response.status_code == 403
+
+    def test_superuser_gets_statistics(self, auth_headers, test_user):
+        """Yönetici önbellek istatistiklerini görür"""
+        db = TestingSessionLocal()
+        db.query(User).filter(User.id == test_user.id).first().is_superuser = True
+        db.commit()
+        db.close()
+
+        response = client.get("/api/summary/cache/stats", headers=auth_headers)
+        assert response.status_code == 200
+        assert isinstance(response.json(), dict)
+
 class TestSummaryStatistics:
     """Özet istatistikleri testleri"""
     
@@ -233,6 +755,51 @@ class TestQuestionAnswering:
         assert result["question"] == question
         assert len(result["answer"]) > 0
     
+    def test_ask_question_uses_relevant_chunks(self, monkeypatch, auth_headers):
+        """Soru yalnızca ilgili parçalarla sorulur; metnin sonu da erişilebilir"""
+        monkeypatch.setattr(settings, "ASK_CHUNK_TOKENS", 200)
+        content = long_document(30).replace("Bölüm 25.", "Bölüm 25. Teslim tarihi mart ayıdır.")
+        files = {"file": ("rapor.txt", content.encode("utf-8"), "text/plain")}
+        document = client.post("/api/documents/", files=files, data={"title": "Rapor"}, headers=auth_headers).json()
+
+        model = FakeScriptedModel(["Mart ayı."])
+        app.dependency_overrides[get_ai_service] = lambda: make_ai_service(model)
+        try:
+            response = client.post(f"/api/summary/{document['id']}/ask",
+                                 params={"question": "Teslim tarihi ne zaman?"},
+                                 headers=auth_headers)
+        finally:
+            app.dependency_overrides.pop(get_ai_service, None)
+
+        assert response.status_code == 200
+        assert response.json()["answer"] == "Mart ayı."
+        assert "Teslim tarihi mart ayıdır." in model.prompts[0]
+        assert len(model.prompts[0]) < len(content) / 2
+    
+    def test_ask_question_retrieves_chunks_off_event_loop(self, monkeypatch, auth_headers, test_document):
+        """Parça seçimi (veritabanı ve BM25) event loop dışında yürür"""
+        called_in_loop = []
+        retrieve_chunks = SearchIndexService.retrieve_chunks
+
+        def spy(db, document, question, *args, **kwargs):
+            try:
+                asyncio.get_running_loop()
+                called_in_loop.append(True)
+            except RuntimeError:
+                called_in_loop.append(False)
+            return retrieve_chunks(db, document, question, *args, **kwargs)
+
+        monkeypatch.setattr(SearchIndexService, "retrieve_chunks", staticmethod(spy))
+        app.dependency_overrides[get_ai_service] = lambda: make_ai_service(FakeScriptedModel(["Yapay zeka."]))
+        try:
+            response = client.post(f"/api/summary/{test_document['id']}/ask",
+                                 params={"question": "Yapay zeka nedir?"},
+                                 headers=auth_headers)
+        finally:
+            app.dependency_overrides.pop(get_ai_service, None)
+        assert response.status_code == 200
+        assert called_in_loop == [False]
+
     def test_ask_question_nonexistent_document(self, auth_headers):
         """Var olmayan doküman için soru sorma testi"""
         response = client.post("/api/summary/999/ask", 
@@ -36,6 +36,7 @@ const Dashboard: React.FC = () => {
   const fetchDocuments = async () => {
     try {
       const response = await axios.get(`${API_BASE}/documents/`, {
+        params: { fields: 'summary' },
         headers: { Authorization: `Bearer ${token}` }
       });
       
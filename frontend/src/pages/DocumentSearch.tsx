@@ -41,6 +41,7 @@ const DocumentSearch: React.FC = () => {
     try {
       const params = new URLSearchParams();
       params.append('query', searchQuery);
+      params.append('fields', 'summary');
       if (fileType && fileType !== 'all') {
         params.append('file_type', fileType);
       }
@@ -64,6 +65,7 @@ const DocumentSearch: React.FC = () => {
 
     try {
       const params = new URLSearchParams();
+      params.append('fields', 'summary');
       if (fileType && fileType !== 'all') {
         params.append('file_type', fileType);
       }
@@ -93,6 +95,27 @@ const DocumentSearch: React.FC = () => {
     return new Date(dateString).toLocaleDateString('tr-TR');
   };
 
+  const handleDownload = async (documentId: number) => {
+    // İndirme yetkili uç noktadan yapılır; token başlıkta gönderilir
+    try {
+      const response = await axios.get(`${API_BASE}/documents/${documentId}/download`, {
+        headers: token ? { 'Authorization': `Bearer ${token}` } : {},
+        responseType: 'blob'
+      });
+      const disposition = response.headers['content-disposition'] || '';
+      const match = /filename\*=utf-8''([^;]+)|filename="([^"]+)"/i.exec(disposition);
+      const filename = match ? decodeURIComponent(match[1] || match[2]) : `dokuman-${documentId}`;
+      const url = window.URL.createObjectURL(response.data);
+      const link = document.createElement('a');
+      link.href = url;
+      link.download = filename;
+      link.click();
+      window.URL.revokeObjectURL(url);
+    } catch (err: any) {
+      setError(err.response?.data?.detail || 'Doküman indirilemedi');
+    }
+  };
+
   const handleDocumentClick = (documentId: number) => {
     // Doküman detay sayfasına yönlendir
     window.open(`${API_BASE}/documents/${documentId}`, '_blank');
@@ -222,13 +245,13 @@ const DocumentSearch: React.FC = () => {
                       >
                         <Eye className="h-4 w-4" />
                       </button>
-                      <a
-                        href={`${API_BASE}/documents/${doc.id}/download`}
+                      <button
+                        onClick={() => handleDownload(doc.id)}
                         className="p-2 text-gray-600 hover:text-primary-600 transition-colors"
                         title="Dokümanı indir"
                       >
                         <Download className="h-4 w-4" />
-                      </a>
+                      </button>
                     </div>
                   </div>
                 </div>
@@ -38,6 +38,7 @@ const DocumentSummary: React.FC = () => {
   const fetchDocuments = async () => {
     try {
       const response = await axios.get(`${API_BASE}/documents/`, {
+        params: { fields: 'summary' },
         headers: { Authorization: `Bearer ${token}` }
       });
       setDocuments(response.data);